@@ -1,7 +1,8 @@
 import * as fs from 'fs';
+import * as path from 'path';
 import fetch from 'node-fetch'; // Ensure using node-fetch v2
 
-const LOG_FILE = './uptime-log.json';
+const LOG_DIR = './uptime-log';
 const TEAMS_WEBHOOK_URL =
   'https://prod-255.westeurope.logic.azure.com:443/workflows/7020544885b54b19b5a86afeeb3cdebe/triggers/manual/paths/invoke?api-version=2016-06-01&sp=%2Ftriggers%2Fmanual%2Frun&sv=1.0&sig=j5o2PvVtQGcgFFQiFUhnBCgr6XYSvaMht42p3QQGMTo';
 
@@ -9,10 +10,36 @@ const TEAMS_WEBHOOK_ALARM =
   'https://prod-89.westeurope.logic.azure.com:443/workflows/12e755cee1ff43dd80e456a082e9798e/triggers/manual/paths/invoke?api-version=2016-06-01&sp=%2Ftriggers%2Fmanual%2Frun&sv=1.0&sig=O33LF1r63-XD9CyV1kt6UZ3m8uFYiSDTXYUS8fCdLQM';
 
 let data: any[] = [];
+let skippedLines = 0;
+
+// A crash mid-append leaves a torn last line; skip it like the Python readers do
+function parseLine(line: string): any[] {
+  try {
+    return [JSON.parse(line)];
+  } catch {
+    skippedLines++;
+    return [];
+  }
+}
+
 try {
-  data = JSON.parse(fs.readFileSync(LOG_FILE, 'utf8'));
+  // Monthly JSON-lines segments, oldest first (see uptime_monitor/store.py)
+  data = fs
+    .readdirSync(LOG_DIR)
+    .filter((name) => name.endsWith('.jsonl'))
+    .sort()
+    .flatMap((name) =>
+      fs
+        .readFileSync(path.join(LOG_DIR, name), 'utf8')
+        .split('\n')
+        .filter((line) => line.trim() !== '')
+        .flatMap(parseLine)
+    );
+  if (skippedLines > 0) {
+    console.warn(`⚠️ ${skippedLines} unlesbare Zeile(n) im Uptime-Log übersprungen`);
+  }
 } catch (err) {
-  console.error('❌ Fehler beim Einlesen der JSON-Datei:', err);
+  console.error('❌ Fehler beim Einlesen des Uptime-Logs:', err);
   process.exit(1);
 }
 
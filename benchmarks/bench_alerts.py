@@ -0,0 +1,64 @@
+"""Per-run alert evaluation: streaming state machine vs. rescanning the history.
+
+For growing synthetic logs, times one probe run's alert check both ways. The
+rescan filters every service's history and looks at the last three results,
+as ``hasThreeConsecutiveFails`` does. The alert engine catches up on the
+newly appended results only. Both must agree on which services are firing::
+
+    python -m benchmarks.bench_alerts --sizes 10000 100000 1000000
+"""
+
+import argparse
+import tempfile
+import time
+from datetime import datetime, timezone
+
+from uptime_monitor import store
+from uptime_monitor.alerts import AlertEngine, Consecutive
+
+from .synthetic import BOOLEAN_SERVICES, write_segments
+
+
+def rescan_three_fails(directory: str):
+    data = store.load_entries(directory)
+    firing = set()
+    for service in BOOLEAN_SERVICES:
+        values = [r[service] for r in data if isinstance(r.get(service), bool)][::-1]
+        if len(values) >= 3 and not any(values[:3]):
+            firing.add(service)
+    return firing
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--sizes", nargs="*", type=int, default=[10_000, 100_000, 1_000_000])
+    args = parser.parse_args()
+
+    rule = Consecutive(3)
+    for size in args.sizes:
+        with tempfile.TemporaryDirectory() as directory:
+            write_segments(directory, size, years=1.0)
+            AlertEngine(directory, [rule]).catch_up()  # initial state, built once
+
+            # one probe run: a few failures so some services start firing
+            with store.SegmentedLog(directory, fsync="never") as log:
+                for i in range(3):
+                    for service in BOOLEAN_SERVICES[:2]:
+                        log.append({"timestamp": datetime.now(timezone.utc).isoformat(), service: False})
+
+            start = time.perf_counter()
+            engine = AlertEngine(directory, [rule])
+            engine.catch_up()
+            streaming_ms = (time.perf_counter() - start) * 1000
+
+            start = time.perf_counter()
+            rescanned = rescan_three_fails(directory)
+            rescan_ms = (time.perf_counter() - start) * 1000
+
+            assert set(engine.firing()) == rescanned, "alert engine disagrees with a rescan"
+            print(f"{size:>9} entries: streaming {streaming_ms:6.2f} ms, rescan {rescan_ms:9.1f} ms "
+                  f"({rescan_ms / streaming_ms:,.0f}x), firing: {sorted(rescanned)}")
+
+
+if __name__ == "__main__":
+    main()
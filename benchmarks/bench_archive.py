@@ -0,0 +1,100 @@
+"""Cold archive: size on disk, time to query a month or a day, time to (re)build.
+
+Writes a synthetic multi-year log, rolls it up, and archives every month
+older than ``--older-than-days``. It then compares the archive with the
+legacy pretty-printed JSON and with the JSONL segments it replaced. Reading
+the whole log back must give the same entries, and the rollups must survive
+being rebuilt from the archive::
+
+    python -m benchmarks.bench_archive --events 300000 --years 3 --block-entries 4096
+"""
+
+import argparse
+import os
+import random
+import shutil
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+
+from uptime_monitor import archive, rollups, store
+
+from .synthetic import write_legacy_json, write_segments
+
+
+def _size(directory: str, suffix: str) -> int:
+    return sum(os.path.getsize(os.path.join(directory, n)) for n in os.listdir(directory) if n.endswith(suffix))
+
+
+def _timed(fn, repeat: int = 5):
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--events", type=int, default=300_000)
+    parser.add_argument("--years", type=float, default=3.0)
+    parser.add_argument("--older-than-days", type=float, default=400)
+    parser.add_argument("--block-entries", type=int, default=4096)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        directory, plain = os.path.join(tmp, "uptime-log"), os.path.join(tmp, "plain")
+        write_segments(directory, args.events, args.years)
+        write_legacy_json(os.path.join(tmp, "uptime-log.json"), args.events, args.years)
+        shutil.copytree(directory, plain)
+        rollups.Rollups(directory).catch_up()
+        before = list(store.read_entries(directory))
+        segments = store.SegmentedLog(directory).segments()
+
+        start = time.perf_counter()
+        months = archive.archive_segments(directory, args.older_than_days, args.block_entries)
+        archive_s = time.perf_counter() - start
+        assert months, "nothing old enough to archive; raise --years"
+        assert list(store.read_entries(directory)) == before, "archive does not round-trip"
+        assert rollups.Rollups(directory).catch_up() == 0, "archiving changed the rollups"
+
+        archived = _size(archive.archive_dir(directory), archive.ARCHIVE_SUFFIX)
+        replaced = sum(os.path.getsize(os.path.join(plain, m + store.SEGMENT_SUFFIX)) for m in months)
+        live = _size(directory, store.SEGMENT_SUFFIX)
+        legacy = os.path.getsize(os.path.join(tmp, "uptime-log.json"))
+        print(f"{args.events} events, {len(segments)} months; {len(months)} archived in {archive_s:.2f}s, "
+              f"{args.block_entries} entries/block")
+        print(f"on disk: legacy JSON {legacy / 1024:.0f} KiB, JSONL {_size(plain, store.SEGMENT_SUFFIX) / 1024:.0f} KiB, "
+              f"JSONL + archive {(live + archived) / 1024:.0f} KiB "
+              f"(archived months {replaced / 1024:.0f} -> {archived / 1024:.0f} KiB, {replaced / archived:.1f}x)")
+
+        month = random.Random(args.seed).choice(months)
+        first = datetime.strptime(month, "%Y-%m").replace(tzinfo=timezone.utc)
+        last = (first + timedelta(days=32)).replace(day=1)
+        day = first + timedelta(days=14)
+        for label, since, until in (("month " + month, first, last), ("day " + day.date().isoformat(), day,
+                                                                      day + timedelta(days=1))):
+            jsonl_s, expected = _timed(lambda: list(store.read_entries(plain, since, until)))
+            archive_q_s, got = _timed(lambda: list(store.read_entries(directory, since, until)))
+            assert got == expected, f"{label}: archive and JSONL disagree"
+            with archive.Archive(archive.archive_path(directory, month)) as reader:
+                list(reader.iter_entries(since, until))
+                blocks = f"{reader.blocks_read}/{len(reader.blocks)} blocks"
+            print(f"query {label} ({len(got)} entries): JSONL {jsonl_s * 1000:.1f} ms, "
+                  f"archive {archive_q_s * 1000:.1f} ms ({blocks} decompressed)")
+
+        rebuild_s, count = _timed(lambda: archive.rebuild(directory, args.block_entries), repeat=1)
+        print(f"rebuild archive: {count} entries in {rebuild_s:.2f}s")
+        assert list(store.read_entries(directory)) == before, "rebuilt archive does not round-trip"
+
+        shutil.rmtree(os.path.join(directory, rollups.ROLLUP_DIRNAME))
+        start = time.perf_counter()
+        rollups.Rollups(directory).catch_up()
+        print(f"rebuild rollups from archive + segments: {time.perf_counter() - start:.2f}s")
+        assert rollups.verify(directory), "rollups rebuilt from the archive disagree with a full recompute"
+
+
+if __name__ == "__main__":
+    main()
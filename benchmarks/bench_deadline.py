@@ -0,0 +1,74 @@
+"""Fault injection: a run never outlives its deadline, whatever the network does.
+
+Runs ``python -m uptime_monitor run --deadline D`` against local stand-ins:
+healthy, then with a black-hole TTN endpoint (accepts, never answers), a
+slow Influx (answers after longer than D), a black-hole Influx, and a UDP
+ingest that drops every ping. It checks which probes passed and that the
+probe phase, including the wait for its worker threads, ended within D
+plus ``SLACK_S`` (50 ms: an Influx query that times out exactly at the
+deadline still has to raise and unwind its thread)::
+
+    python -m benchmarks.bench_deadline --deadline 3
+"""
+
+import argparse
+import os
+import re
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict
+
+from uptime_monitor import store
+
+from .standins import BlackHoleStandIn, InfluxStandIn, TtnStandIn, UdpIngestStandIn
+
+_FINISHED_RE = re.compile(r"Probes finished in ([\d.]+)s")
+SLACK_S = 0.05
+
+
+def run(name: str, deadline_s: float, influx_url: str, udp_address: str, ttn_url: str,
+        expected: Dict[str, bool]) -> None:
+    with tempfile.TemporaryDirectory() as directory:
+        # per-second payload times, so a ping only ever matches its own point
+        env = {**os.environ, "INFLUX_NAME": influx_url, "INFLUX_API": "token", "TTN_API_KEY": "bench",
+               "UDP_TIME_RESOLUTION_S": "1"}
+        start = time.perf_counter()
+        out = subprocess.run([sys.executable, "-m", "uptime_monitor", "run", "--deadline", str(deadline_s),
+                              "--udp", udp_address, "--ttn-url", ttn_url, "--dir", directory],
+                             env=env, check=True, capture_output=True, text=True).stdout
+        wall = time.perf_counter() - start
+        results = {k: v for entry in store.read_entries(directory) for k, v in entry.items() if k in expected}
+    probes_s = float(_FINISHED_RE.search(out).group(1))
+    errors = sorted(set(re.findall(r"test failed: (.+)", out)))
+    outcome = " ".join(f"{k}={'ok' if v else 'FAIL'}" for k, v in results.items())
+    print(f"{name:<22} probes {probes_s:5.2f}s (process {wall:5.2f}s), {outcome}"
+          f"{'  [' + '; '.join(errors) + ']' if errors else ''}")
+    assert results == expected, f"{name}: expected {expected}, got {results}"
+    assert probes_s <= deadline_s + SLACK_S, f"{name}: probes took {probes_s:.2f}s, deadline {deadline_s}s"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--deadline", type=float, default=3.0)
+    args = parser.parse_args()
+    d = args.deadline
+
+    with InfluxStandIn() as influx, UdpIngestStandIn(influx) as udp, TtnStandIn(influx) as ttn, \
+            InfluxStandIn(latency_s=d * 2) as slow_influx, BlackHoleStandIn() as hole, \
+            socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as udp_sink:
+        udp_sink.bind(("127.0.0.1", 0))  # never read: every ping is lost
+        sink = "%s:%d" % udp_sink.getsockname()
+        hole_ttn = hole.url + "/api/v3/as/applications/app/devices/dev/up/simulate"
+
+        run("healthy", d, influx.url, udp.address, ttn.url, {"udp": True, "ttn": True})
+        run("TTN black hole", d, influx.url, udp.address, hole_ttn, {"udp": True, "ttn": False})
+        run("UDP pings lost", d, influx.url, sink, ttn.url, {"udp": False, "ttn": True})
+        run("Influx slower than D", d, slow_influx.url, udp.address, ttn.url, {"udp": False, "ttn": False})
+        run("Influx black hole", d, hole.url, udp.address, ttn.url, {"udp": False, "ttn": False})
+
+
+if __name__ == "__main__":
+    main()
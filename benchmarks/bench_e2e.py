@@ -0,0 +1,146 @@
+"""Offline end-to-end benchmark of the probe pipeline against local stand-ins.
+
+Starts a UDP ingest, a TTN ``/up/simulate`` endpoint and an Influx query
+server, with latency and loss taken from a network profile, and runs the
+real probe code against them cycle after cycle:
+
+* ``run``: ``checks.build_probes("run")`` (send, wait for the point, verify)
+* ``send-check``: ``senders`` then ``checks.build_probes("check")``, the
+  workflow's path without the Playwright step in between
+
+A cold cycle is a one-shot process (``checks.run_cycle``: new connections,
+log write, rollups catch-up). ``--warm`` keeps the clients open across
+cycles like the scheduler daemon. The benchmark reports cycle time, Influx
+queries per cycle, throughput and probe pass rates. ``--save`` writes the
+summary as JSON, and ``--baseline`` compares against a saved one::
+
+    python -m benchmarks.bench_e2e --profile wan --cycles 20 --save before.json
+    python -m benchmarks.bench_e2e --profile wan --cycles 20 --baseline before.json
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import statistics
+import tempfile
+import time
+from datetime import datetime, timezone
+from typing import Dict, List
+
+from uptime_monitor import checks, config, senders
+from uptime_monitor.clients import ClientRuntime
+from uptime_monitor.deadline import Deadline
+from uptime_monitor.probes import ProbeResult, run_probes_sync
+
+from .standins import InfluxStandIn, TtnStandIn, UdpIngestStandIn
+
+# Seconds and probabilities per stand-in
+PROFILES: Dict[str, Dict[str, float]] = {
+    "lan": {},
+    "wan": {"influx_latency_s": 0.04, "ttn_latency_s": 0.15, "udp_ingest_delay_s": 0.8, "ttn_ingest_delay_s": 1.2},
+    "lossy": {"influx_latency_s": 0.04, "ttn_latency_s": 0.15, "udp_ingest_delay_s": 0.8, "ttn_ingest_delay_s": 1.2,
+              "influx_loss": 0.05, "udp_loss": 0.1, "ttn_loss": 0.1},
+}
+COMPARED = ("cycle_p50_s", "cycle_p95_s", "queries_per_cycle", "cycles_per_s")
+
+
+def _cycle(mode: str, udp_address, ttn_url: str, log_dir: str, deadline_s: float, warm: bool) -> List[ProbeResult]:
+    deadline = Deadline.after(deadline_s)
+    if mode == "run":
+        probes = checks.build_probes("run", udp_target=udp_address, ttn_url=ttn_url, log_dir=log_dir,
+                                     deadline=deadline)
+    else:
+        sent_at = datetime.fromtimestamp(int(time.time()), timezone.utc)  # like `date +%s > start_time.txt`
+        senders.send_udp_ping(config.IMEI, udp_address, timeout_s=deadline.timeout())
+        senders.simulate_ttn_uplink(ttn_url, config.TTN_API_KEY, timeout_s=deadline.timeout())
+        probes = checks.build_probes("check", sent_at=sent_at, log_dir=log_dir, deadline=deadline)
+    if not warm:
+        return checks.run_cycle(probes, log_dir)
+    results = run_probes_sync(probes, concurrency=config.PROBE_CONCURRENCY)
+    for result in results:
+        checks.write_uptime_log(result.ok, result.name, log_dir)
+    return results
+
+
+def _quantile(values: List[float], q: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--profile", choices=sorted(PROFILES), default="lan")
+    parser.add_argument("--mode", choices=("run", "send-check"), default="run")
+    parser.add_argument("--cycles", type=int, default=20)
+    parser.add_argument("--warmup", type=int, default=1, help="untimed cycles first (library imports)")
+    parser.add_argument("--warm", action="store_true", help="keep clients open across cycles (scheduler daemon)")
+    parser.add_argument("--deadline", type=float, default=10.0, help="per-cycle deadline in seconds")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--verbose", action="store_true", help="show the probes' own output")
+    parser.add_argument("--save", metavar="FILE", help="write the summary as JSON")
+    parser.add_argument("--baseline", metavar="FILE", help="compare with a summary saved by --save")
+    args = parser.parse_args()
+    p = PROFILES[args.profile]
+
+    # Point the probe code at the stand-ins: per-second UDP payload times, so every cycle waits for its own point
+    config.TTN_API_KEY = config.TTN_API_KEY or "bench"
+    config.UDP_TIME_RESOLUTION_S = 1
+
+    with InfluxStandIn(p.get("influx_latency_s", 0), loss=p.get("influx_loss", 0), seed=args.seed) as influx, \
+            UdpIngestStandIn(influx, p.get("udp_ingest_delay_s", 0), p.get("udp_loss", 0), args.seed) as udp, \
+            TtnStandIn(influx, p.get("ttn_latency_s", 0), p.get("ttn_ingest_delay_s", 0), p.get("ttn_loss", 0),
+                       args.seed) as ttn, \
+            tempfile.TemporaryDirectory() as log_dir:
+        host, port = udp.address.rsplit(":", 1)
+        udp_address = (host, int(port))
+        checks.runtime = ClientRuntime(influx.url, "token", config.INFLUX_ORG)  # shared by all cycles with --warm
+
+        durations, passed = [], {}
+        output = None if args.verbose else io.StringIO()
+        for cycle in range(-args.warmup, args.cycles):
+            if cycle == 0:
+                start, queries = time.perf_counter(), influx.queries
+            if not args.warm:
+                checks.runtime = ClientRuntime(influx.url, "token", config.INFLUX_ORG)  # run_cycle closes it
+            cycle_start = time.perf_counter()
+            with contextlib.redirect_stdout(output) if output else contextlib.nullcontext():
+                results = _cycle(args.mode, udp_address, ttn.url, log_dir, args.deadline, args.warm)
+            if cycle >= 0:
+                durations.append(time.perf_counter() - cycle_start)
+                for result in results:
+                    passed.setdefault(result.name, []).append(result.ok)
+        elapsed = time.perf_counter() - start
+        queries = influx.queries - queries
+        connections = checks.runtime.stats()["influx"] if args.warm else None
+        checks.runtime.close()
+
+        summary = {
+            "profile": args.profile, "mode": args.mode, "warm": args.warm, "cycles": args.cycles, "seed": args.seed,
+            "cycle_p50_s": statistics.median(durations), "cycle_p95_s": _quantile(durations, 0.95),
+            "cycle_max_s": max(durations), "queries_per_cycle": queries / args.cycles,
+            "cycles_per_s": args.cycles / elapsed,
+            "pass_rate": {name: sum(oks) / len(oks) for name, oks in passed.items()},
+        }
+        print(f"profile {args.profile}, mode {args.mode} ({'warm' if args.warm else 'cold'}), "
+              f"{args.cycles} cycles, seed {args.seed}")
+        print(f"cycle: p50 {summary['cycle_p50_s'] * 1000:.0f} ms, p95 {summary['cycle_p95_s'] * 1000:.0f} ms, "
+              f"max {summary['cycle_max_s'] * 1000:.0f} ms")
+        print(f"{summary['queries_per_cycle']:.1f} Influx queries/cycle, {summary['cycles_per_s']:.2f} cycles/s"
+              + (f", connections {connections}" if connections else ""))
+        print("passed: " + ", ".join(f"{name} {rate:.0%}" for name, rate in summary["pass_rate"].items()))
+        print(f"stand-ins (incl. warm-up): {udp.received} pings ({udp.lost.count} lost), {ttn.received} uplinks "
+              f"({ttn.lost.count} lost), {influx.queries} queries ({influx.lost.count} dropped)")
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(summary, f, indent=2)
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        print("vs baseline: " + ", ".join(
+            f"{key} {(summary[key] - baseline[key]) / baseline[key]:+.1%}" for key in COMPARED if baseline.get(key)))
+
+
+if __name__ == "__main__":
+    main()
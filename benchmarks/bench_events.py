@@ -0,0 +1,71 @@
+"""Memory and load time of UptimeEvents vs. the list of dicts from json.load.
+
+Loads the same synthetic history from a legacy pretty-printed array and from
+segments. Load time is measured on a plain run and memory on a second run
+under ``tracemalloc``, which slows allocation down considerably::
+
+    python -m benchmarks.bench_events --events 1000000
+"""
+
+import argparse
+import json
+import os
+import tempfile
+import time
+import tracemalloc
+
+from uptime_monitor import store
+from uptime_monitor.events import UptimeEvents
+from uptime_monitor.windows import UptimeIndex
+
+from .synthetic import BOOLEAN_SERVICES, write_legacy_json
+
+
+def measure(label: str, load):
+    start = time.perf_counter()
+    load()
+    elapsed = time.perf_counter() - start
+    tracemalloc.start()
+    result = load()
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{label:>36}: {elapsed:6.2f}s, retained {current / 1e6:7.1f} MB, peak {peak / 1e6:7.1f} MB")
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--events", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        legacy = os.path.join(directory, "uptime-log.json")
+        segments = os.path.join(directory, "uptime-log")
+        write_legacy_json(legacy, args.events)
+        store.migrate_json_array(legacy, segments, remove_source=False)
+
+        def json_load():
+            with open(legacy, "r", encoding="utf-8") as f:
+                return json.load(f)
+
+        dicts = measure("json.load(uptime-log.json)", json_load)
+        events = measure("UptimeEvents.from_json_array", lambda: UptimeEvents.from_json_array(legacy))
+        assert len(events) == len(dicts)
+        del dicts
+
+        measure("store.load_entries(segments)", lambda: store.load_entries(segments))
+        from_log = measure("UptimeEvents.from_log(segments)", lambda: UptimeEvents.from_log(segments))
+        assert from_log.times == events.times and from_log.values == events.values
+
+        index = UptimeIndex.from_log(segments)
+        for service in BOOLEAN_SERVICES:
+            assert events.uptime(service) == index.uptime(service, events.times[0], events.times[-1] + 1), service
+        print(f"column bytes: {events.nbytes / 1e6:.1f} MB for {len(events)} events ({events.nbytes / len(events):.0f} B/event)")
+
+        start = time.perf_counter()
+        window = events.between(events.times[-1] - 30 * 86_400_000, events.times[-1] + 1).select("udp")
+        print(f"30-day udp slice: {len(window)} events in {(time.perf_counter() - start) * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
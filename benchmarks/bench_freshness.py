@@ -0,0 +1,60 @@
+"""Compare N single-target freshness queries with one batched query.
+
+Runs against a local Influx stand-in with a configurable per-request delay
+that models the network round trip to the production Influx::
+
+    python -m benchmarks.bench_freshness --devices 50 --latency-ms 40
+"""
+
+import argparse
+import time
+from datetime import datetime, timedelta, timezone
+
+from uptime_monitor.clients import ClientRuntime
+from uptime_monitor.influx_query import Target, latest_times
+
+from .standins import InfluxStandIn
+
+BUCKET = "sensor_data"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--devices", type=int, default=50)
+    parser.add_argument("--latency-ms", type=float, default=40.0)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    now = datetime.now(timezone.utc)
+    targets = [Target("imei", f"BENCH{i:010d}", "signal") for i in range(args.devices)]
+
+    with InfluxStandIn(latency_s=args.latency_ms / 1000) as influx:
+        for i, target in enumerate(targets):
+            for age_min in (90, 30, i % 10):
+                influx.add_point("udp", "signal", 26, {"imei": target.value}, now - timedelta(minutes=age_min))
+
+        with ClientRuntime(influx.url, "token", "treesense") as runtime:
+            query_api = runtime.query_api()
+            results = {}
+            for mode in ("per-target", "batched"):
+                influx.queries = 0
+                start = time.perf_counter()
+                for _ in range(args.repeat):
+                    if mode == "batched":
+                        latest = latest_times(query_api, BUCKET, targets)
+                    else:
+                        latest = {}
+                        for target in targets:
+                            latest.update(latest_times(query_api, BUCKET, [target]))
+                elapsed = (time.perf_counter() - start) / args.repeat
+                results[mode] = latest
+                print(f"{mode:>10}: {elapsed * 1000:8.1f} ms/cycle, "
+                      f"{influx.queries / args.repeat:.0f} round trips/cycle")
+            print(f"connections: {runtime.stats()['influx']}")
+
+    assert results["per-target"] == results["batched"], "batched query disagrees with per-target queries"
+    assert all(results["batched"].values()), "every target should have a latest time"
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""Log daemon group commits vs. direct appends with an fsync per entry.
+
+Runs 1, 8 and 64 writer processes appending to the same log. They write
+either through the daemon or directly with ``store.append_entry`` (fsync
+"always"). The benchmark reports records/s and p50/p99 write latency, then
+checks that every entry landed exactly once and in order per writer. It uses
+a directory under the current one, so fsync hits a real file system::
+
+    python -m benchmarks.bench_logd --writers 1 8 64 --per-writer 200
+"""
+
+import argparse
+import multiprocessing
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+from uptime_monitor import logd, store
+
+
+def _wait_for(path: str, timeout_s: float = 10.0) -> None:
+    deadline = time.monotonic() + timeout_s
+    while not os.path.exists(path):
+        if time.monotonic() > deadline:
+            raise TimeoutError(f"{path} did not appear")
+        time.sleep(0.01)
+
+
+def _writer(args):
+    mode, directory, writer, count = args
+    latencies = []
+    client = logd.LogClient(directory) if mode == "daemon" else None
+    for seq in range(count):
+        entry = {"timestamp": datetime.now(timezone.utc).isoformat(), f"w{writer}": seq}
+        start = time.perf_counter()
+        if client:
+            client.append(entry)
+        else:
+            store.append_entry(entry, directory, fsync="always")
+        latencies.append(time.perf_counter() - start)
+    if client:
+        client.close()
+    return latencies
+
+
+def run(mode: str, directory: str, writers: int, per_writer: int) -> None:
+    with multiprocessing.Pool(writers) as pool:
+        start = time.perf_counter()
+        results = pool.map(_writer, [(mode, directory, w, per_writer) for w in range(writers)])
+        wall = time.perf_counter() - start
+    latencies = sorted(x for r in results for x in r)
+    p50, p99 = (latencies[int(q * (len(latencies) - 1))] * 1000 for q in (0.5, 0.99))
+    print(f"{mode:>7} × {writers:<2}: {len(latencies) / wall:8.0f} records/s, p50 {p50:6.2f} ms, p99 {p99:7.2f} ms")
+
+    last = {}
+    for entry in store.read_entries(directory):
+        (key, seq), = ((k, v) for k, v in entry.items() if k != "timestamp")
+        assert seq == last.get(key, -1) + 1, f"{key}: entry {seq} after {last.get(key)}"
+        last[key] = seq
+    assert all(last.get(f"w{w}") == per_writer - 1 for w in range(writers)), "entries missing"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--writers", nargs="*", type=int, default=[1, 8, 64])
+    parser.add_argument("--per-writer", type=int, default=200)
+    args = parser.parse_args()
+
+    for writers in args.writers:
+        with tempfile.TemporaryDirectory(dir=".") as directory:
+            run("direct", directory, writers, args.per_writer)
+        with tempfile.TemporaryDirectory(dir=".") as directory:
+            daemon = subprocess.Popen([sys.executable, "-m", "uptime_monitor.logd", "--dir", directory],
+                                      stdout=subprocess.PIPE, text=True)
+            try:
+                _wait_for(logd.socket_path(directory))
+                run("daemon", directory, writers, args.per_writer)
+            finally:
+                daemon.terminate()
+                print(f"{'':>12}{daemon.communicate(timeout=30)[0].strip().splitlines()[-1]}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+"""Cost of per-stage spans, and a check of the OpenMetrics output of a real run.
+
+Times an empty span (single-threaded and with four threads sharing the
+registry), and compares it with one freshness query against a local Influx
+stand-in. It then runs ``python -m uptime_monitor run --metrics-file``
+against local stand-ins and checks that the exported histograms have every
+stage and are well formed, and that ``serve()`` returns the same text::
+
+    python -m benchmarks.bench_metrics --spans 1000000
+"""
+
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.request
+from typing import Dict, List
+
+from uptime_monitor.config import IMEI, INFLUX_BUCKET
+from uptime_monitor.metrics import STAGE_SECONDS, StageMetrics
+
+from .standins import InfluxStandIn, TtnStandIn, UdpIngestStandIn
+
+_SAMPLE_RE = re.compile(r'^(\w+)\{([^}]*)\} (\S+)$')
+
+
+def span_ns(metrics: StageMetrics, spans: int) -> float:
+    start = time.perf_counter()
+    for _ in range(spans):
+        pass
+    empty = time.perf_counter() - start
+    start = time.perf_counter()
+    for _ in range(spans):
+        with metrics.span("udp", "query"):
+            pass
+    return (time.perf_counter() - start - empty) / spans * 1e9
+
+
+def threaded_span_ns(metrics: StageMetrics, spans: int, threads: int) -> float:
+    per_thread = spans // threads
+    workers = [threading.Thread(target=span_ns, args=(metrics, per_thread)) for _ in range(threads)]
+    start = time.perf_counter()
+    for w in workers:
+        w.start()
+    for w in workers:
+        w.join()
+    return (time.perf_counter() - start) / (per_thread * threads) * 1e9
+
+
+def parse(text: str) -> Dict[str, List[tuple]]:
+    """Samples by metric name as ``(labels dict, value)``; asserts the framing rules we rely on."""
+    lines = text.rstrip("\n").split("\n")
+    assert lines[-1] == "# EOF", "missing # EOF"
+    samples: Dict[str, List[tuple]] = {}
+    for line in lines[:-1]:
+        if line.startswith("#"):
+            continue
+        name, labels, value = _SAMPLE_RE.match(line).groups()
+        samples.setdefault(name, []).append((dict(re.findall(r'(\w+)="([^"]*)"', labels)), float(value)))
+    return samples
+
+
+def check_histograms(samples: Dict[str, List[tuple]]) -> Dict[tuple, int]:
+    """Cumulative buckets never decrease and ``+Inf`` equals ``_count``; returns the count per (probe, stage)."""
+    buckets: Dict[tuple, List[float]] = {}
+    for labels, value in samples[f"{STAGE_SECONDS}_bucket"]:
+        buckets.setdefault((labels["probe"], labels["stage"]), []).append(value)
+    counts = {(l["probe"], l["stage"]): int(v) for l, v in samples[f"{STAGE_SECONDS}_count"]}
+    for key, values in buckets.items():
+        assert values == sorted(values), f"{key}: buckets are not cumulative"
+        assert values[-1] == counts[key], f"{key}: +Inf bucket != _count"
+    return counts
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--spans", type=int, default=1_000_000)
+    parser.add_argument("--queries", type=int, default=200)
+    args = parser.parse_args()
+
+    metrics = StageMetrics()
+    single = span_ns(metrics, args.spans)
+    threaded = threaded_span_ns(metrics, args.spans, 4)
+
+    with InfluxStandIn() as influx:
+        influx.add_point("sensor_data", "signal", 26, {"imei": IMEI})
+        from uptime_monitor.clients import ClientRuntime
+        from uptime_monitor.influx_query import Target, latest_times
+
+        target = Target("imei", IMEI, "signal")
+        with ClientRuntime(influx.url, "token", "treesense") as runtime:
+            query_api = runtime.query_api()
+            latest_times(query_api, INFLUX_BUCKET, [target], "-4h")  # connect
+            durations = []
+            for _ in range(args.queries):
+                start = time.perf_counter()
+                latest_times(query_api, INFLUX_BUCKET, [target], "-4h")
+                durations.append(time.perf_counter() - start)
+    query_us = statistics.median(durations) * 1e6
+    print(f"span: {single:.0f} ns (1 thread), {threaded:.0f} ns wall per span (4 threads); "
+          f"a local Influx query takes {query_us:.0f} µs, so a span adds {single / 1e3 / query_us:.3%}")
+
+    with InfluxStandIn() as influx, UdpIngestStandIn(influx) as udp, TtnStandIn(influx) as ttn, \
+            tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "metrics.prom")
+        env = {**os.environ, "INFLUX_NAME": influx.url, "INFLUX_API": "token", "TTN_API_KEY": "bench"}
+        subprocess.run([sys.executable, "-m", "uptime_monitor", "run", "--udp", udp.address, "--ttn-url", ttn.url,
+                        "--dir", os.path.join(directory, "uptime-log"), "--metrics-file", path],
+                       env=env, check=True, stdout=subprocess.DEVNULL)
+        with open(path, encoding="utf-8") as f:
+            text = f.read()
+    counts = check_histograms(parse(text))
+    expected = {(probe, stage) for probe in ("udp", "ttn") for stage in ("send", "query", "ingestion", "verify", "probe")}
+    assert expected <= set(counts), f"missing stages: {sorted(expected - set(counts))}"
+    print(f"run exported {len(counts)} stage histograms: "
+          + ", ".join(f"{p}/{s}×{n}" for (p, s), n in sorted(counts.items())))
+
+    server = metrics.serve(0)
+    try:
+        host, port = server.server_address[:2]
+        with urllib.request.urlopen(f"http://{host}:{port}/metrics") as resp:
+            served = resp.read().decode("utf-8")
+            assert resp.headers["Content-Type"].startswith("application/openmetrics-text")
+    finally:
+        server.shutdown()
+    assert served == metrics.render()
+    check_histograms(parse(served))
+    print(f"served /metrics matches render() ({len(served)} bytes)")
+
+
+if __name__ == "__main__":
+    main()
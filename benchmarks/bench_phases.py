@@ -0,0 +1,80 @@
+"""Connection-phase probe against local stand-ins: cold vs reused, HTTP and HTTPS.
+
+Measures a TTN simulate endpoint (HTTP), an Influx ``/ping`` over HTTP and
+the same over HTTPS with a throw-away self-signed certificate (needs the
+``openssl`` command; skipped without it). Every stand-in answers after
+``--latency-ms``. The benchmark checks four things:
+
+* the phases logged for every endpoint, including TLS for HTTPS only
+* that reused requests stay on the keep-alive connection
+* that every first byte arrives after the server latency
+* that a black-hole endpoint fails within the deadline
+
+::
+
+    python -m benchmarks.bench_phases --latency-ms 20 --reuse 5
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+from uptime_monitor import http_phases, store
+from uptime_monitor.deadline import Deadline, DeadlineExceeded
+
+from .standins import BlackHoleStandIn, InfluxStandIn, TtnStandIn, self_signed_tls
+
+SLACK_S = 0.5
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--latency-ms", type=float, default=20.0)
+    parser.add_argument("--reuse", type=int, default=5)
+    parser.add_argument("--deadline", type=float, default=2.0, help="for the black-hole endpoint")
+    args = parser.parse_args()
+    latency_s = args.latency_ms / 1000
+
+    with tempfile.TemporaryDirectory() as tmp:
+        server_tls, client_tls = self_signed_tls(tmp)
+        with InfluxStandIn(latency_s) as influx, TtnStandIn(influx, latency_s) as ttn, \
+                InfluxStandIn(latency_s, tls=server_tls) as influx_tls:
+            targets = {"ttn": ttn.url, "influx": influx.url + "/ping"}
+            if server_tls is not None:
+                targets["influxHttps"] = influx_tls.url + "/ping"
+            else:
+                print("openssl not found: HTTPS endpoint skipped")
+
+            for name, url in targets.items():
+                timings = http_phases.measure(url, args.reuse, Deadline.after(10), client_tls)
+                cold, reused = timings[0], timings[1:]
+                assert not cold.reused and all(t.reused for t in reused), f"{name}: keep-alive connection not reused"
+                assert all(t.ttfb_s >= latency_s for t in timings), f"{name}: first byte before the server answered"
+                assert (cold.tls_s is not None) == url.startswith("https"), f"{name}: TLS phase {cold.tls_s}"
+                values = http_phases.series(name, timings)
+                print(f"{name:<10} HTTP {cold.status}  " + "  ".join(f"{k[len(name):-2]} {v:g}" for k, v in values.items())
+                      + " (ms)")
+
+            log_dir = os.path.join(tmp, "uptime-log")
+            assert http_phases.run(targets, args.reuse, log_dir, context=client_tls)
+            logged = {k for entry in store.read_entries(log_dir) for k in entry if k != "timestamp"}
+            expected = {f"{name}{phase}Ms" for name in targets
+                        for phase in ("Dns", "Connect", "Ttfb", "Total", "ReusedTtfb", "ReusedTotal")}
+            expected |= {"influxHttpsTlsMs"} if "influxHttps" in targets else set()
+            assert logged == expected, f"logged series {sorted(logged)}, expected {sorted(expected)}"
+            print(f"uptime log: {len(targets)} entries, {len(logged)} numeric series")
+
+        with BlackHoleStandIn() as hole:
+            start = time.perf_counter()
+            try:
+                http_phases.measure(hole.url + "/ping", args.reuse, Deadline.after(args.deadline))
+                raise AssertionError("black hole answered")
+            except (TimeoutError, DeadlineExceeded) as e:
+                elapsed = time.perf_counter() - start
+                print(f"black hole: {type(e).__name__} after {elapsed:.2f}s (deadline {args.deadline:g}s)")
+            assert elapsed <= args.deadline + SLACK_S, f"black hole held the probe for {elapsed:.2f}s"
+
+
+if __name__ == "__main__":
+    main()
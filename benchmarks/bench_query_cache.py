@@ -0,0 +1,138 @@
+"""Single-flight and TTL cache for freshness queries, counted at a local Influx stand-in.
+
+Runs ``checks.cached_latest_time`` (the path of the UDP and TTN checks)
+against an Influx stand-in that counts the queries it actually serves, and
+checks each behaviour of the cache:
+
+* concurrent identical queries share one request (coalesced)
+* repeats within the TTL are hits, and a query after the TTL goes to Influx
+* a send invalidates its target, including a query already in flight
+* least recently used answers are evicted at ``max_entries``
+* an error reaches every waiting caller and is not cached
+
+It then compares a burst of per-device checks with and without the cache::
+
+    python -m benchmarks.bench_query_cache --latency-ms 40 --checks 32 --devices 4
+"""
+
+import argparse
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+
+from uptime_monitor import checks, config
+from uptime_monitor.clients import ClientRuntime
+from uptime_monitor.influx_query import Target, latest_times
+from uptime_monitor.query_cache import QueryCache
+
+from .standins import InfluxStandIn
+
+
+def _concurrently(n: int, fn):
+    barrier = threading.Barrier(n)
+
+    def call(_):
+        barrier.wait()
+        try:
+            return fn()
+        except Exception as e:
+            return e
+
+    with ThreadPoolExecutor(n) as pool:
+        return list(pool.map(call, range(n)))
+
+
+def _served(influx: InfluxStandIn, fn):
+    before = influx.queries
+    result = fn()
+    return influx.queries - before, result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--latency-ms", type=float, default=40.0)
+    parser.add_argument("--ttl", type=float, default=config.FRESHNESS_CACHE_TTL_S)
+    parser.add_argument("--checks", type=int, default=32, help="concurrent checks in the burst")
+    parser.add_argument("--devices", type=int, default=4, help="distinct devices they ask about")
+    args = parser.parse_args()
+    latency_s = args.latency_ms / 1000
+
+    now = datetime.now(timezone.utc)
+    targets = [Target("imei", f"CACHE{i:010d}", "signal") for i in range(max(args.devices, 6))]
+    with InfluxStandIn(latency_s=latency_s) as influx, InfluxStandIn(loss=1.0) as broken:
+        for target in targets:
+            influx.add_point("udp", "signal", 26, {"imei": target.value}, now - timedelta(minutes=5))
+        checks.runtime = ClientRuntime(influx.url, "token", config.INFLUX_ORG)
+        target = targets[0]
+        lookup = lambda: checks.cached_latest_time(target)
+
+        checks.freshness = QueryCache(args.ttl)
+        served, results = _served(influx, lambda: _concurrently(8, lookup))
+        assert served == 1 and len(set(results)) == 1, f"8 concurrent lookups: {served} queries, {results}"
+        assert checks.freshness.stats()["coalesced"] == 7, checks.freshness.stats()
+        print(f"8 concurrent identical lookups: {served} query, stats {checks.freshness.stats()}")
+
+        served, _ = _served(influx, lambda: [lookup() for _ in range(5)])
+        assert served == 0, f"lookups within the TTL reached Influx {served} times"
+        time.sleep(args.ttl)
+        served, _ = _served(influx, lookup)
+        assert served == 1, "a lookup after the TTL was served from the cache"
+        print(f"5 lookups within the TTL: 0 queries; after {args.ttl:g}s: 1 query")
+
+        checks.freshness = QueryCache(60)
+        lookup()
+        checks.sent_to("imei", target.value)
+        served, _ = _served(influx, lookup)
+        assert served == 1, "a send did not invalidate the cached answer"
+        leader = threading.Thread(target=lookup)
+        checks.freshness.invalidate()
+        leader.start()
+        time.sleep(latency_s / 2)  # the leader's query is in flight
+        checks.sent_to("imei", target.value)
+        served, _ = _served(influx, lookup)  # does not join the stale query
+        leader.join()
+        assert served == 1, "a lookup after a send joined the query in flight before it"
+        served, _ = _served(influx, lookup)
+        assert served == 0, "the answer fetched after the send was not cached"
+        served, _ = _served(influx, lambda: checks.cached_latest_time(targets[1]))
+        assert served == 1
+        checks.sent_to("imei", target.value)
+        served, _ = _served(influx, lambda: checks.cached_latest_time(targets[1]))
+        assert served == 0, "a send invalidated another device"
+        print("send invalidates its target only, including a query in flight")
+
+        checks.freshness = QueryCache(60, max_entries=4)
+        for t in targets[:6]:
+            checks.cached_latest_time(t)
+        served, _ = _served(influx, lambda: checks.cached_latest_time(targets[0]))
+        assert served == 1 and checks.freshness.stats()["evictions"] >= 2, checks.freshness.stats()
+        served, _ = _served(influx, lambda: checks.cached_latest_time(targets[5]))
+        assert served == 0, "the most recently used answer was evicted"
+        print(f"LRU at 4 entries: {checks.freshness.stats()['evictions']} evictions")
+
+        checks.freshness = QueryCache(60)
+        checks.runtime.close()
+        checks.runtime = ClientRuntime(broken.url, "token", config.INFLUX_ORG)
+        served, results = _served(broken, lambda: _concurrently(4, lookup))
+        assert served == 1 and all(isinstance(r, Exception) for r in results), (served, results)
+        assert checks.freshness.stats()["size"] == 0, "an error was cached"
+        print(f"error with 4 waiting callers: {served} query, {type(results[0]).__name__} for all 4, nothing cached")
+        checks.runtime.close()
+
+        checks.runtime = ClientRuntime(influx.url, "token", config.INFLUX_ORG)
+        burst = [targets[i % args.devices] for i in range(args.checks)]
+        direct = lambda t: latest_times(checks.runtime.query_api(), config.INFLUX_BUCKET, [t])[t]
+        checks.freshness = QueryCache(args.ttl)
+        for label, fn in (("no cache", direct), ("cache", checks.cached_latest_time)):
+            start = time.perf_counter()
+            with ThreadPoolExecutor(args.checks) as pool:
+                served, _ = _served(influx, lambda: list(pool.map(fn, burst)))
+            print(f"{args.checks} checks of {args.devices} devices, {label}: {served} queries, "
+                  f"{(time.perf_counter() - start) * 1000:.0f} ms")
+        assert served <= args.devices, f"the burst reached Influx {served} times for {args.devices} devices"
+        checks.runtime.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""Rollup catch-up cost and report latency vs. the prefix-sum index and a full recompute.
+
+Writes a synthetic multi-year log to a temporary directory, rolls it up from
+scratch, then appends one probe run's worth of entries and catches up again.
+Latency quantiles merged from the rollup sketches are checked against exact
+quantiles of the raw samples in the same window::
+
+    python -m benchmarks.bench_rollups --events 300000 --years 3
+"""
+
+import argparse
+import os
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+
+from uptime_monitor import rollups, store
+from uptime_monitor.sketch import RELATIVE_ACCURACY
+from uptime_monitor.windows import UptimeIndex, timestamp_ms
+
+from .synthetic import BOOLEAN_SERVICES, NUMERIC_SERVICES, write_segments
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--events", type=int, default=300_000)
+    parser.add_argument("--years", type=float, default=3.0)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        write_segments(directory, args.events, args.years)
+
+        start = time.perf_counter()
+        added = rollups.Rollups(directory).catch_up()
+        print(f"initial catch-up: {added} entries in {time.perf_counter() - start:.2f}s")
+
+        now = datetime.now(timezone.utc)
+        with store.SegmentedLog(directory, fsync="never") as log:
+            for service in BOOLEAN_SERVICES:
+                log.append({"timestamp": now.isoformat(), service: True})
+            for service, (lo, _) in NUMERIC_SERVICES.items():
+                log.append({"timestamp": now.isoformat(), service: lo})
+        start = time.perf_counter()
+        added = rollups.Rollups(directory).catch_up()
+        print(f"incremental catch-up: {added} entries in {(time.perf_counter() - start) * 1000:.1f} ms")
+        assert rollups.Rollups(directory).catch_up() == 0, "catch-up is not idempotent"
+
+        start = time.perf_counter()
+        assert rollups.verify(directory), "rollups disagree with a full recompute"
+        print(f"full recompute + compare: {time.perf_counter() - start:.2f}s")
+
+        size = sum(os.path.getsize(os.path.join(directory, rollups.ROLLUP_DIRNAME, name))
+                   for name in os.listdir(os.path.join(directory, rollups.ROLLUP_DIRNAME)))
+        print(f"rollup files: {size / 1024:.0f} KiB")
+
+        # Hour-aligned windows, where the rollups are exact
+        end = now.replace(minute=0, second=0, microsecond=0) + timedelta(hours=1)
+        combos = [(s, days) for s in BOOLEAN_SERVICES for days in (30, 100, 365)]
+
+        start = time.perf_counter()
+        reader = rollups.Rollups(directory)
+        from_rollups = {(s, d): reader.uptime(s, end - timedelta(days=d), end) for s, d in combos}
+        rollup_s = time.perf_counter() - start
+
+        start = time.perf_counter()
+        index = UptimeIndex.from_log(directory)
+        end_ms = int(end.timestamp() * 1000)
+        from_index = {(s, d): index.uptime(s, end_ms - d * 86_400_000, end_ms) for s, d in combos}
+        index_s = time.perf_counter() - start
+
+        assert from_rollups == from_index, "rollups disagree with the prefix-sum index"
+        print(f"report ({len(combos)} service × window queries, cold): rollups {rollup_s * 1000:.1f} ms, "
+              f"index load + query {index_s:.2f}s")
+
+        start_ms = end_ms - 30 * 86_400_000
+        for service in NUMERIC_SERVICES:
+            samples = sorted(e[service] for e in store.read_entries(directory)
+                             if service in e and start_ms <= timestamp_ms(e["timestamp"]) < end_ms)
+            exact = [samples[int(q * (len(samples) - 1))] for q in (0.5, 0.95, 0.99)]
+            estimate = reader.quantiles(service, end - timedelta(days=30), end)
+            error = max(abs(a - b) / b for a, b in zip(estimate, exact))
+            assert error <= RELATIVE_ACCURACY + 1e-9, f"{service}: quantile error {error:.4f}"
+            print(f"{service} p50/p95/p99 over 30 days: {[round(v) for v in estimate]} "
+                  f"(exact {exact}, max rel. error {error * 100:.2f}%)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""Per-run overhead of the scheduler daemon vs. a fresh process per check, plus missed-tick policies.
+
+The check is a freshness query for the UDP test device against a local
+Influx stand-in. Cold: a new interpreter imports the clients, connects and
+queries. Warm: the same query as a scheduled job in one process (the first
+run, which pays the imports and the connection, is excluded). A job whose
+first run overruns five ticks then shows how each missed-tick policy behaves.
+It also checks that the job never overlaps itself::
+
+    python -m benchmarks.bench_scheduler --runs 20
+"""
+
+import argparse
+import asyncio
+import subprocess
+import sys
+import time
+
+from uptime_monitor.config import IMEI, INFLUX_BUCKET
+from uptime_monitor.probes import Probe
+from uptime_monitor.scheduler import MISSED_POLICIES, Job, Scheduler
+
+from .standins import InfluxStandIn
+
+COLD_CHECK = """
+import sys
+from uptime_monitor.clients import ClientRuntime
+from uptime_monitor.influx_query import Target, latest_times
+with ClientRuntime(sys.argv[1], "token", "treesense") as runtime:
+    latest_times(runtime.query_api(), sys.argv[2], [Target("imei", sys.argv[3], "signal")], "-4h")
+"""
+
+
+async def _run_for(jobs, seconds: float, on_result=lambda result: None) -> None:
+    stop = asyncio.Event()
+    asyncio.get_running_loop().call_later(seconds, stop.set)
+    await Scheduler(jobs, on_result).run(stop)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--runs", type=int, default=20)
+    args = parser.parse_args()
+
+    with InfluxStandIn() as influx:
+        influx.add_point("sensor_data", "signal", 26, {"imei": IMEI})
+
+        start = time.perf_counter()
+        for _ in range(args.runs):
+            subprocess.run([sys.executable, "-c", COLD_CHECK, influx.url, INFLUX_BUCKET, IMEI], check=True)
+        cold_ms = (time.perf_counter() - start) / args.runs * 1000
+
+        from uptime_monitor.clients import ClientRuntime
+        from uptime_monitor.influx_query import Target, latest_times
+
+        runtime = ClientRuntime(influx.url, "token", "treesense")
+        target = Target("imei", IMEI, "signal")
+
+        async def warm_check() -> bool:
+            latest = await asyncio.to_thread(latest_times, runtime.query_api(), INFLUX_BUCKET, [target], "-4h")
+            return latest[target] is not None
+
+        durations = []
+        job = Job(Probe("udp", warm_check, 10), interval_s=0.05, jitter=0)
+        asyncio.run(_run_for([job], 0.05 * (args.runs + 5), lambda result: durations.append(result.duration_s)))
+        warm_ms = sum(durations[1:]) / len(durations[1:]) * 1000
+        print(f"per check: cold process {cold_ms:.0f} ms, warm scheduler {warm_ms:.1f} ms "
+              f"({job.runs} runs, {job.failures} failures, connections {runtime.stats()['influx']})")
+        assert job.failures == 0
+        runtime.close()
+
+    for policy in MISSED_POLICIES:
+        running = peak = 0
+
+        async def stalls_once() -> bool:
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.55 if job.runs == 0 else 0.01)
+            running -= 1
+            return True
+
+        job = Job(Probe("stall", stalls_once, 5), interval_s=0.1, jitter=0, missed=policy, max_catch_up=3)
+        asyncio.run(_run_for([job], 0.95))
+        assert peak == 1, f"{policy}: job overlapped itself"
+        print(f"missed={policy:<4}: {job.runs} runs, {job.missed_ticks} missed ticks "
+              f"(ticks every 0.1s for 0.95s, first run takes 0.55s)")
+
+
+if __name__ == "__main__":
+    main()
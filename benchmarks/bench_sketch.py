@@ -0,0 +1,75 @@
+"""Quantile-sketch accuracy, size and merge cost against exact quantiles.
+
+::
+
+    python -m benchmarks.bench_sketch --samples 1000000
+"""
+
+import argparse
+import json
+import random
+import sys
+import time
+
+from uptime_monitor.sketch import RELATIVE_ACCURACY, QuantileSketch
+
+QUANTILES = (0.5, 0.95, 0.99)
+
+
+def distributions(rng: random.Random):
+    yield "cloudSpeedSingle-like", lambda: min(max(rng.lognormvariate(0, 0.6) * 3950, 800), 15000)
+    yield "bimodal (cache hit/miss)", lambda: rng.gauss(120, 15) if rng.random() < 0.8 else rng.gauss(4000, 600)
+    yield "heavy tail (pareto)", lambda: 50 * rng.paretovariate(1.2)
+    yield "ingestion lag (with zeros)", lambda: 0 if rng.random() < 0.3 else rng.expovariate(1 / 2500)
+
+
+def exact_quantiles(values, qs):
+    ordered = sorted(values)
+    return [ordered[int(q * (len(ordered) - 1))] for q in qs]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--samples", type=int, default=1_000_000)
+    parser.add_argument("--buckets", type=int, default=24 * 365, help="hourly sketches merged into one window")
+    args = parser.parse_args()
+    rng = random.Random(3)
+
+    for name, draw in distributions(rng):
+        values = [draw() for _ in range(args.samples)]
+        sketch = QuantileSketch()
+        start = time.perf_counter()
+        for value in values:
+            sketch.add(value)
+        add_ns = (time.perf_counter() - start) / len(values) * 1e9
+
+        errors = []
+        for exact, estimate in zip(exact_quantiles(values, QUANTILES), sketch.quantiles(QUANTILES)):
+            errors.append(abs(estimate - exact) / exact if exact else abs(estimate))
+        assert max(errors) <= RELATIVE_ACCURACY + 1e-9, f"{name}: error {max(errors):.4f} over the guarantee"
+
+        raw_bytes = sys.getsizeof(values) + len(values) * sys.getsizeof(1.0)
+        print(f"{name:>28}: max rel. error {max(errors) * 100:.2f}% (p50/p95/p99), "
+              f"{len(sketch.data) - 2} buckets, {len(json.dumps(sketch.data, separators=(',', ':')))} B as JSON "
+              f"vs {raw_bytes / 1e6:.0f} MB raw floats, {add_ns:.0f} ns/add")
+
+    # Adjacent windows: merging per-hour sketches must equal sketching the whole window at once
+    draw = dict(distributions(rng))["cloudSpeedSingle-like"]
+    per_bucket = max(1, args.samples // args.buckets)
+    hourly, whole = [], QuantileSketch()
+    for _ in range(args.buckets):
+        sketch = QuantileSketch()
+        for _ in range(per_bucket):
+            value = draw()
+            sketch.add(value)
+            whole.add(value)
+        hourly.append(sketch)
+    start = time.perf_counter()
+    merged = QuantileSketch.merged(hourly)
+    merge_ms = (time.perf_counter() - start) * 1000
+    assert merged.data == whole.data, "merged sketch differs from the one-pass sketch"
+    print(f"merge of {args.buckets} hourly sketches: {merge_ms:.1f} ms, identical to a one-pass sketch")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""Cold-start cost of every ``python -m uptime_monitor`` subcommand.
+
+Each subcommand runs in a fresh interpreter against local stand-ins: a UDP
+ingest socket and a TTN endpoint, both writing into an Influx stand-in. The
+benchmark reports the median wall time and the ``python -X importtime``
+total, and checks that ``send`` and ``report`` never import ``requests`` or
+the Influx client. ``--budget`` turns the import totals into limits::
+
+    python -m benchmarks.bench_startup --runs 5 --budget send=60 report=60
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List, Set, Tuple
+
+from .standins import InfluxStandIn, TtnStandIn, UdpIngestStandIn
+
+HEAVY = ("requests", "influxdb_client", "urllib3")
+STDLIB_ONLY = ("send", "report")
+
+
+def import_profile(stderr: str) -> Tuple[float, float, Set[str]]:
+    """Import time in ms of ``site`` and of everything else (top-level cumulative), and all module names.
+
+    ``site`` runs before the command and depends only on the installed
+    ``.pth`` files, so it is kept out of the budgeted total.
+    """
+    site_us, total_us, modules = 0, 0, set()
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        modules.add(name.strip())
+        if name.strip() == "site":
+            site_us = int(cumulative)
+        elif not name[1:].startswith(" "):  # nested imports are indented
+            total_us += int(cumulative)
+    return site_us / 1000, total_us / 1000, modules
+
+
+def _budgets(values: List[str]) -> Dict[str, float]:
+    budgets = {}
+    for value in values:
+        name, _, ms = value.partition("=")
+        budgets[name] = float(ms)
+    return budgets
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--budget", nargs="*", default=[], metavar="COMMAND=MS",
+                        help="fail if a subcommand's import time exceeds MS")
+    args = parser.parse_args()
+    budgets = _budgets(args.budget)
+
+    with InfluxStandIn() as influx, UdpIngestStandIn(influx) as udp, TtnStandIn(influx) as ttn, \
+            tempfile.TemporaryDirectory() as directory:
+        start_time_file = os.path.join(directory, "start_time.txt")
+        with open(start_time_file, "w") as f:
+            f.write(str(int(time.time())))
+        log_dir = os.path.join(directory, "uptime-log")
+        commands = {
+            "send": ["send", "--udp", udp.address, "--ttn-url", ttn.url],
+            "check": ["check", "--start-time-file", start_time_file, "--dir", log_dir],
+            "run": ["run", "--udp", udp.address, "--ttn-url", ttn.url, "--dir", log_dir],
+            "report": ["report", "--dir", log_dir],
+        }
+        env = {**os.environ, "INFLUX_NAME": influx.url, "INFLUX_API": "token", "TTN_API_KEY": "bench"}
+
+        failed = []
+        for name, argv in commands.items():
+            walls = []
+            for _ in range(args.runs):
+                start = time.perf_counter()
+                subprocess.run([sys.executable, "-m", "uptime_monitor", *argv], env=env, check=True,
+                               stdout=subprocess.DEVNULL)
+                walls.append((time.perf_counter() - start) * 1000)
+            profiled = subprocess.run([sys.executable, "-X", "importtime", "-m", "uptime_monitor", *argv],
+                                      env=env, check=True, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE,
+                                      text=True)
+            site_ms, import_ms, modules = import_profile(profiled.stderr)
+            heavy = sorted({m.split(".")[0] for m in modules} & set(HEAVY))
+            print(f"{name:<7} wall {statistics.median(walls):6.0f} ms, imports {import_ms:6.1f} ms + site {site_ms:.0f} ms "
+                  f"({len(modules)} modules{', incl. ' + ', '.join(heavy) if heavy else ''})")
+            if name in STDLIB_ONLY and heavy:
+                failed.append(f"{name} imports {', '.join(heavy)}")
+            if name in budgets and import_ms > budgets[name]:
+                failed.append(f"{name} imports take {import_ms:.1f} ms, budget {budgets[name]:g} ms")
+
+        print(f"stand-ins received {udp.received} UDP pings, {ttn.received} TTN uplinks, {influx.queries} queries")
+        assert not failed, "; ".join(failed)
+
+
+if __name__ == "__main__":
+    main()
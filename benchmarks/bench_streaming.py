@@ -0,0 +1,74 @@
+"""Peak RSS and records/s of FluxTable results vs. stream_rows() on a large result.
+
+Each mode runs in its own interpreter against one local Influx stand-in that
+streams a synthetic result, so peak RSS is measured per mode::
+
+    python -m benchmarks.bench_streaming --rows 1000000
+"""
+
+import argparse
+import resource
+import subprocess
+import sys
+import time
+
+from uptime_monitor.influx_query import stream_rows
+
+from .standins import InfluxStandIn
+
+MODES = ("tables", "query_stream", "stream_rows")
+QUERY = 'from(bucket: "sensor_data") |> range(start: -30d) |> filter(fn: (r) => r["_field"] == "signal")'
+
+
+def _peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 1024 / (1024 if sys.platform == "darwin" else 1)  # bytes on macOS, KiB on Linux
+
+
+def consume(mode: str, url: str) -> None:
+    from uptime_monitor.clients import ClientRuntime
+
+    with ClientRuntime(url, "token", "treesense", timeout_s=600) as runtime:
+        query_api = runtime.query_api()
+        baseline = _peak_rss_mb()
+        start = time.perf_counter()
+        total = 0.0
+        rows = 0
+        if mode == "tables":
+            for table in query_api.query(QUERY):
+                for record in table.records:
+                    total += record.get_value()
+                    rows += 1
+        elif mode == "query_stream":
+            for record in query_api.query_stream(QUERY):
+                total += record.get_value()
+                rows += 1
+        else:
+            for _, _, value in stream_rows(query_api, QUERY, "imei"):
+                total += value
+                rows += 1
+        elapsed = time.perf_counter() - start
+    print(f"{mode:>12}: {rows} rows, {rows / elapsed:10.0f} records/s, "
+          f"peak RSS {_peak_rss_mb():7.1f} MB (client baseline {baseline:.1f} MB), checksum {total:.0f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--series", type=int, default=10)
+    parser.add_argument("--child", choices=MODES, help=argparse.SUPPRESS)
+    parser.add_argument("--url", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        consume(args.child, args.url)
+        return
+
+    with InfluxStandIn(synthetic_rows=args.rows, synthetic_series=args.series) as influx:
+        for mode in MODES:
+            subprocess.run([sys.executable, "-m", "benchmarks.bench_streaming", "--child", mode, "--url", influx.url],
+                           check=True)
+
+
+if __name__ == "__main__":
+    main()
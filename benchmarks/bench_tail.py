@@ -0,0 +1,98 @@
+"""Recent-window queries: reverse tail reader vs. a full parse of the history.
+
+Checks the tail reader against ``json.load`` / ``store.load_entries`` on the
+legacy pretty-printed array, a compact array, and segments (including a torn
+last line), then times "last 3 per service" and "last 5 minutes" both ways::
+
+    python -m benchmarks.bench_tail --events 1000000
+"""
+
+import argparse
+import json
+import os
+import tempfile
+import time
+from datetime import timedelta
+
+from uptime_monitor import store, tail
+
+from .synthetic import BOOLEAN_SERVICES, write_legacy_json
+
+
+def full_last_results(entries, count):
+    out = {service: [] for service in BOOLEAN_SERVICES}
+    for entry in reversed(entries):
+        for service in BOOLEAN_SERVICES:
+            if isinstance(entry.get(service), bool) and len(out[service]) < count:
+                out[service].append(entry[service])
+    return out
+
+
+def full_recent(entries, since):
+    return [e for e in reversed(entries) if store.parse_timestamp(e["timestamp"]) >= since]
+
+
+def check(source: str, entries) -> None:
+    assert list(tail.reverse_entries(source)) == entries[::-1], f"{source}: reverse order differs"
+    for count in (1, 3, 10):
+        assert tail.last_results(BOOLEAN_SERVICES, count, source) == full_last_results(entries, count)
+    newest = store.parse_timestamp(entries[-1]["timestamp"])
+    for minutes in (5, 60, 24 * 60):
+        since = newest - timedelta(minutes=minutes)
+        assert tail.recent(since, source) == full_recent(entries, since), f"{source}: last {minutes} min differ"
+
+
+def timed(label: str, fn) -> float:
+    start = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - start
+    print(f"{label:>44}: {elapsed * 1000:9.2f} ms")
+    return elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--events", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        legacy = os.path.join(directory, "uptime-log.json")
+        segments = os.path.join(directory, "uptime-log")
+        write_legacy_json(legacy, args.events)
+        store.migrate_json_array(legacy, segments, remove_source=False)
+        with open(legacy, "r", encoding="utf-8") as f:
+            entries = json.load(f)
+
+        # correctness on a small history in every supported layout
+        small = entries[-5000:]
+        compact = os.path.join(directory, "compact.json")
+        with open(compact, "w", encoding="utf-8") as f:
+            json.dump(small, f)
+        torn = os.path.join(directory, "torn.jsonl")
+        with open(torn, "w", encoding="utf-8") as f:
+            f.writelines(json.dumps(e) + "\n" for e in small)
+            f.write('{"timestamp": "2099-01-01T00:0')
+        small_pretty = os.path.join(directory, "small.json")
+        with open(small_pretty, "w", encoding="utf-8") as f:
+            json.dump(small, f, indent=2)
+        for source in (small_pretty, compact, torn):
+            check(source, small)
+        check(segments, entries)
+        print("tail reader matches a full parse (pretty array, compact array, torn JSON lines, segments)")
+
+        since = store.parse_timestamp(entries[-1]["timestamp"]) - timedelta(minutes=5)
+        for source, label in ((legacy, "uptime-log.json"), (segments, "segments")):
+            def load():
+                if source == legacy:
+                    with open(legacy, "r", encoding="utf-8") as f:
+                        return json.load(f)
+                return store.load_entries(segments)
+
+            full = timed(f"{label}: full parse + last 3 per service", lambda: full_last_results(load(), 3))
+            fast = timed(f"{label}: tail last 3 per service", lambda: tail.last_results(BOOLEAN_SERVICES, 3, source))
+            timed(f"{label}: tail last 5 minutes", lambda: tail.recent(since, source))
+            print(f"{'':>44}  {full / fast:,.0f}x for {args.events} events")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""Multiplexed UDP round-trip probe against a local edge of echoing ports.
+
+Probes ``--targets`` echo ports (``--silent`` of them down) from one socket
+loop. Echoes come back reordered (``--jitter-ms``), lossy and sometimes
+twice. The benchmark checks four things:
+
+* the whole edge is probed in under a second
+* down ports show 100% loss and live ports about ``--loss``
+* duplicates are counted as unmatched, never as extra replies
+* stragglers past the timeout are lost, and the deadline ends the run
+
+It ends with the cost of the same probe done one target at a time::
+
+    python -m benchmarks.bench_udp_rtt --targets 300 --silent 30 --count 3 --loss 0.05
+"""
+
+import argparse
+import socket
+import time
+
+from uptime_monitor import udp_rtt
+from uptime_monitor.deadline import Deadline
+
+from .standins import UdpEchoStandIn
+
+BUDGET_S = 1.0
+
+
+def _sequential(targets, count: int, timeout_s: float) -> float:
+    """Blocking send-then-wait for each datagram; returns seconds."""
+    start = time.perf_counter()
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+        sock.settimeout(timeout_s)
+        for _ in range(count):
+            for target in targets:
+                sock.sendto(b'{"rtt":"0000000000000000"}', target)
+                try:
+                    sock.recvfrom(2048)
+                except socket.timeout:
+                    pass
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--targets", type=int, default=300)
+    parser.add_argument("--silent", type=int, default=30, help="ports that never answer")
+    parser.add_argument("--count", type=int, default=3)
+    parser.add_argument("--delay-ms", type=float, default=2.0)
+    parser.add_argument("--jitter-ms", type=float, default=5.0)
+    parser.add_argument("--loss", type=float, default=0.05)
+    parser.add_argument("--duplicate", type=float, default=0.05)
+    parser.add_argument("--timeout", type=float, default=0.3)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    with UdpEchoStandIn(args.targets, args.delay_ms / 1000, args.jitter_ms / 1000, args.loss, args.duplicate,
+                        args.silent, args.seed) as edge:
+        targets = [udp_rtt.parse_target(a) for a in edge.addresses]
+        report = udp_rtt.probe_targets(targets, args.count, args.timeout)
+        n_live = len(targets) - args.silent
+        live, down = report.targets[:n_live], report.targets[n_live:]
+        print(f"{len(targets)} targets x {args.count}: {report.elapsed_s * 1000:.0f} ms, {report.loss_pct:.1f}% loss, "
+              f"RTT p50/p95 {report.rtt_ms(50):.1f}/{report.rtt_ms(95):.1f} ms, {report.unmatched} unmatched")
+        assert report.elapsed_s < BUDGET_S, f"the edge took {report.elapsed_s:.2f}s"
+        assert all(t.sent == args.count for t in report.targets), "not every datagram was sent"
+        assert all(t.received == 0 for t in down), "a silent port answered"
+        sent = sum(t.sent for t in live)
+        live_loss = 100.0 * (sent - sum(t.received for t in live)) / sent
+        assert abs(live_loss - 100 * args.loss) <= max(3.0, 50 * args.loss), f"live loss {live_loss:.1f}%"
+        assert all(r >= args.delay_ms * 0.99 for t in live for r in t.rtts_ms), "a reply was matched before it was echoed"
+        assert all(t.received <= t.sent for t in report.targets), "a duplicate counted as a reply"
+        if args.duplicate:
+            assert report.unmatched > 0, "no duplicate echo was seen"
+        print(f"live ports: {live_loss:.1f}% loss (configured {100 * args.loss:g}%); "
+              f"{len(down)} silent ports: 100% loss")
+
+        start = time.perf_counter()
+        _sequential(targets[:len(live)], 1, args.timeout)
+        per_reply = (time.perf_counter() - start) / len(live)
+        estimate = args.count * (len(live) * per_reply + len(down) * args.timeout)
+        print(f"one target at a time (estimated from one round over the live ports): {estimate:.1f}s")
+
+    with UdpEchoStandIn(20, delay_s=args.timeout * 2) as slow:
+        targets = [udp_rtt.parse_target(a) for a in slow.addresses]
+        report = udp_rtt.probe_targets(targets, 1, args.timeout)
+        assert report.received == 0, "a straggler past the timeout was counted"
+        assert report.elapsed_s < args.timeout * 2, f"waited {report.elapsed_s:.2f}s for stragglers"
+        print(f"stragglers: 20 echoes after {args.timeout * 2:g}s, all lost at the {args.timeout:g}s timeout")
+
+        report = udp_rtt.probe_targets(targets, 1, timeout_s=30, deadline=Deadline.after(0.2))
+        assert report.elapsed_s < 0.2 + 0.1 and report.received == 0, report.elapsed_s
+        print(f"deadline 0.2s with a 30s timeout: returned after {report.elapsed_s:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
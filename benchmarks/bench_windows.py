@@ -0,0 +1,71 @@
+"""Uptime-window queries: prefix-sum index vs. rescanning the log per query.
+
+Builds a synthetic multi-year log, then answers every service × window
+combination of the Teams report (30/100/365 days) both ways::
+
+    python -m benchmarks.bench_windows --events 1000000 --years 3
+"""
+
+import argparse
+import random
+import time
+
+from uptime_monitor.windows import DAY_MS, UptimeIndex, WindowUptime, timestamp_ms
+
+from .synthetic import BOOLEAN_SERVICES, synthetic_entries
+
+
+def rescan_uptime(entries, service: str, start_ms: int, end_ms: int) -> WindowUptime:
+    """What analyse.ts does: filter the whole history, parsing every timestamp."""
+    up = total = 0
+    for entry in entries:
+        value = entry.get(service)
+        if not isinstance(value, bool):
+            continue
+        ts = timestamp_ms(entry["timestamp"])
+        if start_ms <= ts < end_ms:
+            total += 1
+            up += value
+    return WindowUptime(up, total)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--events", type=int, default=1_000_000)
+    parser.add_argument("--years", type=float, default=3.0)
+    parser.add_argument("--random-windows", type=int, default=10_000)
+    args = parser.parse_args()
+
+    entries = list(synthetic_entries(args.events, args.years))
+    now_ms = timestamp_ms(entries[-1]["timestamp"]) + 1
+
+    start = time.perf_counter()
+    index = UptimeIndex.from_entries(entries)
+    build_s = time.perf_counter() - start
+    print(f"index build: {build_s:.2f}s for {args.events} events")
+
+    combos = [(s, days) for s in BOOLEAN_SERVICES for days in (30, 100, 365)]
+    start = time.perf_counter()
+    indexed = {(s, d): index.uptime(s, now_ms - d * DAY_MS, now_ms) for s, d in combos}
+    indexed_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    rescanned = {(s, d): rescan_uptime(entries, s, now_ms - d * DAY_MS, now_ms) for s, d in combos}
+    rescan_s = time.perf_counter() - start
+
+    assert indexed == rescanned, "index disagrees with a full rescan"
+    print(f"report ({len(combos)} service × window queries): indexed {indexed_s * 1000:.3f} ms, "
+          f"rescan {rescan_s:.2f} s ({rescan_s / indexed_s:,.0f}x)")
+
+    rng = random.Random(2)
+    first_ms = timestamp_ms(entries[0]["timestamp"])
+    windows = [sorted(rng.randrange(first_ms, now_ms) for _ in range(2)) for _ in range(args.random_windows)]
+    start = time.perf_counter()
+    for lo, hi in windows:
+        index.uptime(rng.choice(BOOLEAN_SERVICES), lo, hi)
+    per_query_us = (time.perf_counter() - start) / len(windows) * 1e6
+    print(f"arbitrary windows: {per_query_us:.2f} µs/query over {len(windows)} random windows")
+
+
+if __name__ == "__main__":
+    main()
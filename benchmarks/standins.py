@@ -0,0 +1,509 @@
+"""Local stand-ins for the production services, used by the benchmarks.
+
+:class:`InfluxStandIn` serves ``POST /api/v2/query`` from an in-memory list
+of points. It understands the Flux shapes the probes issue (``range`` with a
+relative or RFC3339 start, ``filter`` on tags/``_field`` joined by
+``and``/``or``, and ``last()``/``limit(n:1)``) and answers with annotated
+CSV, which is what ``influxdb_client`` parses. Every request is counted and
+can be delayed to model a network round trip.
+
+It also answers ``GET /ping`` with 204, like Influx, and serves HTTPS
+when given a server ``tls`` context (see :func:`self_signed_tls`).
+
+With ``synthetic_rows`` set, every query is instead answered with that many
+generated rows spread over ``synthetic_series`` tables. The response is
+streamed with chunked encoding, so even a million-row result costs the
+stand-in no memory.
+
+:class:`UdpIngestStandIn` and :class:`TtnStandIn` play the ingest side: each
+UDP ping or simulated TTN uplink they receive becomes a point in an
+:class:`InfluxStandIn`, like the real pipeline writes it.
+
+Every stand-in takes ``loss`` (a probability) and a ``seed``, so lossy runs
+are reproducible. A lost query is a dropped connection, and a lost ping or
+uplink is never ingested. ``latency_s`` delays an answer, and
+``ingest_delay_s`` delays when a received message becomes visible in Influx.
+
+:class:`BlackHoleStandIn` accepts TCP connections and never answers, the
+failure mode that only a client-side timeout gets out of.
+
+:class:`UdpEchoStandIn` is a UDP edge of many echoing ports served by one
+thread. Some ports can be ``silent`` (down), and echoes can be delayed,
+jittered, lost or sent twice.
+"""
+
+import heapq
+import json
+import random
+import re
+import os
+import selectors
+import shutil
+import socket
+import ssl
+import subprocess
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, NamedTuple, Optional
+
+_RANGE_RE = re.compile(r"range\(start:\s*([^,)]+)")
+_EQ_RE = re.compile(r'r\["((?:[^"\\]|\\.)*)"\]\s*==\s*"((?:[^"\\]|\\.)*)"')
+_UNITS = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+
+
+def self_signed_tls(directory: str):
+    """Server and client TLS contexts for 127.0.0.1, or ``(None, None)`` without ``openssl``."""
+    if shutil.which("openssl") is None:
+        return None, None
+    cert, key = os.path.join(directory, "cert.pem"), os.path.join(directory, "key.pem")
+    subprocess.run(["openssl", "req", "-x509", "-newkey", "rsa:2048", "-nodes", "-days", "1", "-subj", "/CN=127.0.0.1",
+                    "-addext", "subjectAltName=IP:127.0.0.1", "-keyout", key, "-out", cert],
+                   check=True, capture_output=True)
+    server = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+    server.load_cert_chain(cert, key)
+    return server, ssl.create_default_context(cafile=cert)
+
+
+class Point(NamedTuple):
+    time: datetime
+    measurement: str
+    field: str
+    value: float
+    tags: Dict[str, str]
+
+
+def _unescape(value: str) -> str:
+    return value.replace('\\"', '"').replace("\\\\", "\\")
+
+
+def _rfc3339(dt: datetime) -> str:
+    return dt.astimezone(timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.%fZ")
+
+
+def parse_range_start(flux: str, now: datetime) -> datetime:
+    match = _RANGE_RE.search(flux)
+    if not match:
+        return datetime.min.replace(tzinfo=timezone.utc)
+    start = match.group(1).strip()
+    relative = re.fullmatch(r"-(\d+)([smhd])", start)
+    if relative:
+        return now - timedelta(seconds=int(relative.group(1)) * _UNITS[relative.group(2)])
+    return datetime.fromisoformat(start.replace("Z", "+00:00"))
+
+
+def parse_predicate(flux: str) -> List[Dict[str, str]]:
+    """Return the ``or``-joined clauses of all ``filter`` calls as ``{column: value}`` dicts.
+
+    Consecutive ``filter`` calls are combined with ``and``.
+    """
+    clauses: List[Dict[str, str]] = [{}]
+    for body in re.findall(r"filter\(fn:\s*\(r\)\s*=>\s*(.*?)\)\s*(?:\n|\|>|$)", flux, re.S):
+        alternatives = [dict((_unescape(k), _unescape(v)) for k, v in _EQ_RE.findall(part))
+                        for part in re.split(r"\)\s+or\s+\(", body)]
+        clauses = [{**c, **a} for c in clauses for a in alternatives]
+    return clauses
+
+
+class _Loss:
+    """Seeded, thread-safe coin for dropping messages with probability ``rate``."""
+
+    def __init__(self, rate: float, seed: Optional[int]):
+        self.rate = rate
+        self.count = 0
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def __call__(self) -> bool:
+        if not self.rate:
+            return False
+        with self._lock:
+            lost = self._rng.random() < self.rate
+            self.count += lost
+            return lost
+
+
+def _ingest(influx: "InfluxStandIn", delay_s: float, measurement: str, field: str, value: float,
+            tags: Dict[str, str]) -> None:
+    """Write a point stamped with the receive time, visible after ``delay_s``."""
+    args = (measurement, field, value, tags, datetime.now(timezone.utc))
+    if not delay_s:
+        influx.add_point(*args)
+        return
+    timer = threading.Timer(delay_s, influx.add_point, args)
+    timer.daemon = True
+    timer.start()
+
+
+class InfluxStandIn:
+    """Minimal threaded Influx v2 query server; use as a context manager."""
+
+    def __init__(self, latency_s: float = 0.0, host: str = "127.0.0.1", port: int = 0,
+                 synthetic_rows: int = 0, synthetic_series: int = 10, loss: float = 0.0,
+                 seed: Optional[int] = None, tls: Optional[ssl.SSLContext] = None):
+        self.latency_s = latency_s
+        self.lost = _Loss(loss, seed)
+        self.synthetic_rows = synthetic_rows
+        self.synthetic_series = synthetic_series
+        self.points: List[Point] = []
+        self.queries = 0
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._handler())
+        self._server.daemon_threads = True
+        self.tls = tls
+        if tls is not None:
+            self._server.socket = tls.wrap_socket(self._server.socket, server_side=True)
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"{'https' if self.tls else 'http'}://{host}:{port}"
+
+    def add_point(self, measurement: str, field: str, value: float, tags: Dict[str, str],
+                  time_: Optional[datetime] = None) -> None:
+        with self._lock:
+            self.points.append(Point(time_ or datetime.now(timezone.utc), measurement, field, value, tags))
+
+    def __enter__(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def answer(self, flux: str, annotated: bool = True) -> str:
+        """Evaluate ``flux`` against the stored points and return (annotated) CSV."""
+        now = datetime.now(timezone.utc)
+        start = parse_range_start(flux, now)
+        clauses = parse_predicate(flux)
+        only_last = "last()" in flux or "limit(n:1)" in flux
+
+        series: Dict[tuple, List[Point]] = {}
+        with self._lock:
+            points = list(self.points)
+        for p in points:
+            if not (start <= p.time <= now):
+                continue
+            columns = {"_measurement": p.measurement, "_field": p.field, **p.tags}
+            if not any(all(columns.get(k) == v for k, v in c.items()) for c in clauses):
+                continue
+            key = (p.measurement, p.field, tuple(sorted(p.tags.items())))
+            series.setdefault(key, []).append(p)
+
+        blocks = []
+        for table, (key, rows) in enumerate(series.items()):
+            rows.sort(key=lambda p: p.time)
+            if only_last:
+                rows = rows[-1:]
+            blocks.append(_csv_table(table, start, now, key, rows, annotated))
+        return "\r\n".join(blocks) + "\r\n"
+
+    def _handler(self):
+        standin = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            disable_nagle_algorithm = True  # headers and body go out in separate writes
+
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                if standin.latency_s:
+                    time.sleep(standin.latency_s)
+                self.send_response(204 if self.path.split("?")[0] == "/ping" else 404)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                body = self.rfile.read(length).decode("utf-8")
+                with standin._lock:
+                    standin.queries += 1
+                if standin.lost():
+                    self.close_connection = True  # no response at all: the client sees a dropped connection
+                    return
+                if standin.latency_s:
+                    time.sleep(standin.latency_s)
+                if not self.path.startswith("/api/v2/query"):
+                    self.send_response(404)
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+                request = json.loads(body)
+                # influxdb_client asks for annotations unless a Dialect without them is passed (query_csv)
+                annotated = (request.get("dialect") or {}).get("annotations", ["datatype"]) != []
+                if standin.synthetic_rows:
+                    self._stream_synthetic(annotated)
+                    return
+                payload = standin.answer(request.get("query", ""), annotated).encode("utf-8")
+                try:
+                    self.send_response(200)
+                    self.send_header("Content-Type", "text/csv; charset=utf-8")
+                    self.send_header("Content-Length", str(len(payload)))
+                    self.end_headers()
+                    self.wfile.write(payload)
+                except (BrokenPipeError, ConnectionResetError):
+                    pass  # the client timed out while we were delaying the answer
+
+            def _stream_synthetic(self, annotated: bool):
+                self.send_response(200)
+                self.send_header("Content-Type", "text/csv; charset=utf-8")
+                self.send_header("Transfer-Encoding", "chunked")
+                self.end_headers()
+                for chunk in _synthetic_csv(standin.synthetic_rows, standin.synthetic_series, annotated):
+                    data = chunk.encode("utf-8")
+                    self.wfile.write(b"%x\r\n%s\r\n" % (len(data), data))
+                self.wfile.write(b"0\r\n\r\n")
+
+        return Handler
+
+
+def _csv_header(tag_names: List[str], annotated: bool) -> List[str]:
+    lines = [
+        "#datatype,string,long,dateTime:RFC3339,dateTime:RFC3339,dateTime:RFC3339,double,string,string"
+        + ",string" * len(tag_names),
+        "#group,false,false,true,true,false,false,true,true" + ",true" * len(tag_names),
+        "#default,_result,,,,,,," + "," * len(tag_names),
+    ] if annotated else []
+    lines.append(",result,table,_start,_stop,_time,_value,_field,_measurement" + "".join("," + n for n in tag_names))
+    return lines
+
+
+def _csv_table(table: int, start: datetime, stop: datetime, key: tuple, rows: List[Point],
+               annotated: bool = True) -> str:
+    measurement, field, tags = key
+    lines = _csv_header([name for name, _ in tags], annotated)
+    fixed = f",,{table},{_rfc3339(start)},{_rfc3339(stop)},"
+    suffix = f",{field},{measurement}" + "".join("," + v for _, v in tags)
+    lines.extend(f"{fixed}{_rfc3339(p.time)},{p.value}{suffix}" for p in rows)
+    return "\r\n".join(lines) + "\r\n"
+
+
+def _synthetic_csv(rows: int, series: int, annotated: bool, batch: int = 2000):
+    """Generate ``rows`` points of field ``signal`` over ``series`` devices, one table each, in text chunks."""
+    stop = datetime.now(timezone.utc)
+    start = stop - timedelta(seconds=rows)
+    fixed_start, fixed_stop = _rfc3339(start), _rfc3339(stop)
+    per_series = -(-rows // series)
+    emitted = 0
+    for table in range(series):
+        imei = f"SYN{table:012d}"
+        lines = _csv_header(["imei"], annotated)
+        prefix = f",,{table},{fixed_start},{fixed_stop},"
+        suffix = f",signal,udp,{imei}"
+        for i in range(min(per_series, rows - emitted)):
+            lines.append(f"{prefix}{_rfc3339(start + timedelta(seconds=emitted))},{emitted % 31}{suffix}")
+            emitted += 1
+            if len(lines) >= batch:
+                yield "\r\n".join(lines) + "\r\n"
+                lines = []
+        yield "\r\n".join(lines) + "\r\n\r\n"
+
+
+class UdpIngestStandIn:
+    """UDP listener that writes the ``signal`` of every received ping to ``influx``; a context manager."""
+
+    def __init__(self, influx: InfluxStandIn, ingest_delay_s: float = 0.0, loss: float = 0.0,
+                 seed: Optional[int] = None, host: str = "127.0.0.1"):
+        self.influx = influx
+        self.ingest_delay_s = ingest_delay_s
+        self.lost = _Loss(loss, seed)
+        self.received = 0
+        self._sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self._sock.bind((host, 0))
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def address(self) -> str:
+        host, port = self._sock.getsockname()
+        return f"{host}:{port}"
+
+    def __enter__(self):
+        self._thread = threading.Thread(target=self._serve, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._sock.close()
+
+    def _serve(self):
+        while True:
+            try:
+                data, _ = self._sock.recvfrom(65536)
+            except OSError:
+                return
+            ping = json.loads(data)
+            self.received += 1
+            if not self.lost():
+                _ingest(self.influx, self.ingest_delay_s, "sensor_data", "signal", ping["signal"],
+                        {"imei": ping["IMEI"]})
+
+
+class TtnStandIn:
+    """HTTP server accepting simulated uplinks; each one becomes a ``resistance`` point in ``influx``."""
+
+    def __init__(self, influx: InfluxStandIn, latency_s: float = 0.0, ingest_delay_s: float = 0.0,
+                 loss: float = 0.0, seed: Optional[int] = None, host: str = "127.0.0.1"):
+        self.influx = influx
+        self.latency_s = latency_s
+        self.ingest_delay_s = ingest_delay_s
+        self.lost = _Loss(loss, seed)  # accepted with 200, but never ingested
+        self.received = 0
+        self._server = ThreadingHTTPServer((host, 0), self._handler())
+        self._server.daemon_threads = True
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/api/v3/as/applications/app/devices/dev/up/simulate"
+
+    def __enter__(self):
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def _handler(self):
+        standin = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            disable_nagle_algorithm = True
+
+            def log_message(self, *args):
+                pass
+
+            def do_POST(self):
+                uplink = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+                standin.received += 1
+                if standin.latency_s:
+                    time.sleep(standin.latency_s)
+                if not standin.lost():
+                    _ingest(standin.influx, standin.ingest_delay_s, "sensor_data", "resistance", 1.0,
+                            {"hardware_serial": uplink["end_device_ids"]["dev_eui"]})
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", "2")
+                self.end_headers()
+                self.wfile.write(b"{}")
+
+            def do_GET(self):
+                if standin.latency_s:
+                    time.sleep(standin.latency_s)
+                self.send_response(405)  # like TTN: the simulate endpoint takes POST only
+                self.send_header("Allow", "POST")
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+
+        return Handler
+
+
+class BlackHoleStandIn:
+    """TCP listener that accepts connections and holds them open without ever reading or answering."""
+
+    def __init__(self, host: str = "127.0.0.1"):
+        self._sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self._sock.bind((host, 0))
+        self._sock.listen(64)
+        self._held: List[socket.socket] = []
+
+    @property
+    def url(self) -> str:
+        host, port = self._sock.getsockname()
+        return f"http://{host}:{port}"
+
+    def __enter__(self):
+        threading.Thread(target=self._accept, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc):
+        self._sock.close()
+        for conn in self._held:
+            conn.close()
+
+    def _accept(self):
+        while True:
+            try:
+                conn, _ = self._sock.accept()
+            except OSError:
+                return
+            self._held.append(conn)
+
+
+class UdpEchoStandIn:
+    """``ports`` UDP sockets that send every datagram back to its sender; a context manager.
+
+    The last ``silent`` ports never answer. An echo leaves after ``delay_s``
+    plus up to ``jitter_s`` (so replies get reordered), is lost with
+    probability ``loss``, and is sent twice with probability ``duplicate``.
+    """
+
+    def __init__(self, ports: int = 1, delay_s: float = 0.0, jitter_s: float = 0.0, loss: float = 0.0,
+                 duplicate: float = 0.0, silent: int = 0, seed: Optional[int] = None, host: str = "127.0.0.1"):
+        self.delay_s = delay_s
+        self.jitter_s = jitter_s
+        self.duplicate = duplicate
+        self.lost = _Loss(loss, seed)
+        self.received = 0
+        self._rng = random.Random(seed)
+        self._socks = []
+        for _ in range(ports):
+            sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+            sock.bind((host, 0))
+            sock.setblocking(False)
+            self._socks.append(sock)
+        self._silent = set(self._socks[len(self._socks) - silent:]) if silent else set()
+        self._selector = selectors.DefaultSelector()
+        self._closed = threading.Event()
+
+    @property
+    def addresses(self) -> List[str]:
+        return [f"{host}:{port}" for host, port in (s.getsockname() for s in self._socks)]
+
+    def __enter__(self):
+        for sock in self._socks:
+            self._selector.register(sock, selectors.EVENT_READ)
+        threading.Thread(target=self._serve, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc):
+        self._closed.set()
+
+    def _serve(self):
+        due: list = []  # heap of (send at, seq, sock, data, address)
+        seq = 0
+        try:
+            while not self._closed.is_set():
+                timeout = 0.05 if not due else max(0.0, min(0.05, due[0][0] - time.monotonic()))
+                for key, _ in self._selector.select(timeout):
+                    while True:
+                        try:
+                            data, address = key.fileobj.recvfrom(65536)
+                        except OSError:
+                            break
+                        self.received += 1
+                        if key.fileobj in self._silent or self.lost():
+                            continue
+                        copies = 2 if self.duplicate and self._rng.random() < self.duplicate else 1
+                        for _ in range(copies):
+                            at = time.monotonic() + self.delay_s + self._rng.random() * self.jitter_s
+                            heapq.heappush(due, (at, seq, key.fileobj, data, address))
+                            seq += 1
+                now = time.monotonic()
+                while due and due[0][0] <= now:
+                    _, _, sock, data, address = heapq.heappop(due)
+                    try:
+                        sock.sendto(data, address)
+                    except OSError:
+                        pass  # buffer full: the echo is lost, like on a congested edge
+        finally:
+            self._selector.close()
+            for sock in self._socks:
+                sock.close()
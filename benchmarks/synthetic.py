@@ -0,0 +1,50 @@
+"""Synthetic uptime logs shaped like the real one, for benchmarks."""
+
+import json
+import os
+import random
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterator, Optional
+
+from uptime_monitor import store
+
+BOOLEAN_SERVICES = ("cloud", "api", "website", "udp", "ttn")
+NUMERIC_SERVICES = {"cloudSpeedSingle": (800, 15000), "cloudSpeedAll": (4000, 25000), "LongestAction": (1, 11)}
+
+
+def synthetic_entries(events: int, years: float = 3.0, seed: int = 1,
+                      end: Optional[datetime] = None) -> Iterator[Dict]:
+    """``events`` single-result entries evenly spread over ``years`` up to ``end``, oldest first.
+
+    Boolean services fail about 2% of the time; numeric series are
+    log-normal-ish latencies clipped to their range.
+    """
+    rng = random.Random(seed)
+    end = end or datetime.now(timezone.utc)
+    start = end - timedelta(days=365 * years)
+    step = (end - start) / events
+    services = list(BOOLEAN_SERVICES) + list(NUMERIC_SERVICES)
+    for i in range(events):
+        ts = start + step * i
+        service = services[i % len(services)]
+        if service in NUMERIC_SERVICES:
+            lo, hi = NUMERIC_SERVICES[service]
+            value = int(min(max(rng.lognormvariate(0, 0.6) * (lo + hi) / 4, lo), hi))
+        else:
+            value = rng.random() > 0.02
+        # mix both timestamp styles found in the log (Playwright "Z", Python "+00:00")
+        text = ts.isoformat(timespec="milliseconds").replace("+00:00", "Z") if i % 2 else ts.isoformat()
+        yield {"timestamp": text, service: value}
+
+
+def write_segments(directory: str, events: int, years: float = 3.0, seed: int = 1) -> None:
+    with store.SegmentedLog(directory, fsync="never") as log:
+        for entry in synthetic_entries(events, years, seed):
+            log.append(entry)
+
+
+def write_legacy_json(path: str, events: int, years: float = 3.0, seed: int = 1) -> None:
+    """Pretty-printed JSON array in the layout of the original ``uptime-log.json``."""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(list(synthetic_entries(events, years, seed)), f, indent=2)
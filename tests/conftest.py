@@ -0,0 +1,78 @@
+"""Fakes shared by the tests: a manual clock and the local service stand-ins.
+
+The stand-in servers are the ones the benchmarks drive
+(``benchmarks/standins.py``). This is the only module of the tests that imports
+them; test modules ask for them as fixtures.
+"""
+
+import asyncio
+import contextlib
+
+import pytest
+
+from benchmarks import standins
+
+
+class FakeClock:
+    """A ``time.monotonic`` replacement that only moves when a test sets ``now``."""
+
+    def __init__(self, now: float = 0.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+    async def sleep(self, seconds: float) -> None:
+        """An ``asyncio.sleep`` replacement that moves the clock instead of waiting (one sleeper at a time)."""
+        self.now += seconds
+        await asyncio.sleep(0)
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def influx(request):
+    """An Influx stand-in; parametrize indirectly with a latency in seconds to delay its answers."""
+    with standins.InfluxStandIn(getattr(request, "param", 0.0)) as influx:
+        yield influx
+
+
+@pytest.fixture(scope="session")
+def tls_contexts(tmp_path_factory):
+    """``(server, client)`` TLS contexts for a self-signed 127.0.0.1; skips the test without ``openssl``."""
+    server, client = standins.self_signed_tls(str(tmp_path_factory.mktemp("tls")))
+    if server is None:
+        pytest.skip("openssl not found")
+    return server, client
+
+
+@pytest.fixture
+def influx_https(request, tls_contexts):
+    """``(influx, client_context)``: the :func:`influx` stand-in over HTTPS."""
+    server, client = tls_contexts
+    with standins.InfluxStandIn(getattr(request, "param", 0.0), tls=server) as influx:
+        yield influx, client
+
+
+@pytest.fixture
+def black_hole():
+    with standins.BlackHoleStandIn() as hole:
+        yield hole
+
+
+@pytest.fixture(scope="module")
+def services():
+    """``(influx, udp ingest, ttn, black hole)``, shared by a module's end-to-end runs."""
+    with standins.InfluxStandIn() as influx, standins.UdpIngestStandIn(influx) as udp, \
+            standins.TtnStandIn(influx) as ttn, standins.BlackHoleStandIn() as hole:
+        yield influx, udp, ttn, hole
+
+
+@pytest.fixture
+def udp_echo():
+    """``udp_echo(ports, **options)`` starts a :class:`~benchmarks.standins.UdpEchoStandIn` for the test."""
+    with contextlib.ExitStack() as stack:
+        yield lambda *args, **kwargs: stack.enter_context(standins.UdpEchoStandIn(*args, **kwargs))
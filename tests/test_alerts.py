@@ -0,0 +1,156 @@
+import json
+import os
+import random
+import threading
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from uptime_monitor import alerts, store
+
+START = datetime(2025, 6, 1, tzinfo=timezone.utc)
+
+
+def _ts(minutes):
+    return (START + timedelta(minutes=minutes)).isoformat()
+
+
+def _feed(engine, results, service="udp", step=1):
+    events = []
+    for i, ok in enumerate(results):
+        events.extend(engine.record(service, ok, _ts(i * step)))
+    return events
+
+
+def _three_consecutive_fails(values):
+    """``hasThreeConsecutiveFails`` in ``analyse.ts``: the last three boolean results all failed."""
+    latest_first = values[::-1]
+    return len(latest_first) >= 3 and not any(latest_first[:3])
+
+
+def test_consecutive_fires_once_and_resolves_on_a_success(tmp_path):
+    engine = alerts.AlertEngine(str(tmp_path), [alerts.Consecutive(3)])
+    assert _feed(engine, [True, False, False]) == []
+    assert engine.record("udp", False, _ts(3)) == [alerts.AlertEvent("udp", "3 consecutive failures", True, _ts(3))]
+    assert engine.record("udp", False, _ts(4)) == []  # edge-triggered: still firing, no new event
+    assert engine.firing() == {"udp": ["3 consecutive failures"]}
+    assert engine.record("udp", True, _ts(5)) == [alerts.AlertEvent("udp", "3 consecutive failures", False, _ts(5))]
+    assert engine.firing() == {}
+
+
+def test_m_of_n_counts_failures_in_the_window(tmp_path):
+    engine = alerts.AlertEngine(str(tmp_path), [alerts.MOfN(3, 5)])
+    events = _feed(engine, [False, True, False, True, False])
+    assert [(e.firing, e.timestamp) for e in events] == [(True, _ts(4))]
+    assert [e.firing for e in engine.record("udp", True, _ts(5))] == [False]  # the oldest failure left the window
+
+
+@pytest.mark.parametrize("rule", [alerts.MOfN(0, 5), alerts.MOfN(6, 5), alerts.MOfN(5, alerts.HISTORY_BITS + 1)])
+def test_impossible_m_of_n_rules_are_rejected(tmp_path, rule):
+    with pytest.raises(ValueError):
+        alerts.AlertEngine(str(tmp_path), [rule])
+
+
+def test_down_for_fires_on_time_without_new_results(tmp_path):
+    engine = alerts.AlertEngine(str(tmp_path), [alerts.DownFor(hours=3)])
+    assert _feed(engine, [True, False, False], step=60) == []  # down since minute 60
+    assert engine.evaluate(START + timedelta(hours=3, minutes=59)) == []
+    events = engine.evaluate(START + timedelta(hours=4))
+    assert [(e.rule, e.firing) for e in events] == [("down for 3h", True)]
+    assert engine.evaluate(START + timedelta(hours=5)) == []
+    assert [e.firing for e in engine.record("udp", True, _ts(301))] == [False]
+
+
+def test_services_are_independent(tmp_path):
+    engine = alerts.AlertEngine(str(tmp_path), [alerts.Consecutive(2)])
+    _feed(engine, [False, False], "udp")
+    _feed(engine, [False, True], "ttn")
+    assert engine.firing() == {"udp": ["2 consecutive failures"]}
+
+
+def test_matches_has_three_consecutive_fails_after_every_result(tmp_path):
+    rng = random.Random(7)
+    engine = alerts.AlertEngine(str(tmp_path), [alerts.Consecutive(3)])
+    history = {"udp": [], "ttn": []}
+    for i in range(2000):
+        service = rng.choice(sorted(history))
+        ok = rng.random() > 0.4
+        history[service].append(ok)
+        engine.record(service, ok, _ts(i))
+        for name, values in history.items():
+            assert (name in engine.firing()) == _three_consecutive_fails(values)
+
+
+def _write(directory, results):
+    """Log entries as the probe scripts write them: one result per service and a numeric field."""
+    with store.SegmentedLog(directory, fsync="never") as log:
+        for minutes, values in results:
+            log.append({"timestamp": _ts(minutes), **values, "udpIngestion": 1200})
+
+
+def test_catch_up_resumes_from_the_saved_state(tmp_path):
+    directory = str(tmp_path)
+    rng = random.Random(3)
+    results = [(i * 600, {"udp": rng.random() > 0.3, "ttn": rng.random() > 0.5}) for i in range(1000)]  # two months
+    _write(directory, results[:600])
+    first = alerts.AlertEngine(directory).catch_up()
+    with open(os.path.join(directory, alerts.STATE_FILE)) as f:
+        offsets = json.load(f)["offsets"]
+    log = store.SegmentedLog(directory)
+    assert offsets == {key: os.path.getsize(log.segment_path(key)) for key in log.segments()}
+
+    _write(directory, results[600:])
+    resumed = alerts.AlertEngine(directory)
+    assert resumed.catch_up() == [e for e in _all_events(tmp_path / "fresh", results) if e not in first]
+    assert alerts.AlertEngine(directory).catch_up() == []  # nothing new to read
+
+    fresh = alerts.AlertEngine(str(tmp_path / "fresh"))
+    assert resumed.firing() == fresh.firing()
+    assert {n: s.to_json() for n, s in resumed.services.items()} == {n: s.to_json() for n, s in fresh.services.items()}
+
+
+def _all_events(directory, results):
+    _write(str(directory), results)
+    return alerts.AlertEngine(str(directory)).catch_up()
+
+
+def test_catch_up_leaves_a_torn_line_for_the_next_run(tmp_path):
+    directory = str(tmp_path)
+    _write(directory, [(0, {"udp": False}), (1, {"udp": False})])
+    segment = store.SegmentedLog(directory).segment_path("2025-06")
+    line = json.dumps({"timestamp": _ts(2), "udp": False}) + "\n"
+    with open(segment, "a") as f:
+        f.write(line[:15])
+    assert alerts.AlertEngine(directory, [alerts.Consecutive(3)]).catch_up() == []
+    with open(segment, "a") as f:
+        f.write(line[15:])
+    events = alerts.AlertEngine(directory, [alerts.Consecutive(3)]).catch_up()
+    assert [(e.service, e.firing, e.timestamp) for e in events] == [("udp", True, _ts(2))]
+
+
+def test_concurrent_catch_ups_report_each_event_once(tmp_path):
+    """Like the probes logging their ingestion latency from worker threads at the same time."""
+    directory = str(tmp_path)
+    _write(directory, [(i, {"udp": False}) for i in range(3)])
+    events, barrier = [], threading.Barrier(8)
+
+    def catch_up():
+        barrier.wait()
+        events.extend(alerts.catch_up(directory))
+
+    threads = [threading.Thread(target=catch_up) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert [(e.service, e.rule, e.firing) for e in events] == [("udp", "3 consecutive failures", True)]
+    assert alerts.AlertEngine(directory).firing() == {"udp": ["3 consecutive failures"]}
+    assert not [name for name in os.listdir(directory) if name.endswith(".tmp")]
+
+
+def test_main_exits_non_zero_while_a_rule_fires(tmp_path, capsys):
+    _write(str(tmp_path), [(i, {"udp": False, "ttn": True}) for i in range(3)])
+    assert alerts.main(["--dir", str(tmp_path)]) == 1
+    assert "❌ udp: 3 consecutive failures" in capsys.readouterr().out
+    _write(str(tmp_path), [(3, {"udp": True, "ttn": True})])
+    assert alerts.main(["--dir", str(tmp_path)]) == 0
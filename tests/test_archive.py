@@ -0,0 +1,121 @@
+import json
+import os
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from uptime_monitor import archive, store
+
+START = datetime(2025, 1, 1, tzinfo=timezone.utc)
+NOW = datetime(2025, 6, 15, tzinfo=timezone.utc)  # January to March are old enough with 60 days
+BLOCK_ENTRIES = 50
+
+
+def _entries(count, start=START, step=timedelta(hours=2)):
+    return [{"timestamp": (start + i * step).isoformat(), "udp": i % 7 != 0, "udpIngestion": 1000 + i}
+            for i in range(count)]
+
+
+def _append(directory, entries):
+    with store.SegmentedLog(directory, fsync="never") as log:
+        log.append_batch(entries)
+
+
+def _archive(directory):
+    return archive.archive_segments(directory, older_than_days=60, block_entries=BLOCK_ENTRIES, now=NOW)
+
+
+@pytest.fixture
+def log_dir(tmp_path):
+    directory = str(tmp_path / "uptime-log")
+    _append(directory, _entries(1800))  # January to May
+    return directory
+
+
+def test_round_trip_moves_only_old_months(log_dir):
+    expected = store.load_entries(log_dir)
+    assert _archive(log_dir) == ["2025-01", "2025-02", "2025-03"]
+    assert archive.months(log_dir) == ["2025-01", "2025-02", "2025-03"]
+    assert store.SegmentedLog(log_dir).segments() == ["2025-04", "2025-05"]
+    assert store.load_entries(log_dir) == expected
+    with archive.Archive(archive.archive_path(log_dir, "2025-01")) as january:
+        assert january.entries == 31 * 12
+        assert len(january.blocks) == -(-january.entries // BLOCK_ENTRIES)
+    assert _archive(log_dir) == []  # nothing left to move
+
+
+def test_a_time_range_decompresses_only_the_overlapping_blocks(log_dir):
+    _archive(log_dir)
+    since, until = datetime(2025, 2, 10, 5, tzinfo=timezone.utc), datetime(2025, 2, 12, tzinfo=timezone.utc)
+    with archive.Archive(archive.archive_path(log_dir, "2025-02")) as february:
+        found = list(february.iter_entries(since, until))
+        overlapping = [b for b in february.blocks if b.last_ms >= since.timestamp() * 1000
+                       and b.first_ms < until.timestamp() * 1000]
+        assert february.blocks_read == len(overlapping) < len(february.blocks)
+    assert found == [e for e in _entries(1800) if since <= store.parse_timestamp(e["timestamp"]) < until]
+    assert list(store.read_entries(log_dir, since, until)) == found
+
+
+def test_late_lines_for_an_archived_month_are_merged(log_dir):
+    _archive(log_dir)
+    late = [{"timestamp": "2025-02-03T04:05:06+00:00", "ttn": False}, {"timestamp": "2025-02-28T23:59:59Z", "udp": True}]
+    _append(log_dir, late)
+    assert _archive(log_dir) == ["2025-02"]
+    assert "2025-02" not in store.SegmentedLog(log_dir).segments()
+    february = list(archive.iter_entries(log_dir, "2025-02"))
+    assert february == [e for e in _entries(1800) if e["timestamp"].startswith("2025-02")] + late
+
+
+def test_rebuild_keeps_every_entry(log_dir):
+    expected = store.load_entries(log_dir)
+    _archive(log_dir)
+    assert archive.rebuild(log_dir, block_entries=7) == 31 * 12 + 28 * 12 + 31 * 12
+    assert store.load_entries(log_dir) == expected
+
+
+def _crash_before_removing_segments(monkeypatch):
+    def crash(path):
+        raise OSError("killed")
+
+    monkeypatch.setattr(archive.os, "remove", crash)
+
+
+@pytest.mark.parametrize("late_after_crash", [False, True])
+def test_a_crash_after_writing_the_archive_is_recovered(log_dir, monkeypatch, late_after_crash):
+    """The archive of January is in place, its segment still there: the segment equals the archive tail."""
+    expected = store.load_entries(log_dir)
+    with monkeypatch.context() as patch:
+        _crash_before_removing_segments(patch)
+        with pytest.raises(OSError):
+            _archive(log_dir)
+    assert archive.months(log_dir) == ["2025-01"] and "2025-01" in store.SegmentedLog(log_dir).segments()
+    if late_after_crash:
+        late = {"timestamp": "2025-01-31T23:00:00+00:00", "udp": False}
+        _append(log_dir, [late])
+        expected.insert(31 * 12, late)
+
+    assert _archive(log_dir) == ["2025-01", "2025-02", "2025-03"]
+    assert store.load_entries(log_dir) == expected  # no line archived twice
+    assert store.SegmentedLog(log_dir).segments() == ["2025-04", "2025-05"]
+
+
+def test_a_torn_last_line_is_not_archived(log_dir):
+    with open(store.SegmentedLog(log_dir).segment_path("2025-03"), "a") as f:
+        f.write('{"timestamp": "2025-03-31T23:59')
+    expected = store.load_entries(log_dir)
+    _archive(log_dir)
+    assert store.load_entries(log_dir) == expected
+
+
+def test_files_that_are_not_archives_are_rejected(tmp_path, log_dir):
+    _archive(log_dir)
+    path = archive.archive_path(log_dir, "2025-01")
+    with open(path, "rb") as f:
+        data = f.read()
+    truncated, other = tmp_path / "truncated.blocks", tmp_path / "other.blocks"
+    truncated.write_bytes(data[:-4])
+    other.write_bytes(json.dumps(_entries(100)).encode())
+    for bad in (truncated, other):
+        with pytest.raises(ValueError):
+            archive.Archive(str(bad))
+    assert not os.path.exists(path + ".tmp")
@@ -0,0 +1,86 @@
+import os
+import re
+import subprocess
+import sys
+import time
+
+import pytest
+import urllib3
+
+from uptime_monitor import store
+from uptime_monitor.clients import ClientRuntime
+from uptime_monitor.deadline import Deadline, DeadlineExceeded
+
+DEADLINE_S = 2.0
+# Only upper bounds are asserted, and generously: a loaded runner may be late by far more than the
+# run itself needs, yet a missed deadline still shows up as the 10 s client timeout or worse.
+SLACK_S = 2.0
+# A healthy run only has to pass; a short budget for interpreter start-up, a UDP ping and its
+# ingestion poll is occasionally missed on a loaded runner.
+HEALTHY_DEADLINE_S = 10.0
+
+
+def test_budget_counts_down_and_caps(clock):
+    deadline = Deadline.after(5, clock)
+    assert deadline.timeout() == 5 and deadline.timeout(cap=2) == 2
+    clock.now += 4
+    assert deadline.remaining() == 1 and deadline.timeout(cap=2) == 1 and not deadline.expired
+
+
+def test_spent_budget_raises(clock):
+    deadline = Deadline.after(1, clock)
+    clock.now += 1
+    assert deadline.expired and deadline.remaining() == 0
+    with pytest.raises(DeadlineExceeded):
+        deadline.timeout()
+    assert issubclass(DeadlineExceeded, TimeoutError)
+
+
+def test_query_timeout_bounds_a_black_hole(black_hole):
+    with ClientRuntime(black_hole.url, "token", "org") as runtime:
+        runtime.query_api()
+        start = time.monotonic()
+        with pytest.raises(urllib3.exceptions.TimeoutError), runtime.bounded_query_api(0.3) as query_api:
+            query_api.query('from(bucket: "b") |> range(start: -1h)')
+        assert time.monotonic() - start < 0.3 + SLACK_S
+
+
+def test_a_budget_the_client_timeout_fits_uses_the_shared_client():
+    with ClientRuntime("http://127.0.0.1:1", "token", "org", timeout_s=5) as runtime:
+        with runtime.bounded_query_api(None) as query_api:
+            assert query_api is runtime.query_api()
+        with runtime.bounded_query_api(5) as query_api:
+            assert query_api is runtime.query_api()
+        with runtime.bounded_query_api(2) as query_api:
+            assert query_api is not runtime.query_api()
+
+
+def _run(tmp_path, influx_url: str, udp_address: str, ttn_url: str, deadline_s: float = DEADLINE_S):
+    env = {**os.environ, "INFLUX_NAME": influx_url, "INFLUX_API": "token", "TTN_API_KEY": "test",
+           "UDP_TIME_RESOLUTION_S": "1"}
+    out = subprocess.run([sys.executable, "-m", "uptime_monitor", "run", "--deadline", str(deadline_s),
+                          "--udp", udp_address, "--ttn-url", ttn_url, "--dir", str(tmp_path)],
+                         env=env, check=True, capture_output=True, text=True).stdout
+    results = {k: v for entry in store.read_entries(str(tmp_path)) for k, v in entry.items() if k in ("udp", "ttn")}
+    return float(re.search(r"Probes finished in ([\d.]+)s", out).group(1)), results
+
+
+def test_healthy_run_passes_well_within_the_deadline(tmp_path, services):
+    influx, udp, ttn, _ = services
+    probes_s, results = _run(tmp_path, influx.url, udp.address, ttn.url, HEALTHY_DEADLINE_S)
+    assert results == {"udp": True, "ttn": True}
+    assert probes_s < HEALTHY_DEADLINE_S
+
+
+def test_ttn_black_hole_fails_only_ttn_at_the_deadline(tmp_path, services):
+    influx, udp, _, hole = services
+    probes_s, results = _run(tmp_path, influx.url, udp.address, hole.url + "/up/simulate")
+    assert results == {"udp": True, "ttn": False}
+    assert probes_s < DEADLINE_S + SLACK_S
+
+
+def test_influx_black_hole_ends_at_the_deadline(tmp_path, services):
+    _, udp, ttn, hole = services
+    probes_s, results = _run(tmp_path, hole.url, udp.address, ttn.url)
+    assert results == {"udp": False, "ttn": False}
+    assert probes_s < DEADLINE_S + SLACK_S
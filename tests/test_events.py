@@ -0,0 +1,97 @@
+import json
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from uptime_monitor import events as events_module, store
+from uptime_monitor.events import KIND_CHECK, KIND_SERIES, UptimeEvents, epoch_ms
+
+START = datetime(2025, 3, 1, tzinfo=timezone.utc)
+START_MS = int(START.timestamp() * 1000)
+MINUTE_MS = 60_000
+
+
+def _entries(count):
+    entries = []
+    for i in range(count):
+        ts = START + timedelta(minutes=i)
+        stamp = ts.isoformat() if i % 2 else ts.isoformat(timespec="milliseconds").replace("+00:00", "Z")
+        entries.append({"timestamp": stamp, "udp": i % 5 != 0, **({"cloudSpeedSingle": 100 + i} if i % 3 == 0 else {})})
+    return entries
+
+
+@pytest.mark.parametrize("timestamp, expected", [
+    ("2025-03-01T00:00:00+00:00", START_MS),
+    ("2025-03-01T00:00:00.123Z", START_MS + 123),
+    ("2025-03-01T00:00:00.123999+00:00", START_MS + 123),  # truncated, not rounded
+    ("2025-03-01T01:00:00.250+01:00", START_MS + 250),
+    ("2025-03-01T00:00:01", START_MS + 1000),  # naive means UTC, like store.parse_timestamp
+])
+def test_epoch_ms(timestamp, expected):
+    assert epoch_ms(timestamp) == expected
+
+
+def test_columns_hold_one_event_per_result():
+    events = UptimeEvents.from_entries([{"timestamp": "2025-03-01T00:00:00Z", "udp": False, "cloudSpeedSingle": 250,
+                                         "note": "skipped", "ttn": True}])
+    assert len(events) == 3
+    assert list(events.times) == [START_MS] * 3
+    assert [events.names[s] for s in events.services] == ["udp", "cloudSpeedSingle", "ttn"]
+    assert list(events.values) == [0.0, 250.0, 1.0]
+    assert list(events.kinds) == [KIND_CHECK, KIND_SERIES, KIND_CHECK]
+    assert events.nbytes == 3 * (8 + 2 + 8 + 1)
+
+
+def test_out_of_order_entries_are_sorted_by_time():
+    entries = _entries(50)
+    events = UptimeEvents.from_entries(entries[25:] + entries[:25])
+    assert list(events.times) == sorted(events.times)
+    assert list(events.entries()) == list(UptimeEvents.from_entries(entries).entries())
+
+
+def test_between_is_half_open_and_select_keeps_one_service():
+    events = UptimeEvents.from_entries(_entries(120))
+    window = events.between(START_MS + 10 * MINUTE_MS, START_MS + 20 * MINUTE_MS)
+    assert sorted(set(window.times)) == [START_MS + i * MINUTE_MS for i in range(10, 20)]
+    speeds = window.select("cloudSpeedSingle")
+    assert list(speeds.values) == [100.0 + i for i in range(12, 20, 3)]
+    assert set(speeds.services) == {events._ids["cloudSpeedSingle"]} and speeds.names == events.names
+    assert len(events.select("nothing")) == 0
+
+
+def test_uptime_counts_boolean_results_only():
+    entries = _entries(100)
+    events = UptimeEvents.from_entries(entries)
+    up = sum(e["udp"] for e in entries)
+    assert (events.uptime("udp").up, events.uptime("udp").total) == (up, 100)
+    assert events.uptime("cloudSpeedSingle").total == 0
+    assert events.uptime("nothing").total == 0
+
+
+def test_entries_rebuild_the_log():
+    entries = _entries(30)
+    rebuilt = list(UptimeEvents.from_entries(entries).entries())
+    split = [{"timestamp": e["timestamp"], k: v} for e in entries for k, v in e.items() if k != "timestamp"]
+    assert [{k: v for k, v in e.items() if k != "timestamp"} for e in rebuilt] == \
+           [{k: v for k, v in e.items() if k != "timestamp"} for e in split]
+    assert [epoch_ms(e["timestamp"]) for e in rebuilt] == [epoch_ms(e["timestamp"]) for e in split]
+
+
+def test_the_legacy_array_and_the_segments_load_the_same(tmp_path):
+    entries = _entries(3000)
+    legacy = tmp_path / store.LEGACY_LOG_FILE
+    legacy.write_text(json.dumps(entries, indent=2))
+    directory = str(tmp_path / "uptime-log")
+    store.migrate_json_array(str(legacy), directory, remove_source=False)
+    from_array, from_log = UptimeEvents.from_json_array(str(legacy)), UptimeEvents.from_log(directory)
+    assert len(from_array) == sum(len(e) - 1 for e in entries)
+    for column in ("times", "services", "values", "kinds"):
+        assert getattr(from_array, column) == getattr(from_log, column)
+
+
+def test_columns_built_in_chunks_match_one_pass(monkeypatch):
+    entries = _entries(500)
+    whole = UptimeEvents.from_entries(entries)
+    monkeypatch.setattr(events_module, "_CHUNK", 7)
+    chunked = UptimeEvents.from_entries(entries)
+    assert list(chunked.entries()) == list(whole.entries())
@@ -0,0 +1,66 @@
+import asyncio
+import os
+
+import pytest
+
+from uptime_monitor import http_phases, store
+from uptime_monitor.deadline import Deadline
+from uptime_monitor.probes import bind_log_dir, registered_probes
+
+LATENCY_S = 0.02
+REUSE = 3
+COLD = ("Dns", "Connect", "Ttfb", "Total")
+REUSED = ("ReusedTtfb", "ReusedTotal")
+
+
+def _check_phases(timings, tls=False):
+    cold, reused = timings[0], timings[1:]
+    assert [t.status for t in timings] == [204] * (1 + REUSE)
+    assert not cold.reused and all(t.reused for t in reused)
+    assert cold.dns_s is not None and cold.connect_s is not None and (cold.tls_s is not None) == tls
+    assert all(t.dns_s is t.connect_s is t.tls_s is None for t in reused)
+    assert all(t.ttfb_s >= LATENCY_S for t in timings)  # the first byte waits for the server
+    assert cold.dns_s + cold.connect_s + (cold.tls_s or 0) + cold.ttfb_s <= cold.total_s
+    assert all(t.ttfb_s <= t.total_s for t in reused)
+
+
+@pytest.mark.parametrize("influx", [LATENCY_S], indirect=True)
+def test_cold_then_reused_phases_over_http(influx):
+    _check_phases(http_phases.measure(influx.url + "/ping", REUSE, Deadline.after(10)))
+
+
+@pytest.mark.parametrize("influx_https", [LATENCY_S], indirect=True)
+def test_cold_then_reused_phases_over_https(influx_https):
+    influx, client = influx_https
+    _check_phases(http_phases.measure(influx.url + "/ping", REUSE, Deadline.after(10), client), tls=True)
+
+
+def test_series_hold_the_cold_phases_and_reused_medians(influx):
+    timings = http_phases.measure(influx.url + "/ping", REUSE, Deadline.after(10))
+    values = http_phases.series("influx", timings)
+    assert set(values) == {f"influx{phase}Ms" for phase in COLD + REUSED}
+    assert values["influxTotalMs"] == round(timings[0].total_s * 1000, 1)
+
+
+def test_run_logs_one_entry_per_endpoint_and_survives_a_dead_one(influx, tmp_path, capsys):
+    targets = {"influx": influx.url + "/ping", "dead": "http://127.0.0.1:1/ping"}
+    assert http_phases.run(targets, REUSE, str(tmp_path), Deadline.after(10)) is False
+    assert "❌ dead" in capsys.readouterr().out
+    entries = list(store.read_entries(str(tmp_path)))
+    assert [sorted(k for k in e if k != "timestamp") for e in entries] == \
+           [sorted(f"influx{phase}Ms" for phase in COLD + REUSED)]
+
+
+def test_the_scheduled_probe_logs_to_the_scheduler_directory(influx, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(http_phases, "endpoints", lambda: {"influx": influx.url + "/ping"})
+    phases = next(p for p in registered_probes() if p.name == "phases")
+    log_dir = str(tmp_path / "scheduler-dir")
+    assert asyncio.run(bind_log_dir(phases, log_dir).run()) is True
+    assert len(list(store.read_entries(log_dir))) == 1
+    assert not os.path.exists(http_phases.config.UPTIME_LOG_DIR)  # nothing went to the default directory
+
+
+def test_non_http_urls_are_rejected():
+    with pytest.raises(ValueError):
+        http_phases.TimedConnection("udp://127.0.0.1:9999")
@@ -0,0 +1,162 @@
+import asyncio
+import json
+import os
+import socket
+import threading
+import time
+from datetime import datetime, timezone
+
+import pytest
+
+from uptime_monitor import logd, store
+
+
+class Daemon:
+    """A :class:`logd.LogDaemon` served on its own event loop thread."""
+
+    def __init__(self, directory, **options):
+        self.daemon = logd.LogDaemon(directory, **options)
+        self._stop = asyncio.Event()
+        self._thread = threading.Thread(target=asyncio.run, args=(self._serve(),))
+        self._thread.start()
+        deadline = time.monotonic() + 5
+        while not os.path.exists(self.daemon.path):
+            assert time.monotonic() < deadline, "the daemon did not start"
+            time.sleep(0.01)
+
+    async def _serve(self):
+        self._loop = asyncio.get_running_loop()
+        await self.daemon.serve(self._stop)
+
+    def stop(self):
+        if self._thread.is_alive():
+            self._loop.call_soon_threadsafe(self._stop.set)
+            self._thread.join(10)
+
+
+@pytest.fixture
+def log_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(logd, "_clients", {})
+    return str(tmp_path)
+
+
+@pytest.fixture
+def start_daemon(log_dir):
+    daemons = []
+
+    def start(**options):
+        daemons.append(Daemon(log_dir, **options))
+        return daemons[-1]
+
+    yield start
+    for daemon in daemons:
+        daemon.stop()
+
+
+def _entry(**values):
+    return {"timestamp": datetime.now(timezone.utc).isoformat(), **values}
+
+
+def test_each_writer_keeps_its_order_and_nothing_is_lost(log_dir, start_daemon):
+    start_daemon()
+
+    def write(writer):
+        with logd.LogClient(log_dir) as client:
+            for seq in range(50):
+                client.append(_entry(**{f"w{writer}": seq}))
+
+    threads = [threading.Thread(target=write, args=(w,)) for w in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    seen = {}
+    for entry in store.read_entries(log_dir):
+        (writer, seq), = ((k, v) for k, v in entry.items() if k != "timestamp")
+        seen.setdefault(writer, []).append(seq)
+    assert seen == {f"w{w}": list(range(50)) for w in range(8)}
+
+
+def test_an_ok_means_on_disk_and_before_anything_sent_later(log_dir, start_daemon):
+    start_daemon()
+    with logd.LogClient(log_dir) as first, logd.LogClient(log_dir) as second:
+        first.append(_entry(first=1))
+        assert [e.get("first") for e in store.read_entries(log_dir)] == [1]
+        second.append(_entry(second=2))
+    assert [e.get("first", e.get("second")) for e in store.read_entries(log_dir)] == [1, 2]
+
+
+def test_bad_lines_are_rejected_without_stopping_the_daemon(log_dir, start_daemon):
+    start_daemon()
+    with socket.socket(socket.AF_UNIX) as sock:
+        sock.connect(logd.socket_path(log_dir))
+        sock.sendall(b'{"timestamp": "yesterday", "udp": true}\nnot json\n' + json.dumps(_entry(udp=True)).encode() + b"\n")
+        replies = sock.makefile("rb")
+        assert [replies.readline()[:5] for _ in range(3)] == [b"error", b"error", b"ok\n"]
+    assert [e["udp"] for e in store.read_entries(log_dir)] == [True]
+
+
+def test_a_full_queue_blocks_the_sender_until_commits_resume(log_dir, start_daemon):
+    daemon = start_daemon(queue_size=2, max_batch=1, fsync="never").daemon
+    release, append_batch = threading.Event(), daemon.log.append_batch
+    daemon.log.append_batch = lambda entries: release.wait(10) and append_batch(entries)
+    count, padding = 2000, "x" * 4096  # far more than the socket and stream buffers hold
+    lines = b"".join(json.dumps(_entry(seq=i, pad=padding)).encode() + b"\n" for i in range(count))
+
+    with socket.socket(socket.AF_UNIX) as sock:
+        sock.connect(logd.socket_path(log_dir))
+        sender = threading.Thread(target=sock.sendall, args=(lines,))
+        sender.start()
+        time.sleep(0.5)
+        assert sender.is_alive(), "the sender was never blocked"
+        assert daemon.queue.qsize() <= 2
+        assert not list(store.read_entries(log_dir))
+
+        release.set()
+        sender.join(30)
+        replies = sock.makefile("rb")
+        assert all(replies.readline() == b"ok\n" for _ in range(count))
+    assert [e["seq"] for e in store.read_entries(log_dir)] == list(range(count))
+
+
+def test_disabled_by_default_writes_directly(log_dir, start_daemon):
+    daemon = start_daemon().daemon
+    assert logd.append_entry(_entry(udp=True), log_dir) is False
+    assert logd.append_entry(_entry(udp=False), log_dir, use_daemon=False) is False
+    assert daemon.entries == 0 and len(list(store.read_entries(log_dir))) == 2
+
+
+def test_enabled_goes_through_the_daemon_and_reconnects_after_a_restart(log_dir, start_daemon):
+    first = start_daemon()
+    assert logd.append_entry(_entry(seq=0), log_dir, use_daemon=True) is True
+    first.stop()
+    start_daemon()
+    assert logd.append_entry(_entry(seq=1), log_dir, use_daemon=True) is True
+    assert [e["seq"] for e in store.read_entries(log_dir)] == [0, 1]
+
+
+def test_an_unreachable_daemon_falls_back_to_a_direct_write(log_dir):
+    stale = socket.socket(socket.AF_UNIX)
+    stale.bind(logd.socket_path(log_dir))  # left behind by a daemon that was killed
+    stale.close()
+    assert logd.append_entry(_entry(udp=True), log_dir, use_daemon=True) is False
+    assert [e["udp"] for e in store.read_entries(log_dir)] == [True]
+
+
+def test_no_second_write_once_the_daemon_has_the_entry(log_dir):
+    """A daemon that reads the entry and dies before acknowledging it may have committed it."""
+    with socket.socket(socket.AF_UNIX) as server:
+        server.bind(logd.socket_path(log_dir))
+        server.listen()
+
+        def read_one_and_die():
+            conn, _ = server.accept()
+            conn.makefile("rb").readline()
+            conn.close()
+
+        thread = threading.Thread(target=read_one_and_die)
+        thread.start()
+        with pytest.raises(OSError, match="did not commit"):
+            logd.append_entry(_entry(udp=True), log_dir, use_daemon=True)
+        thread.join()
+    assert not list(store.read_entries(log_dir))
@@ -0,0 +1,151 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from uptime_monitor import checks, config
+from uptime_monitor.clients import ClientRuntime
+from uptime_monitor.influx_query import Target
+from uptime_monitor.query_cache import QueryCache
+
+
+class SlowFetch:
+    """Counts calls; each call blocks until ``release`` is set."""
+
+    def __init__(self, value="answer"):
+        self.value = value
+        self.calls = 0
+        self.started = threading.Event()
+        self.release = threading.Event()
+
+    def __call__(self):
+        self.calls += 1
+        self.started.set()
+        assert self.release.wait(5)
+        if isinstance(self.value, Exception):
+            raise self.value
+        return self.value
+
+
+def _concurrently(n, fn):
+    pool = ThreadPoolExecutor(n)
+    futures = [pool.submit(fn) for _ in range(n)]
+    pool.shutdown(wait=False)  # the calls block until the test releases the fetch
+    return futures
+
+
+def _wait_for_waiters(cache, n):
+    deadline = time.monotonic() + 5
+    while cache.stats()["coalesced"] < n:
+        assert time.monotonic() < deadline, cache.stats()
+        time.sleep(0.001)
+
+
+def test_concurrent_identical_gets_share_one_fetch():
+    cache, fetch = QueryCache(60), SlowFetch()
+    futures = _concurrently(8, lambda: cache.get("k", fetch))
+    _wait_for_waiters(cache, 7)
+    fetch.release.set()
+    assert [f.result() for f in futures] == ["answer"] * 8
+    assert fetch.calls == 1 and cache.stats()["coalesced"] == 7
+
+
+def test_ttl_expiry(clock):
+    cache, calls = QueryCache(1.0, clock=clock), []
+    fetch = lambda: calls.append(1) or len(calls)
+    assert cache.get("k", fetch) == 1
+    clock.now = 0.99
+    assert cache.get("k", fetch) == 1
+    clock.now = 1.0
+    assert cache.get("k", fetch) == 2
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 2
+
+
+def test_zero_ttl_only_coalesces():
+    cache, calls = QueryCache(0), []
+    cache.get("k", lambda: calls.append(1))
+    cache.get("k", lambda: calls.append(1))
+    assert len(calls) == 2 and cache.stats()["size"] == 0
+
+
+def test_invalidate_drops_cached_and_in_flight_answers():
+    cache = QueryCache(60)
+    cache.get(("udp", 1), lambda: "old")
+    cache.get(("ttn", 1), lambda: "other")
+    fetch = SlowFetch("stale")
+    leader = threading.Thread(target=cache.get, args=(("udp", 2), fetch))
+    leader.start()
+    assert fetch.started.wait(5)
+    assert cache.invalidate(lambda key: key[0] == "udp") == 2
+    assert cache.get(("udp", 2), lambda: "fresh") == "fresh"  # does not join the stale query
+    fetch.release.set()
+    leader.join()
+    assert cache.get(("udp", 2), lambda: "refetched") == "fresh"  # the stale answer was not stored
+    assert cache.get(("udp", 1), lambda: "new") == "new"
+    assert cache.get(("ttn", 1), lambda: "refetched") == "other"
+
+
+def test_lru_eviction():
+    cache = QueryCache(60, max_entries=2)
+    cache.get("a", lambda: 1)
+    cache.get("b", lambda: 2)
+    cache.get("a", lambda: 0)  # a is now the most recently used
+    cache.get("c", lambda: 3)
+    assert cache.get("a", lambda: 0) == 1
+    assert cache.get("b", lambda: "refetched") == "refetched"
+    assert cache.stats()["evictions"] == 2
+
+
+def test_errors_reach_every_waiter_and_are_not_cached():
+    cache, fetch = QueryCache(60), SlowFetch(ConnectionError("influx down"))
+    futures = _concurrently(4, lambda: cache.get("k", fetch))
+    _wait_for_waiters(cache, 3)
+    fetch.release.set()
+    for future in futures:
+        with pytest.raises(ConnectionError):
+            future.result()
+    assert fetch.calls == 1 and cache.stats()["size"] == 0
+    assert cache.get("k", lambda: "recovered") == "recovered"
+
+
+def test_waiter_timeout():
+    cache, fetch = QueryCache(60), SlowFetch()
+    leader = threading.Thread(target=cache.get, args=("k", fetch))
+    leader.start()
+    assert fetch.started.wait(5)
+    with pytest.raises(TimeoutError):
+        cache.get("k", fetch, timeout_s=0.05)
+    fetch.release.set()
+    leader.join()
+
+
+@pytest.fixture
+def targets(influx, monkeypatch):
+    now = datetime.now(timezone.utc)
+    targets = [Target("imei", f"CACHE{i:010d}", "signal") for i in range(4)]
+    with ClientRuntime(influx.url, "token", config.INFLUX_ORG) as runtime:
+        for target in targets:
+            influx.add_point("udp", "signal", 26, {"imei": target.value}, now - timedelta(minutes=5))
+        monkeypatch.setattr(checks, "runtime", runtime)
+        monkeypatch.setattr(checks, "freshness", QueryCache(60))
+        yield targets
+
+
+def test_freshness_checks_reach_influx_once_per_device(influx, targets):
+    burst = [targets[i % len(targets)] for i in range(32)]
+    with ThreadPoolExecutor(32) as pool:
+        times = list(pool.map(checks.cached_latest_time, burst))
+    assert influx.queries == len(targets)
+    assert all(t is not None for t in times)
+
+
+def test_a_send_invalidates_only_its_device(influx, targets):
+    for target in targets[:2]:
+        checks.cached_latest_time(target)
+    checks.sent_to("imei", targets[0].value)
+    before = influx.queries
+    checks.cached_latest_time(targets[0])
+    checks.cached_latest_time(targets[1])
+    assert influx.queries - before == 1
@@ -0,0 +1,127 @@
+import json
+import os
+import random
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from uptime_monitor import rollups, store
+
+START = datetime(2025, 11, 20, tzinfo=timezone.utc)
+
+
+def _entries(count, start=START, step=timedelta(minutes=37), seed=1):
+    rng = random.Random(seed)
+    entries = []
+    for i in range(count):
+        ts = start + i * step
+        text = ts.isoformat(timespec="milliseconds").replace("+00:00", "Z") if i % 2 else ts.isoformat()
+        entries.append({"timestamp": text, "udp": rng.random() > 0.1, "ttn": rng.random() > 0.2,
+                        **({"udpIngestion": rng.randint(200, 9000)} if i % 3 == 0 else {})})
+    return entries
+
+
+def _append(directory, entries):
+    with store.SegmentedLog(directory, fsync="never") as log:
+        log.append_batch(entries)
+
+
+def _rollup_bytes(directory):
+    rollup_dir = os.path.join(directory, rollups.ROLLUP_DIRNAME)
+    return {name: open(os.path.join(rollup_dir, name), "rb").read() for name in os.listdir(rollup_dir)}
+
+
+@pytest.fixture
+def log_dir(tmp_path):
+    return str(tmp_path / "uptime-log")
+
+
+def test_initial_catch_up_matches_a_full_recompute(log_dir):
+    _append(log_dir, _entries(3000))  # spans three months
+    assert rollups.Rollups(log_dir).catch_up() == 3000
+    assert rollups.verify(log_dir)
+    assert rollups.Rollups(log_dir).catch_up() == 0
+
+
+def test_incremental_catch_ups_match_a_full_recompute(log_dir):
+    entries = _entries(2000)
+    for chunk in range(0, len(entries), 300):
+        _append(log_dir, entries[chunk:chunk + 300])
+        assert rollups.Rollups(log_dir).catch_up() == len(entries[chunk:chunk + 300])
+        assert rollups.verify(log_dir)
+
+
+def test_resumes_from_the_offsets_file(log_dir):
+    entries = _entries(1500)
+    _append(log_dir, entries[:1000])
+    rollups.Rollups(log_dir).catch_up()
+    with open(os.path.join(log_dir, rollups.ROLLUP_DIRNAME, rollups.HINTS_FILE)) as f:
+        hints = json.load(f)["offsets"]
+    assert hints == {key: os.path.getsize(store.SegmentedLog(log_dir).segment_path(key))
+                     for key in store.SegmentedLog(log_dir).segments()}
+
+    _append(log_dir, entries[1000:])
+    assert rollups.Rollups(log_dir).catch_up() == 500  # a new reader starts at the recorded offsets
+    assert rollups.verify(log_dir)
+
+
+@pytest.mark.parametrize("hints", ["missing", "stale"])
+def test_lost_or_stale_offsets_never_count_twice(log_dir, hints):
+    """The per-month watermarks are authoritative; offsets.json is only a hint."""
+    _append(log_dir, _entries(1200))
+    rollups.Rollups(log_dir).catch_up()
+    path = os.path.join(log_dir, rollups.ROLLUP_DIRNAME, rollups.HINTS_FILE)
+    if hints == "missing":
+        os.remove(path)
+    else:
+        with open(path, "w") as f:
+            json.dump({"version": rollups.FORMAT_VERSION, "offsets": {}}, f)
+    before = _rollup_bytes(log_dir)
+    assert rollups.Rollups(log_dir).catch_up() == 0
+    assert rollups.verify(log_dir)
+    assert {k: v for k, v in _rollup_bytes(log_dir).items() if k != rollups.HINTS_FILE} == \
+           {k: v for k, v in before.items() if k != rollups.HINTS_FILE}
+
+
+def test_late_and_out_of_order_entries(log_dir):
+    entries = _entries(1500)
+    _append(log_dir, entries)
+    rollups.Rollups(log_dir).catch_up()
+    last = store.parse_timestamp(entries[-1]["timestamp"])
+    late = [
+        {"timestamp": (last - timedelta(hours=5)).isoformat(), "udp": False},  # an earlier hour, same month
+        {"timestamp": (START + timedelta(hours=1)).isoformat(), "ttn": False, "udpIngestion": 12},  # an older month
+        {"timestamp": last.isoformat(), "udp": True},  # the same hour again
+    ]
+    _append(log_dir, late)
+    assert rollups.Rollups(log_dir).catch_up() == 3
+    assert rollups.verify(log_dir)
+
+
+def test_torn_last_line_waits_for_its_newline(log_dir):
+    entries = _entries(200)
+    _append(log_dir, entries)
+    segment = store.SegmentedLog(log_dir).segment_path(store.SegmentedLog(log_dir).segments()[-1])
+    line = json.dumps({"timestamp": entries[-1]["timestamp"], "udp": False}) + "\n"
+    with open(segment, "a") as f:
+        f.write(line[:20])  # a write in progress
+    assert rollups.Rollups(log_dir).catch_up() == 200
+    with open(segment, "a") as f:
+        f.write(line[20:])
+    assert rollups.Rollups(log_dir).catch_up() == 1
+    assert rollups.verify(log_dir)
+
+
+def test_window_uptime_matches_the_raw_entries(log_dir):
+    entries = _entries(3000)
+    _append(log_dir, entries)
+    reader = rollups.Rollups(log_dir)
+    reader.catch_up()
+    start, end = START + timedelta(days=10, hours=3), START + timedelta(days=50, hours=7)  # whole hours
+    in_window = [e for e in entries if start <= store.parse_timestamp(e["timestamp"]) < end]
+    result = reader.uptime("udp", start, end)
+    assert (result.up, result.total) == (sum(e["udp"] for e in in_window), len(in_window))
+    samples = [e["udpIngestion"] for e in in_window if "udpIngestion" in e]
+    count, low, high, mean = reader.series_stats("udpIngestion", start, end)
+    assert (count, low, high) == (len(samples), min(samples), max(samples))
+    assert mean == pytest.approx(sum(samples) / len(samples))
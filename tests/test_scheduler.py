@@ -0,0 +1,116 @@
+import asyncio
+import random
+
+import pytest
+
+from uptime_monitor.probes import Probe
+from uptime_monitor.scheduler import Job, Scheduler
+
+INTERVAL_S = 10.0
+
+
+class TimedProbe:
+    """A probe that takes ``durations[i]`` fake seconds on run ``i`` and stops the scheduler after them."""
+
+    def __init__(self, clock, durations, stop):
+        self.clock, self.durations, self.stop = clock, list(durations), stop
+        self.starts = []
+
+    async def __call__(self):
+        self.starts.append(self.clock())
+        self.clock.now += self.durations[len(self.starts) - 1]
+        if len(self.starts) == len(self.durations):
+            self.stop.set()
+        return True
+
+
+def _schedule(clock, durations, jitter=0.0, rng=None, **options):
+    async def main():
+        stop = asyncio.Event()
+        timed = TimedProbe(clock, durations, stop)
+        job = Job(Probe("udp", timed, 60), INTERVAL_S, jitter, **options)
+        results = []
+        await Scheduler([job], results.append, rng, clock, clock.sleep).run(stop)
+        return timed.starts, job, results
+
+    return asyncio.run(main())
+
+
+def test_runs_on_the_grid(clock):
+    starts, job, results = _schedule(clock, [1, 2, 3, 0])
+    assert starts == [0, 10, 20, 30]
+    assert (job.runs, job.missed_ticks, len(results)) == (4, 0, 4)
+
+
+@pytest.mark.parametrize("missed, expected", [
+    ("skip", [0, 40, 50]),              # wait for the next grid tick
+    ("once", [0, 35, 40, 50]),          # one run right away for all three missed ticks
+    ("all", [0, 35, 35, 35, 40, 50]),   # one run per missed tick, back to back
+])
+def test_missed_tick_policies(clock, missed, expected):
+    durations = [35] + [0] * (len(expected) - 1)  # the first run overruns ticks 1, 2 and 3
+    starts, job, _ = _schedule(clock, durations, missed=missed)
+    assert starts == expected
+    assert job.missed_ticks == 3
+
+
+def test_catch_up_is_bounded(clock):
+    starts, job, _ = _schedule(clock, [95] + [0] * 4, missed="all", max_catch_up=3)
+    assert starts == [0, 95, 95, 95, 100]  # ticks 7, 8 and 9 of the nine missed
+    assert job.missed_ticks == 9
+
+
+def test_a_run_that_ends_exactly_on_a_tick_misses_nothing(clock):
+    starts, job, _ = _schedule(clock, [10, 0])
+    assert starts == [0, 10] and job.missed_ticks == 0
+
+
+def test_jitter_stays_within_its_fraction_of_the_interval(clock):
+    jitter = 0.3
+    starts, _, _ = _schedule(clock, [0.5] * 200, jitter, random.Random(4))
+    offsets = [start - i * INTERVAL_S for i, start in enumerate(starts)]
+    assert all(0 <= offset < jitter * INTERVAL_S for offset in offsets)
+    assert max(offsets) - min(offsets) > jitter * INTERVAL_S / 2  # actually spread, not a constant delay
+
+
+def test_stop_ends_a_wait_without_another_run():
+    async def main():
+        stop, runs = asyncio.Event(), []
+
+        async def probe():
+            runs.append(1)
+            return True
+
+        job = Job(Probe("udp", probe, 60), 3600, jitter=0)
+        running = asyncio.ensure_future(Scheduler([job], lambda result: None).run(stop))
+        await asyncio.sleep(0.05)
+        stop.set()
+        await asyncio.wait_for(running, 1)
+        return runs
+
+    assert asyncio.run(main()) == [1]
+
+
+def test_stop_during_a_run_still_records_its_result():
+    async def main():
+        stop, results = asyncio.Event(), []
+
+        async def probe():
+            stop.set()  # e.g. SIGTERM while the probe is in flight
+            await asyncio.sleep(0.01)
+            return False
+
+        jobs = [Job(Probe("udp", probe, 60), 3600, jitter=0), Job(Probe("rollups", probe, 60), 3600, jitter=0, record=False)]
+        scheduler = Scheduler(jobs, results.append)
+        await asyncio.wait_for(scheduler.run(stop), 1)
+        return results, scheduler.stats()
+
+    results, stats = asyncio.run(main())
+    assert [(r.name, r.ok) for r in results] == [("udp", False)]  # jobs with record=False are not logged
+    assert stats["udp"]["runs"] == stats["rollups"]["runs"] == 1 and stats["udp"]["failures"] == 1
+
+
+@pytest.mark.parametrize("options", [{"missed": "later"}, {"interval_s": 0}])
+def test_invalid_jobs_are_rejected(options):
+    with pytest.raises(ValueError):
+        Job(Probe("udp", None, 60), **{"interval_s": 60, **options})
@@ -0,0 +1,73 @@
+import random
+
+import pytest
+
+from uptime_monitor.sketch import RELATIVE_ACCURACY, QuantileSketch
+
+QS = (0, 0.01, 0.25, 0.5, 0.9, 0.95, 0.99, 0.999, 1)
+
+
+def _sketch(values):
+    sketch = QuantileSketch()
+    for value in values:
+        sketch.add(value)
+    return sketch
+
+
+def _distributions():
+    rng = random.Random(11)
+    yield "uniform", [rng.uniform(50, 5000) for _ in range(5000)]
+    yield "lognormal", [rng.lognormvariate(6, 1.5) for _ in range(5000)]
+    yield "bimodal", [rng.gauss(40, 5) if rng.random() < 0.9 else rng.gauss(30000, 2000) for _ in range(5000)]
+    yield "constant", [1234.0] * 100
+    yield "tiny", [0.003, 7.0, 86_400_000.0]
+
+
+@pytest.mark.parametrize("name, values", list(_distributions()), ids=[name for name, _ in _distributions()])
+def test_quantiles_are_within_the_relative_accuracy(name, values):
+    exact = sorted(values)
+    estimates = _sketch(values).quantiles(QS)
+    for q, estimate in zip(QS, estimates):
+        expected = exact[int(q * (len(exact) - 1))]
+        assert abs(estimate - expected) <= RELATIVE_ACCURACY * expected * (1 + 1e-9), (q, estimate, expected)
+
+
+def test_zero_and_negative_values_go_to_the_zero_bucket():
+    sketch = _sketch([0, -3, 0, 10, 20])
+    assert sketch.count == 5
+    assert sketch.quantiles((0, 0.5, 1)) == [0.0, 0.0, pytest.approx(20, rel=RELATIVE_ACCURACY)]
+
+
+def test_merge_equals_one_sketch_of_all_samples_in_any_grouping():
+    rng = random.Random(5)
+    parts = [[rng.lognormvariate(5, 2) for _ in range(rng.randrange(0, 400))] for _ in range(6)]
+    parts.append([0.0, -1.0])
+    parts.append([])
+    everything = _sketch(v for part in parts for v in part).data
+
+    left = QuantileSketch.merged([_sketch(parts[0]), QuantileSketch.merged(_sketch(p) for p in parts[1:])])
+    right = QuantileSketch.merged([QuantileSketch.merged(_sketch(p) for p in parts[:-3]),
+                                   QuantileSketch.merged(_sketch(p) for p in parts[-3:])])
+    shuffled = parts[:]
+    rng.shuffle(shuffled)
+    reordered = QuantileSketch.merged(_sketch(p) for p in shuffled)
+    assert left.data == right.data == reordered.data == everything
+
+
+def test_merging_into_a_narrower_range_extends_both_ends():
+    middle, wide = _sketch([100, 200]), _sketch([1, 100_000])
+    middle.merge(wide)
+    assert middle.data == _sketch([100, 200, 1, 100_000]).data
+
+
+def test_empty_sketch_has_no_quantiles():
+    assert QuantileSketch().quantiles((0.5, 0.99)) == [None, None]
+    assert QuantileSketch().quantile(0.5) is None
+
+
+@pytest.mark.parametrize("q", [-0.01, 1.01, 95, float("nan")])
+def test_quantiles_outside_zero_to_one_are_rejected(q):
+    with pytest.raises(ValueError):
+        _sketch([1, 2, 3]).quantile(q)
+    with pytest.raises(ValueError):
+        QuantileSketch().quantiles((0.5, q))
@@ -0,0 +1,110 @@
+import json
+import os
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from uptime_monitor import store
+
+START = datetime(2025, 5, 20, tzinfo=timezone.utc)
+
+
+def _entries(count, start=START, step=timedelta(days=1)):
+    return [{"timestamp": (start + i * step).isoformat(), "udp": i % 3 != 0, "ttn": True} for i in range(count)]
+
+
+def test_append_and_read_back_in_order(tmp_path):
+    entries = _entries(40)
+    with store.SegmentedLog(str(tmp_path)) as log:
+        log.append(entries[0])
+        log.append_batch(entries[1:])
+    assert log.segments() == ["2025-05", "2025-06"]
+    assert store.load_entries(str(tmp_path)) == entries
+
+
+def test_day_rotation_and_z_timestamps(tmp_path):
+    entry = {"timestamp": "2025-06-01T23:59:59.000Z", "udp": True}
+    with store.SegmentedLog(str(tmp_path), rotation="day") as log:
+        log.append(entry)
+    assert log.segments() == ["2025-06-01"]
+    assert store.load_entries(str(tmp_path)) == [entry]
+
+
+def test_read_window_skips_segments_outside_it(tmp_path):
+    entries = _entries(60)
+    with store.SegmentedLog(str(tmp_path)) as log:
+        log.append_batch(entries)
+    with open(tmp_path / "2025-05.jsonl", "a") as f:  # misfiled: only found if May is opened
+        f.write(json.dumps({"timestamp": "2025-06-05T00:00:00+00:00", "udp": False}) + "\n")
+    since, until = datetime(2025, 6, 3, tzinfo=timezone.utc), datetime(2025, 6, 10, tzinfo=timezone.utc)
+    found = list(store.read_entries(str(tmp_path), since, until))
+    assert [e["timestamp"] for e in found] == [e["timestamp"] for e in entries[14:21]]
+
+
+def test_torn_last_line_is_skipped(tmp_path):
+    entries = _entries(5)
+    store.SegmentedLog(str(tmp_path)).append_batch(entries)
+    with open(tmp_path / "2025-05.jsonl", "a") as f:
+        f.write('{"timestamp": "2025-05-25T00:0')
+    assert store.load_entries(str(tmp_path)) == entries
+    log = store.SegmentedLog(str(tmp_path))
+    assert [entry for _, entry in log.read_from("2025-05")] == entries
+
+
+def test_read_from_resumes_at_the_returned_offset(tmp_path):
+    entries = _entries(6, step=timedelta(hours=1))
+    log = store.SegmentedLog(str(tmp_path))
+    log.append_batch(entries[:4])
+    offset, _ = list(log.read_from("2025-05"))[-1]
+    log.append_batch(entries[4:])
+    assert [entry for _, entry in log.read_from("2025-05", offset)] == entries[4:]
+
+
+@pytest.fixture
+def legacy(tmp_path):
+    """A legacy array spanning two months, and a segment directory already holding newer entries."""
+    old, new = _entries(30), _entries(5, START + timedelta(days=30))
+    source = tmp_path / store.LEGACY_LOG_FILE
+    source.write_text(json.dumps(old, indent=2))
+    directory = str(tmp_path / "uptime-log")
+    store.SegmentedLog(directory).append_batch(new)
+    return str(source), directory, old + new
+
+
+def test_migrate_puts_legacy_entries_first_and_removes_the_source(legacy):
+    source, directory, expected = legacy
+    assert store.migrate_json_array(source, directory) == 30
+    assert store.load_entries(directory) == expected
+    assert not os.path.exists(source) and not os.path.exists(source + store.MIGRATING_SUFFIX)
+    assert store.migrate_json_array(source, directory) == 0
+    assert store.load_entries(directory) == expected
+
+
+def test_migrate_with_keep_source_is_idempotent(legacy):
+    source, directory, expected = legacy
+    store.migrate_json_array(source, directory, remove_source=False)
+    store.migrate_json_array(source, directory, remove_source=False)
+    assert store.load_entries(directory) == expected
+    assert os.path.exists(source)
+
+
+def test_interrupted_migration_resumes_without_duplicates(legacy, monkeypatch):
+    source, directory, expected = legacy
+    real_replace, replaced = os.replace, []
+
+    def crash_on_second_segment(src, dst):
+        if src.endswith(".tmp"):
+            replaced.append(dst)
+            if len(replaced) == 2:
+                raise OSError("disk full")
+        real_replace(src, dst)
+
+    monkeypatch.setattr(store.os, "replace", crash_on_second_segment)
+    with pytest.raises(OSError):
+        store.migrate_json_array(source, directory)
+    monkeypatch.setattr(store.os, "replace", real_replace)
+    assert not os.path.exists(source) and os.path.exists(source + store.MIGRATING_SUFFIX)
+
+    assert store.migrate_json_array(source, directory) == 30
+    assert store.load_entries(directory) == expected
+    assert not os.path.exists(source + store.MIGRATING_SUFFIX)
@@ -0,0 +1,90 @@
+import json
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from uptime_monitor import store, tail
+
+NOW = datetime(2026, 3, 1, 12, 0, tzinfo=timezone.utc)
+
+
+def _entries(count=200, step=timedelta(minutes=7)):
+    start = NOW - count * step
+    return [{"timestamp": (start + i * step).isoformat(), "udp": i % 3 != 0, "ttn": i % 5 != 0,
+             **({"udpIngestion": 1200 + i} if i % 4 == 0 else {})} for i in range(count)]
+
+
+def _write_segments(directory, entries):
+    with store.SegmentedLog(str(directory)) as log:
+        for entry in entries:
+            log.append(entry)
+    return str(directory)
+
+
+@pytest.fixture
+def entries():
+    return _entries()
+
+
+@pytest.fixture(params=["segments", "jsonl", "legacy", "compact"])
+def source(request, tmp_path, entries):
+    if request.param == "segments":
+        return _write_segments(tmp_path / "uptime-log", entries)
+    if request.param == "jsonl":
+        path = tmp_path / "log.jsonl"
+        path.write_text("".join(json.dumps(e) + "\n" for e in entries))
+    else:
+        path = tmp_path / "uptime-log.json"
+        path.write_text(json.dumps(entries, indent=2 if request.param == "legacy" else None))
+    return str(path)
+
+
+def test_reverse_lines_across_block_boundaries(tmp_path):
+    path = tmp_path / "lines.txt"
+    lines = [f"line {i} " + "x" * (i % 13) for i in range(500)]
+    path.write_text("\n".join(lines))
+    assert [line.decode() for line in tail.reverse_lines(str(path), block_size=7)] == lines[::-1]
+
+
+def test_reverse_entries_newest_first(source, entries):
+    assert list(tail.reverse_entries(source)) == entries[::-1]
+
+
+@pytest.mark.parametrize("count", [1, 3, 10])
+def test_last_results_match_a_full_scan(source, entries, count):
+    expected = {service: [e[service] for e in reversed(entries)][:count] for service in ("udp", "ttn")}
+    assert tail.last_results(["udp", "ttn"], count, source) == expected
+
+
+def test_last_results_ignore_numeric_series(tmp_path, entries):
+    source = _write_segments(tmp_path / "uptime-log", entries)
+    assert tail.last_results(["udpIngestion"], 3, source) == {"udpIngestion": []}
+
+
+def test_last_zero_reads_nothing(tmp_path, capsys):
+    missing = str(tmp_path / "does-not-exist")
+    assert tail.last_results(["udp"], 0, missing) == {"udp": []}
+    assert tail.main(["--last", "0", "--service", "udp", "--source", missing]) == 0
+    assert capsys.readouterr().out.strip() == "udp: -"
+
+
+@pytest.mark.parametrize("minutes", [5, 60, 600])
+def test_recent_matches_a_full_scan(source, entries, minutes):
+    since = NOW - timedelta(minutes=minutes)
+    expected = [e for e in reversed(entries) if store.parse_timestamp(e["timestamp"]) >= since]
+    assert tail.recent(since, source) == expected
+
+
+def test_recent_tolerates_writers_out_of_order_within_the_slack(tmp_path):
+    entries = _entries(20, timedelta(minutes=1))
+    entries[-3], entries[-2] = entries[-2], entries[-3]  # appended a few seconds out of order
+    source = _write_segments(tmp_path / "uptime-log", entries)
+    since = store.parse_timestamp(entries[-3]["timestamp"])  # behind an older entry in the file
+    found = [e["timestamp"] for e in tail.recent(since, source)]
+    assert found == [entries[-1]["timestamp"], entries[-3]["timestamp"]]
+
+
+def test_torn_last_line_is_skipped(tmp_path, entries):
+    path = tmp_path / "log.jsonl"
+    path.write_text("".join(json.dumps(e) + "\n" for e in entries) + '{"timestamp": "2026-03-01T12:0')
+    assert next(tail.reverse_entries(str(path))) == entries[-1]
@@ -0,0 +1,99 @@
+import socket
+import threading
+
+import pytest
+
+from uptime_monitor import store, udp_rtt
+from uptime_monitor.deadline import Deadline
+
+TIMEOUT_S = 0.3
+ECHO_DELAY_S = 0.002
+
+
+def _targets(edge):
+    return [udp_rtt.parse_target(a) for a in edge.addresses]
+
+
+def test_parse_target():
+    assert udp_rtt.parse_target(" 10.0.0.5:7 ") == ("10.0.0.5", 7)
+    assert udp_rtt.parse_target("[::1]:9000") == ("::1", 9000)
+    for bad in ("10.0.0.5", "host:port", ":7"):
+        with pytest.raises(ValueError):
+            udp_rtt.parse_target(bad)
+
+
+def test_every_echo_is_matched(udp_echo):
+    edge = udp_echo(50, delay_s=ECHO_DELAY_S)
+    report = udp_rtt.probe_targets(_targets(edge), count=3, timeout_s=TIMEOUT_S)
+    assert [t.target for t in report.targets] == edge.addresses
+    assert all(t.sent == 3 and t.received == 3 for t in report.targets)
+    assert report.loss_pct == 0 and report.unmatched == 0
+    # the echo leaves ECHO_DELAY_S after it arrived; the margin absorbs float rounding only
+    assert all(r >= ECHO_DELAY_S * 1000 * 0.99 for t in report.targets for r in t.rtts_ms)
+
+
+def test_an_unresolvable_host_fails_only_its_target(udp_echo):
+    edge = udp_echo(3)
+    targets = _targets(edge)
+    report = udp_rtt.probe_targets([targets[0], ("edge.invalid", 7), *targets[1:]], count=2, timeout_s=TIMEOUT_S)
+    bad = report.targets[1]
+    assert bad.target == "edge.invalid:7" and bad.sent == 0 and bad.loss_pct == 100
+    assert "edge.invalid" in bad.error
+    assert all(t.received == 2 and t.error is None for t in report.targets[:1] + report.targets[2:])
+
+
+def test_hundreds_of_targets_well_under_a_second(udp_echo):
+    edge = udp_echo(300, delay_s=ECHO_DELAY_S, jitter_s=0.005, silent=30)
+    report = udp_rtt.probe_targets(_targets(edge), count=3, timeout_s=TIMEOUT_S)
+    assert report.elapsed_s < 1.0
+    live, down = report.targets[:270], report.targets[270:]
+    assert all(t.received == 3 for t in live) and all(t.loss_pct == 100 for t in down)
+
+
+def test_loss_and_duplicates(udp_echo):
+    edge = udp_echo(200, loss=0.1, duplicate=0.2, seed=3)
+    report = udp_rtt.probe_targets(_targets(edge), count=3, timeout_s=TIMEOUT_S)
+    assert 5 <= report.loss_pct <= 15
+    assert all(t.received <= t.sent for t in report.targets)
+    assert report.unmatched > 0  # the second copies, never counted as replies
+
+
+def test_stragglers_past_the_timeout_are_lost(udp_echo):
+    edge = udp_echo(10, delay_s=2 * TIMEOUT_S)
+    report = udp_rtt.probe_targets(_targets(edge), count=1, timeout_s=TIMEOUT_S)
+    assert report.received == 0 and report.loss_pct == 100
+    assert report.elapsed_s < 2 * TIMEOUT_S
+
+
+def test_deadline_ends_the_run(udp_echo):
+    edge = udp_echo(10, silent=10)
+    report = udp_rtt.probe_targets(_targets(edge), count=1, timeout_s=30, deadline=Deadline.after(0.2))
+    assert report.received == 0 and report.elapsed_s < 0.3
+
+
+def test_replies_from_the_wrong_address_do_not_count():
+    """A third party that learns a nonce cannot answer for the target."""
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as target, \
+            socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as spoofer:
+        target.bind(("127.0.0.1", 0))
+        spoofer.bind(("127.0.0.1", 0))
+
+        def forward():
+            data, sender = target.recvfrom(2048)
+            spoofer.sendto(data, sender)
+
+        thread = threading.Thread(target=forward)
+        thread.start()
+        report = udp_rtt.probe_targets([target.getsockname()], count=1, timeout_s=TIMEOUT_S)
+        thread.join()
+    assert report.received == 0 and report.unmatched == 1
+
+
+def test_main_logs_the_summary(tmp_path, capsys, udp_echo):
+    edge = udp_echo(5, silent=1)
+    assert udp_rtt.main(["--target", *edge.addresses, "--timeout", str(TIMEOUT_S), "--count", "2", "--log",
+                         "--dir", str(tmp_path)]) == 0
+    (entry,) = store.read_entries(str(tmp_path))
+    assert entry["udpRttLoss"] == 20.0 and entry["udpRttDown"] == 1
+    assert {"udpRttP50", "udpRttP95"} <= set(entry)
+    assert "1 unreachable" in capsys.readouterr().out
@@ -1,27 +1,19 @@
 import { test, expect } from '@playwright/test';
 import dotenv from 'dotenv';
 import fs from 'fs';
+import path from 'path';
 
 dotenv.config({ path: 'users.env' });
 
-const logFile = './uptime-log.json';
+const logDir = './uptime-log';
 const MAX_RETRIES = 5;
 const ATTEMPT_TIMEOUT_MS = 30000; // 30 seconds per attempt
 
-function logUptime(entry: Record<string, boolean>) {
+// Append one JSON line to the monthly segment (see uptime_monitor/store.py)
+function logUptime(entry: Record<string, boolean | number>) {
   const record = { timestamp: new Date().toISOString(), ...entry };
-  let data = [];
-
-  if (fs.existsSync(logFile)) {
-    try {
-      data = JSON.parse(fs.readFileSync(logFile, 'utf8'));
-    } catch (e) {
-      console.error('Error reading uptime-log.json:', e);
-    }
-  }
-
-  data.push(record);
-  fs.writeFileSync(logFile, JSON.stringify(data, null, 2));
+  fs.mkdirSync(logDir, { recursive: true });
+  fs.appendFileSync(path.join(logDir, `${record.timestamp.slice(0, 7)}.jsonl`), JSON.stringify(record) + '\n');
 }
 
 test('Check Cloud Uptime with Retry', async ({ page }) => {
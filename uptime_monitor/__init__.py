@@ -0,0 +1 @@
+"""Shared building blocks for the uptime probe scripts."""
@@ -0,0 +1,213 @@
+"""Streaming alert state machine for consecutive-failure detection.
+
+Each boolean result updates a small per-service state in O(1):
+
+* the current streak (up or down) and its length
+* when the streak started, which is the last up/down transition
+* the last 64 results as a failure bitmask
+
+Rules are evaluated against that state only:
+
+* ``Consecutive(3)``: the last 3 results failed, like ``hasThreeConsecutiveFails`` in ``analyse.ts``
+* ``MOfN(5, 10)``: at least 5 of the last 10 results failed
+* ``DownFor(hours=3)``: failing without a success for at least 3 hours
+
+The state and a per-segment read watermark are kept in
+``uptime-log/alert-state.json``. Catching up only reads the lines appended
+since the last call, including those written by the Playwright tests, so
+evaluation cost does not depend on the size of the log. Events are emitted
+only when a rule starts or stops firing.
+
+Usage::
+
+    python -m uptime_monitor.alerts [--dir uptime-log]   # catch up, print firing rules, exit 1 if any
+"""
+
+import argparse
+import json
+import os
+import sys
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, NamedTuple, Optional, Sequence
+
+from . import config, store
+
+STATE_FILE = "alert-state.json"
+HISTORY_BITS = 64  # results remembered for M-of-N rules
+_catch_up_lock = threading.Lock()  # probes of one process log from worker threads
+
+
+class ServiceState:
+    __slots__ = ("ok", "streak", "since", "last", "failures", "firing")
+
+    def __init__(self, ok: Optional[bool] = None, streak: int = 0, since: Optional[str] = None,
+                 last: Optional[str] = None, failures: int = 0, firing: Optional[List[str]] = None):
+        self.ok = ok              # result of the current streak
+        self.streak = streak      # length of the current streak
+        self.since = since        # timestamp of the first result of the streak (last transition)
+        self.last = last          # timestamp of the latest result
+        self.failures = failures  # bit i set = the i-th most recent result failed
+        self.firing = firing or []
+
+    def record(self, ok: bool, timestamp: str) -> None:
+        if ok == self.ok:
+            self.streak += 1
+        else:
+            self.ok, self.streak, self.since = ok, 1, timestamp
+        self.last = timestamp
+        self.failures = ((self.failures << 1) | (not ok)) & ((1 << HISTORY_BITS) - 1)
+
+    def to_json(self) -> Dict:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+class Consecutive(NamedTuple):
+    count: int = 3
+
+    @property
+    def name(self) -> str:
+        return f"{self.count} consecutive failures"
+
+    def firing(self, state: ServiceState, now: datetime) -> bool:
+        return state.ok is False and state.streak >= self.count
+
+
+class MOfN(NamedTuple):
+    failures: int
+    results: int
+
+    @property
+    def name(self) -> str:
+        return f"{self.failures} of the last {self.results} failed"
+
+    def firing(self, state: ServiceState, now: datetime) -> bool:
+        return bin(state.failures & ((1 << self.results) - 1)).count("1") >= self.failures
+
+
+class DownFor(NamedTuple):
+    hours: float = 3.0
+
+    @property
+    def name(self) -> str:
+        return f"down for {self.hours:g}h"
+
+    def firing(self, state: ServiceState, now: datetime) -> bool:
+        return state.ok is False and now - store.parse_timestamp(state.since) >= timedelta(hours=self.hours)
+
+
+DEFAULT_RULES = (Consecutive(3), MOfN(5, 10), DownFor(3))
+
+
+class AlertEvent(NamedTuple):
+    service: str
+    rule: str
+    firing: bool  # False = resolved
+    timestamp: str
+
+
+class AlertEngine:
+    def __init__(self, log_dir: str = config.UPTIME_LOG_DIR, rules: Sequence = DEFAULT_RULES):
+        for rule in rules:
+            if isinstance(rule, MOfN) and not 0 < rule.failures <= rule.results <= HISTORY_BITS:
+                raise ValueError(f"M-of-N rule needs 0 < M <= N <= {HISTORY_BITS}, got {rule}")
+        self.log = store.SegmentedLog(log_dir)
+        self.path = os.path.join(log_dir, STATE_FILE)
+        self.rules = list(rules)
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                saved = json.load(f)
+        except FileNotFoundError:
+            saved = {}
+        self.offsets: Dict[str, int] = saved.get("offsets", {})
+        self.services = {name: ServiceState(**state) for name, state in saved.get("services", {}).items()}
+
+    def record(self, service: str, ok: bool, timestamp: str) -> List[AlertEvent]:
+        """Apply one result and return the rules that started or stopped firing."""
+        state = self.services.setdefault(service, ServiceState())
+        state.record(ok, timestamp)
+        return self._evaluate(service, state, store.parse_timestamp(timestamp), timestamp)
+
+    def _evaluate(self, service: str, state: ServiceState, now: datetime, timestamp: str) -> List[AlertEvent]:
+        events = []
+        for rule in self.rules:
+            firing = rule.firing(state, now)
+            if firing != (rule.name in state.firing):
+                if firing:
+                    state.firing.append(rule.name)
+                else:
+                    state.firing.remove(rule.name)
+                events.append(AlertEvent(service, rule.name, firing, timestamp))
+        return events
+
+    def evaluate(self, now: Optional[datetime] = None) -> List[AlertEvent]:
+        """Re-check time-based rules without a new result (e.g. a service that stopped reporting)."""
+        now = now or datetime.now(timezone.utc)
+        events = []
+        for service, state in self.services.items():
+            events.extend(self._evaluate(service, state, now, now.isoformat()))
+        return events
+
+    def catch_up(self) -> List[AlertEvent]:
+        """Apply every result appended to the log since the last call, then save the state."""
+        events = []
+        for segment in self.log.segments():
+            offset = self.offsets.get(segment, 0)
+            if offset >= os.path.getsize(self.log.segment_path(segment)):
+                continue
+            for offset, entry in self.log.read_from(segment, offset):
+                for service, value in entry.items():
+                    if isinstance(value, bool):
+                        events.extend(self.record(service, value, entry["timestamp"]))
+            self.offsets[segment] = offset
+        self.save()
+        return events
+
+    def firing(self) -> Dict[str, List[str]]:
+        return {name: list(state.firing) for name, state in self.services.items() if state.firing}
+
+    def save(self) -> None:
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        state = {"offsets": self.offsets, "services": {n: s.to_json() for n, s in self.services.items()}}
+        tmp = f"{self.path}.{os.getpid()}.tmp"  # another process may be saving too
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(state, f, separators=(",", ":"))
+        os.replace(tmp, self.path)
+
+
+def catch_up(log_dir: str = config.UPTIME_LOG_DIR) -> List[AlertEvent]:
+    """Catch up the saved state of ``log_dir``; concurrent callers in one process take turns.
+
+    Without the lock, two threads load the same state and both report the
+    events of the lines appended since.
+    """
+    with _catch_up_lock:
+        return AlertEngine(log_dir).catch_up()
+
+
+def report(events: List[AlertEvent]) -> None:
+    for event in events:
+        if event.firing:
+            print(f"🚨 {event.service}: {event.rule} (at {event.timestamp})")
+        else:
+            print(f"✅ {event.service} recovered: {event.rule} resolved at {event.timestamp}")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m uptime_monitor.alerts", description=__doc__.split("\n")[0])
+    parser.add_argument("--dir", default=config.UPTIME_LOG_DIR)
+    args = parser.parse_args(argv)
+
+    engine = AlertEngine(args.dir)
+    report(engine.catch_up() + engine.evaluate())
+    engine.save()
+    firing = engine.firing()
+    for service, rules in firing.items():
+        print(f"❌ {service}: {', '.join(rules)}")
+    if not firing:
+        print("✅ No alerts firing")
+    return 1 if firing else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,272 @@
+"""Compressed cold archive for log months nobody reads line by line any more.
+
+Months that ended more than ``config.ARCHIVE_AFTER_DAYS`` ago are moved
+from ``uptime-log/YYYY-MM.jsonl`` into ``uptime-log/archive/YYYY-MM.blocks``.
+Each file is written once. It holds zlib-compressed blocks of
+``block_entries`` log lines, followed by an index with the first/last
+timestamp, offset and length of every block::
+
+    MAGIC | block 0 | block 1 | ... | index (one _BLOCK per block) | _FOOTER
+
+A reader memory-maps the file, looks at the index and decompresses only the
+blocks that overlap the requested time range. :func:`store.read_entries`
+includes archived months, so rollups, events and windows see the whole
+history. ``analyse.ts`` reads only the ``.jsonl`` segments, so the default
+age stays above its 365-day window.
+
+Usage::
+
+    python -m uptime_monitor.archive archive [--older-than-days 400] [--block-entries 4096]
+    python -m uptime_monitor.archive rebuild [--block-entries 4096]
+    python -m uptime_monitor.archive info
+"""
+
+import argparse
+import json
+import mmap
+import os
+import struct
+import sys
+import zlib
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional
+
+from . import config, store
+
+ARCHIVE_DIRNAME = "archive"
+ARCHIVE_SUFFIX = ".blocks"
+MAGIC = b"UPTARC01"
+COMPRESSION_LEVEL = 9  # written once per month, read rarely: favour size
+
+_BLOCK = struct.Struct("<qqQII")  # first ms, last ms (min/max of the block), offset, length, entries
+_FOOTER = struct.Struct("<QI8s")  # index offset, block count, MAGIC
+
+
+class Block(NamedTuple):
+    first_ms: int
+    last_ms: int
+    offset: int
+    length: int
+    entries: int
+
+
+class Archive:
+    """One archived month, memory-mapped; use as a context manager."""
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self._map) < len(MAGIC) + _FOOTER.size or self._map[:len(MAGIC)] != MAGIC:
+            self.close()
+            raise ValueError(f"{path} is not an uptime log archive")
+        index_offset, count, magic = _FOOTER.unpack_from(self._map, len(self._map) - _FOOTER.size)
+        if magic != MAGIC:
+            self.close()
+            raise ValueError(f"{path} is truncated")
+        self.blocks = [Block(*fields) for fields in
+                       _BLOCK.iter_unpack(self._map[index_offset:index_offset + count * _BLOCK.size])]
+        self.blocks_read = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self) -> None:
+        self._map.close()
+
+    @property
+    def entries(self) -> int:
+        return sum(block.entries for block in self.blocks)
+
+    def lines(self, since_ms: Optional[int] = None, until_ms: Optional[int] = None) -> Iterator[bytes]:
+        """Raw JSON lines of the blocks overlapping ``[since_ms, until_ms)``, in log order."""
+        for block in self.blocks:
+            if (since_ms is not None and block.last_ms < since_ms) or (until_ms is not None and block.first_ms >= until_ms):
+                continue
+            with memoryview(self._map)[block.offset:block.offset + block.length] as view:
+                data = zlib.decompress(view)
+            self.blocks_read += 1
+            yield from data.splitlines()
+
+    def iter_entries(self, since: Optional[datetime] = None, until: Optional[datetime] = None) -> Iterator[Dict]:
+        """Entries with ``since <= timestamp < until``, decompressing only the overlapping blocks."""
+        for line in self.lines(_ms(since), _ms(until)):
+            entry = json.loads(line.decode("utf-8"))
+            if since or until:
+                ts = store.parse_timestamp(entry["timestamp"])
+                if (since and ts < since) or (until and ts >= until):
+                    continue
+            yield entry
+
+
+def _ms(dt: Optional[datetime]) -> Optional[int]:
+    return None if dt is None else int(dt.timestamp() * 1000)
+
+
+def archive_dir(log_dir: str) -> str:
+    return os.path.join(log_dir, ARCHIVE_DIRNAME)
+
+
+def archive_path(log_dir: str, month: str) -> str:
+    return os.path.join(archive_dir(log_dir), month + ARCHIVE_SUFFIX)
+
+
+def months(log_dir: str = config.UPTIME_LOG_DIR) -> List[str]:
+    """Archived months in chronological order."""
+    try:
+        names = os.listdir(archive_dir(log_dir))
+    except FileNotFoundError:
+        return []
+    return sorted(n[:-len(ARCHIVE_SUFFIX)] for n in names if n.endswith(ARCHIVE_SUFFIX))
+
+
+def write_archive(path: str, lines: Iterable[bytes], block_entries: int = config.ARCHIVE_BLOCK_ENTRIES) -> int:
+    """Write complete JSON lines (newline-terminated) as an archive; returns the number of entries.
+
+    Written to a temporary file, fsynced and moved into place, so a crash
+    leaves either the old archive or the new one.
+    """
+    tmp = path + ".tmp"
+    index, block, count = [], [], 0
+    with open(tmp, "wb") as f:
+        f.write(MAGIC)
+
+        def flush() -> None:
+            times = [_ms(store.parse_timestamp(json.loads(line)["timestamp"])) for line in block]
+            data = zlib.compress(b"".join(block), COMPRESSION_LEVEL)
+            index.append(Block(min(times), max(times), f.tell(), len(data), len(block)))
+            f.write(data)
+            block.clear()
+
+        for line in lines:
+            block.append(line)
+            count += 1
+            if len(block) >= block_entries:
+                flush()
+        if block:
+            flush()
+        index_offset = f.tell()
+        f.write(b"".join(_BLOCK.pack(*entry) for entry in index))
+        f.write(_FOOTER.pack(index_offset, len(index), MAGIC))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+    return count
+
+
+def _segment_lines(log: store.SegmentedLog, key: str) -> List[bytes]:
+    """Complete, parseable lines of a segment; a torn last line is dropped like every reader does."""
+    lines = []
+    with open(log.segment_path(key), "rb") as f:
+        for line in f:
+            if not line.endswith(b"\n"):
+                break
+            try:
+                json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            lines.append(line)
+    return lines
+
+
+def _archived_lines(log_dir: str, month: str) -> List[bytes]:
+    path = archive_path(log_dir, month)
+    if not os.path.exists(path):
+        return []
+    with Archive(path) as archive:
+        return [line + b"\n" for line in archive.lines()]
+
+
+def _overlap(archived: List[bytes], fresh: List[bytes]) -> int:
+    """Number of leading ``fresh`` lines that are already the last lines of ``archived``."""
+    if not fresh:
+        return 0
+    for start in range(max(0, len(archived) - len(fresh)), len(archived)):
+        if archived[start] == fresh[0] and archived[start:] == fresh[:len(archived) - start]:
+            return len(archived) - start
+    return 0
+
+
+def archive_segments(log_dir: str = config.UPTIME_LOG_DIR, older_than_days: float = config.ARCHIVE_AFTER_DAYS,
+                     block_entries: int = config.ARCHIVE_BLOCK_ENTRIES,
+                     now: Optional[datetime] = None) -> List[str]:
+    """Move every month that ended more than ``older_than_days`` ago into the archive; returns the months.
+
+    Whole months only, like the segments. A month is written, read back and
+    compared before its segments are deleted. Lines appended to a month that
+    is already archived are merged into it. If a crash left segments whose
+    first lines are the end of the archive, only the lines after them are
+    merged.
+    """
+    cutoff = (now or datetime.now(timezone.utc)) - timedelta(days=older_than_days)
+    log = store.SegmentedLog(log_dir)
+    by_month: Dict[str, List[str]] = {}
+    for key in log.segments():
+        by_month.setdefault(key[:7], []).append(key)
+
+    done = []
+    for month, keys in sorted(by_month.items()):
+        year, mon = int(month[:4]), int(month[5:7])
+        month_end = datetime(year + mon // 12, mon % 12 + 1, 1, tzinfo=timezone.utc)
+        if month_end > cutoff:
+            break
+        fresh = [line for key in keys for line in _segment_lines(log, key)]
+        archived = _archived_lines(log_dir, month)
+        fresh = fresh[_overlap(archived, fresh):]
+        lines = archived + fresh
+        if fresh:
+            os.makedirs(archive_dir(log_dir), exist_ok=True)
+            path = archive_path(log_dir, month)
+            write_archive(path, lines, block_entries)
+            if _archived_lines(log_dir, month) != lines:
+                raise RuntimeError(f"{path} does not read back as written; segments kept")
+            store._fsync_directory(archive_dir(log_dir))
+        for key in keys:
+            os.remove(log.segment_path(key))
+        store._fsync_directory(log_dir)
+        done.append(month)
+    return done
+
+
+def rebuild(log_dir: str = config.UPTIME_LOG_DIR, block_entries: int = config.ARCHIVE_BLOCK_ENTRIES) -> int:
+    """Rewrite every archived month (e.g. with a new block size); returns the number of entries."""
+    total = 0
+    for month in months(log_dir):
+        total += write_archive(archive_path(log_dir, month), _archived_lines(log_dir, month), block_entries)
+    return total
+
+
+def iter_entries(log_dir: str, month: str, since: Optional[datetime] = None,
+                 until: Optional[datetime] = None) -> Iterator[Dict]:
+    """Entries of one archived month within ``since <= timestamp < until``."""
+    with Archive(archive_path(log_dir, month)) as archive:
+        yield from archive.iter_entries(since, until)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m uptime_monitor.archive", description=__doc__.split("\n")[0])
+    parser.add_argument("command", choices=("archive", "rebuild", "info"))
+    parser.add_argument("--dir", default=config.UPTIME_LOG_DIR)
+    parser.add_argument("--older-than-days", type=float, default=config.ARCHIVE_AFTER_DAYS)
+    parser.add_argument("--block-entries", type=int, default=config.ARCHIVE_BLOCK_ENTRIES)
+    args = parser.parse_args(argv)
+
+    if args.command == "archive":
+        done = archive_segments(args.dir, args.older_than_days, args.block_entries)
+        print(f"Archived {', '.join(done)}" if done else "Nothing to archive")
+    elif args.command == "rebuild":
+        print(f"Rebuilt {len(months(args.dir))} archived months ({rebuild(args.dir, args.block_entries)} entries)")
+    else:
+        for month in months(args.dir):
+            path = archive_path(args.dir, month)
+            with Archive(path) as archive:
+                print(f"{month}: {archive.entries} entries in {len(archive.blocks)} blocks, "
+                      f"{os.path.getsize(path) / 1024:.1f} KiB")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
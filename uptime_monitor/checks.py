@@ -0,0 +1,251 @@
+"""Ingestion checks: wait for the probe datapoints in InfluxDB and log the results.
+
+The same UDP and TTN checks run in two modes:
+
+* ``run``: send, then wait for exactly that datapoint (4 hour window, since
+  the UDP payload time is hour-truncated by default)
+* ``check``: wait for the datapoints an earlier ``send`` produced, with the
+  send time read from ``start_time.txt`` (5 minute window)
+
+Importing this module registers the ``run`` probes and the connection-phase
+probe ``phases`` (see ``http_phases.py``), so the scheduler daemon can use
+them (``python -m uptime_monitor.scheduler --module uptime_monitor.checks``).
+
+Every network call of a run gets the remaining part of one :class:`Deadline`
+as its timeout, so a hung connection fails its probe instead of stalling
+the run.
+
+Freshness queries go through :data:`freshness` (see ``query_cache.py``):
+identical queries in flight share one request, and a probe that has just
+sent a datapoint invalidates the answers for its target.
+
+Usage::
+
+    results = run_cycle(build_probes("check", sent_at=read_start_time(), deadline=Deadline.after(60)))
+"""
+
+import asyncio
+import time
+from datetime import datetime, timezone
+from typing import Callable, List, Optional, Tuple, Union
+
+from . import alerts, config, http_phases, logd, metrics, rollups, senders  # http_phases: registers "phases"
+from .clients import ClientRuntime
+from .deadline import Deadline
+from .influx_query import Target, latest_times
+from .polling import poll_until_async
+from .probes import Probe, ProbeResult, probe, run_probes_sync
+from .query_cache import QueryCache
+
+RUN_MAX_AGE_S = 4 * 3600
+CHECK_MAX_AGE_S = 300
+MODES = ("run", "check")
+
+# One pooled client set per process (keep-alive connections are reused across checks)
+runtime = ClientRuntime(config.INFLUX_URL, config.INFLUX_TOKEN, config.INFLUX_ORG)
+# Latest time per (bucket, time range, target), shared by all checks of the process
+freshness = QueryCache(config.FRESHNESS_CACHE_TTL_S, config.FRESHNESS_CACHE_SIZE)
+
+
+def write_uptime_log(success: Union[bool, int], test_name: str = "udp", log_dir: str = config.UPTIME_LOG_DIR):
+    entry = {
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        test_name: success
+    }
+    logd.append_entry(entry, log_dir)
+    alerts.report(alerts.catch_up(log_dir))
+
+
+def read_start_time(path: str = config.START_TIME_FILE) -> Optional[datetime]:
+    try:
+        with open(path, "r") as f:
+            return datetime.fromtimestamp(int(f.read().strip()), timezone.utc)
+    except (OSError, ValueError) as e:
+        print(f"Could not read start time: {e}")
+        return None
+
+
+def _query_timeout(deadline: Optional[Deadline]) -> Optional[float]:
+    return deadline.timeout(cap=config.INFLUX_QUERY_TIMEOUT_S) if deadline is not None else None
+
+
+def cached_latest_time(target: Target, time_range: str = "-4h",
+                       deadline: Optional[Deadline] = None) -> Optional[datetime]:
+    """Newest time of ``target`` through :data:`freshness`; waits for an identical query already in flight."""
+    def fetch() -> Optional[datetime]:
+        runtime.query_api()  # the first call imports and builds the client; its time comes out of the budget
+        with runtime.bounded_query_api(_query_timeout(deadline)) as query_api:
+            return latest_times(query_api, config.INFLUX_BUCKET, [target], time_range)[target]
+
+    return freshness.get((config.INFLUX_BUCKET, time_range, target), fetch, _query_timeout(deadline))
+
+
+def sent_to(tag: str, value: str) -> int:
+    """Drop the freshness answers for a device that was just sent new data; returns how many."""
+    return freshness.invalidate(lambda key: key[2].tag == tag and key[2].value == value)
+
+
+def query_influx_for_imei(imei: str, field: str = "signal", time_range: str = "-4h",
+                          deadline: Optional[Deadline] = None):
+    with metrics.stages.span("udp", "query"):
+        latest_time = cached_latest_time(Target("imei", imei, field), time_range, deadline)
+    if latest_time is not None:
+        print(f"Latest {field} time for IMEI {imei}: {latest_time.isoformat()}")
+    return latest_time
+
+
+def query_influx_for_ttn_dev(dev_eui: str, field: str = "resistance", time_range: str = "-4h",
+                             device_id_field: str = "imei", deadline: Optional[Deadline] = None):
+    with metrics.stages.span("ttn", "query"):
+        latest_time = cached_latest_time(Target(device_id_field, dev_eui, field), time_range, deadline)
+    if latest_time is not None:
+        print(f"Latest {field} time for TTN device {dev_eui}: {latest_time.isoformat()}")
+    return latest_time
+
+
+async def wait_for_datapoint(query: Callable[[], Optional[datetime]], not_before: Optional[datetime],
+                             test_name: str, sent_at: Optional[datetime] = None, polled_at_send: bool = True,
+                             log_dir: str = config.UPTIME_LOG_DIR,
+                             deadline: Optional[Deadline] = None) -> Optional[datetime]:
+    """Poll ``query`` until it returns a time at or after ``not_before`` and log the ingestion latency.
+
+    ``sent_at`` (default ``not_before``) is when the message left. A hit on the
+    first query only bounds the latency when polling started right after the
+    send (``polled_at_send``); otherwise it is logged only if we had to wait.
+    Polling stops after ``INGESTION_DEADLINE_S`` or when ``deadline`` is spent.
+    """
+    if not_before is None:
+        return await asyncio.to_thread(query)
+    sent_at = sent_at or not_before
+    budget_s = config.INGESTION_DEADLINE_S
+    if deadline is not None:
+        budget_s = min(budget_s, deadline.remaining())
+    poll_started = datetime.now(timezone.utc)
+    with metrics.stages.span(test_name, "ingestion") as span:
+        poll = await poll_until_async(query, lambda t: t is not None and t >= not_before, budget_s)
+        span.failed = not poll.visible
+    if not poll.visible:
+        print(f"{test_name.upper()} datapoint sent at {sent_at.isoformat()} not visible within {budget_s:.1f}s")
+    elif polled_at_send or poll.attempts > 1:
+        ingestion_s = max(0.0, (poll_started - sent_at).total_seconds()) + poll.elapsed_s
+        print(f"{test_name.upper()} datapoint visible {ingestion_s:.1f}s after send ({poll.attempts} queries)")
+        # fsync and the alert catch-up would otherwise stall the other probes on this loop
+        await asyncio.to_thread(write_uptime_log, round(ingestion_s * 1000), f"{test_name}Ingestion", log_dir)
+    return poll.value
+
+
+def _window(seconds: int) -> str:
+    if seconds % 3600 == 0:
+        return f"{seconds // 3600} hours"
+    if seconds % 60 == 0:
+        return f"{seconds // 60} minutes"
+    return f"{seconds} seconds"
+
+
+def verify_datapoint(latest_time: Optional[datetime], test_name: str, max_age_s: int = RUN_MAX_AGE_S) -> bool:
+    label, window = test_name.upper(), _window(max_age_s)
+    if latest_time is None:
+        print(f"❌ {label} test: No datapoint received in the last {window}.")
+        return False
+    time_diff = (datetime.now(timezone.utc) - latest_time).total_seconds()
+    if time_diff < max_age_s:
+        print(f"✅ {label} test: Datapoint received within the last {window}.")
+        return True
+    print(f"❌ {label} test: Datapoint is older than {window}.")
+    return False
+
+
+def _verify(latest_time: Optional[datetime], test_name: str, max_age_s: int) -> bool:
+    with metrics.stages.span(test_name, "verify") as span:
+        span.failed = not verify_datapoint(latest_time, test_name, max_age_s)
+    return not span.failed
+
+
+async def udp_check(target: Optional[Tuple[str, int]], sent_at: Optional[datetime], max_age_s: int,
+                    log_dir: str = config.UPTIME_LOG_DIR, deadline: Optional[Deadline] = None) -> bool:
+    """Send a ping to ``target`` and wait for it; with ``target`` None, wait for the one sent at ``sent_at``."""
+    deadline = deadline or Deadline.after(config.PROBE_TIMEOUT_S)
+    not_before = sent_at
+    if target is not None:
+        sent_at = datetime.now(timezone.utc)
+        with metrics.stages.span("udp", "send"):
+            not_before = await asyncio.to_thread(senders.send_udp_ping, config.IMEI, target,
+                                                 config.UDP_TIME_RESOLUTION_S, deadline.timeout())
+        sent_to("imei", config.IMEI)
+    latest_time = await wait_for_datapoint(lambda: query_influx_for_imei(config.IMEI, deadline=deadline), not_before,
+                                           "udp", sent_at, target is not None, log_dir, deadline)
+    return _verify(latest_time, "udp", max_age_s)
+
+
+async def ttn_check(url: Optional[str], sent_at: Optional[datetime], max_age_s: int,
+                    log_dir: str = config.UPTIME_LOG_DIR, deadline: Optional[Deadline] = None) -> bool:
+    """Simulate an uplink at ``url`` and wait for it; with ``url`` None, wait for the one sent at ``sent_at``."""
+    if not config.TTN_API_KEY:
+        raise Exception("TTN_API_KEY not set in environment")
+
+    deadline = deadline or Deadline.after(config.PROBE_TIMEOUT_S)
+    if url is not None:
+        sent_at = datetime.now(timezone.utc)
+        with metrics.stages.span("ttn", "send") as span:
+            span.failed = not await asyncio.to_thread(senders.simulate_ttn_uplink, url, config.TTN_API_KEY,
+                                                      runtime.http.post, deadline.timeout())
+        if span.failed:
+            return False
+        sent_to("hardware_serial", config.TTN_DEV_EUI)
+    latest_time = await wait_for_datapoint(
+        lambda: query_influx_for_ttn_dev(config.TTN_DEV_EUI, device_id_field="hardware_serial", deadline=deadline),
+        sent_at, "ttn", sent_at, url is not None, log_dir, deadline)
+    return _verify(latest_time, "ttn", max_age_s)
+
+
+def build_probes(mode: str, udp_target: Tuple[str, int] = (config.UDP_IP, config.UDP_PORT),
+                 ttn_url: str = config.TTN_SIMULATE_URL, sent_at: Optional[datetime] = None,
+                 log_dir: str = config.UPTIME_LOG_DIR, deadline: Optional[Deadline] = None) -> List[Probe]:
+    """The UDP and TTN probes of one run, sharing ``deadline`` (default: ``RUN_DEADLINE_S`` from now)."""
+    if mode not in MODES:
+        raise ValueError(f"Unknown mode {mode!r}, expected one of {MODES}")
+    deadline = deadline or Deadline.after(config.RUN_DEADLINE_S)
+    if mode == "run":
+        udp = lambda: udp_check(udp_target, None, RUN_MAX_AGE_S, log_dir, deadline)
+        ttn = lambda: ttn_check(ttn_url, None, RUN_MAX_AGE_S, log_dir, deadline)
+    else:
+        udp = lambda: udp_check(None, sent_at, CHECK_MAX_AGE_S, log_dir, deadline)
+        ttn = lambda: ttn_check(None, sent_at, CHECK_MAX_AGE_S, log_dir, deadline)
+    # the probe runner cancels whatever is still awaiting once the deadline has passed
+    timeout_s = deadline.remaining()
+    return [Probe("udp", udp, timeout_s), Probe("ttn", ttn, timeout_s)]
+
+
+def run_cycle(probes: List[Probe], log_dir: str = config.UPTIME_LOG_DIR,
+              metrics_file: Optional[str] = None) -> List[ProbeResult]:
+    """Run ``probes`` concurrently, log every result, then catch up the rollups and close the clients.
+
+    With ``metrics_file``, the stage timings of this run are written there as OpenMetrics text.
+    """
+    start = time.monotonic()
+    results = run_probes_sync(probes, concurrency=config.PROBE_CONCURRENCY)
+    print(f"⏱️ Probes finished in {time.monotonic() - start:.2f}s")
+    for result in results:
+        if result.error:
+            print(f"⚠️ {result.name.upper()} test failed: {result.error}")
+        write_uptime_log(result.ok, result.name, log_dir)
+
+    print(f"Rolled up {rollups.Rollups(log_dir).catch_up()} new log entries")
+    print(f"Connection stats: {runtime.stats()}")
+    print(f"Freshness cache: {freshness.stats()}")
+    runtime.close()
+    if metrics_file:
+        metrics.stages.write(metrics_file)
+    return results
+
+
+# ----------- Probes for the scheduler daemon -----------
+
+@probe("udp", timeout_s=config.PROBE_TIMEOUT_S)
+async def udp_probe(log_dir: str = config.UPTIME_LOG_DIR):
+    return await udp_check((config.UDP_IP, config.UDP_PORT), None, RUN_MAX_AGE_S, log_dir)
+
+
+@probe("ttn", timeout_s=config.PROBE_TIMEOUT_S)
+async def ttn_probe(log_dir: str = config.UPTIME_LOG_DIR):
+    return await ttn_check(config.TTN_SIMULATE_URL, None, RUN_MAX_AGE_S, log_dir)
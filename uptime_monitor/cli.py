@@ -0,0 +1,132 @@
+"""Command-line entry point for the probes: ``python -m uptime_monitor <command>``.
+
+* ``send``: UDP ping and simulated TTN uplink (standard library only)
+* ``check``: wait for the datapoints of an earlier ``send`` and log the results
+* ``run``: send and check in one go
+* ``report``: uptime and latency quantiles per service from the rollups
+* ``phases``: DNS/connect/TLS/first-byte timings of the TTN and Influx endpoints
+
+Each command imports only what it needs, so ``send`` and ``report`` never
+load ``requests`` or the Influx client; ``benchmarks/bench_startup.py``
+keeps it that way.
+
+Usage::
+
+    python -m uptime_monitor send [--only udp]
+    python -m uptime_monitor check [--start-time-file start_time.txt]
+    python -m uptime_monitor report --days 30 365
+    python -m uptime_monitor phases [--endpoint ttn=https://... influx=https://.../ping]
+"""
+
+import argparse
+import sys
+from typing import List, Optional, Tuple
+
+from . import config
+
+
+def _host_port(value: str) -> Tuple[str, int]:
+    host, _, port = value.rpartition(":")
+    if not host or not port.isdigit():
+        raise argparse.ArgumentTypeError(f"expected HOST:PORT, got {value!r}")
+    return host, int(port)
+
+
+def _send(args) -> int:
+    from . import senders
+
+    # A failed send must not fail the workflow step: `check` records it as downtime
+    if "udp" in args.only:
+        try:
+            senders.send_udp_ping(config.IMEI, args.udp)
+        except Exception as e:
+            print(f"⚠️ UDP sending failed: {e}")
+    if "ttn" in args.only:
+        try:
+            senders.simulate_ttn_uplink(args.ttn_url)
+        except Exception as e:
+            print(f"⚠️ TTN sending failed: {e}")
+    return 0
+
+
+def _check(args) -> int:
+    from . import checks
+
+    from .deadline import Deadline
+
+    sent_at = checks.read_start_time(args.start_time_file)
+    probes = checks.build_probes("check", sent_at=sent_at, log_dir=args.dir, deadline=Deadline.after(args.deadline))
+    checks.run_cycle(probes, args.dir, args.metrics_file)
+    return 0
+
+
+def _run(args) -> int:
+    from . import checks
+
+    from .deadline import Deadline
+
+    probes = checks.build_probes("run", udp_target=args.udp, ttn_url=args.ttn_url, log_dir=args.dir,
+                                 deadline=Deadline.after(args.deadline))
+    checks.run_cycle(probes, args.dir, args.metrics_file)
+    return 0
+
+
+def _report(args) -> int:
+    from . import rollups
+
+    print(f"Rolled up {rollups.Rollups(args.dir).catch_up()} new log entries")
+    return rollups.main(["report", "--dir", args.dir, "--days", *map(str, args.days)])
+
+
+def _endpoint(value: str) -> Tuple[str, str]:
+    name, sep, url = value.partition("=")
+    if not sep or not name or not url:
+        raise argparse.ArgumentTypeError(f"expected NAME=URL, got {value!r}")
+    return name, url
+
+
+def _phases(args) -> int:
+    from . import http_phases
+
+    from .deadline import Deadline
+
+    targets = dict(args.endpoint) if args.endpoint else http_phases.endpoints()
+    http_phases.run(targets, args.reuse, None if args.no_log else args.dir, Deadline.after(args.deadline))
+    return 0
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m uptime_monitor", description=__doc__.split("\n")[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    send = commands.add_parser("send", help="send the UDP ping and the TTN uplink")
+    send.add_argument("--only", nargs="+", choices=("udp", "ttn"), default=["udp", "ttn"])
+    check = commands.add_parser("check", help="verify the datapoints of an earlier send")
+    check.add_argument("--start-time-file", default=config.START_TIME_FILE)
+    run = commands.add_parser("run", help="send and verify")
+    report = commands.add_parser("report", help="uptime per service from the rollups")
+    report.add_argument("--days", nargs="*", type=float, default=[30, 100, 365])
+    phases = commands.add_parser("phases", help="time DNS, connect, TLS and first byte per endpoint, cold and reused")
+    phases.add_argument("--endpoint", nargs="*", type=_endpoint, metavar="NAME=URL",
+                        help="default: ttn (simulate URL) and influx (/ping)")
+    phases.add_argument("--reuse", type=int, default=3, help="requests on the warm connection after the cold one")
+    phases.add_argument("--no-log", action="store_true", help="print only, do not write the uptime log")
+
+    for sub in (send, run):
+        sub.add_argument("--udp", type=_host_port, default=(config.UDP_IP, config.UDP_PORT), metavar="HOST:PORT")
+        sub.add_argument("--ttn-url", default=config.TTN_SIMULATE_URL)
+    for sub in (check, run, report, phases):
+        sub.add_argument("--dir", default=config.UPTIME_LOG_DIR)
+    for sub in (check, run):
+        sub.add_argument("--metrics-file", help="write per-stage timings here as OpenMetrics text")
+    for sub in (check, run, phases):
+        sub.add_argument("--deadline", type=float, default=config.RUN_DEADLINE_S,
+                         help="seconds for all network calls of the run together")
+
+    args = parser.parse_args(argv)
+    handlers = {"send": _send, "check": _check, "run": _run, "report": _report, "phases": _phases}
+    return handlers[args.command](args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
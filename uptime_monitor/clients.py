@@ -0,0 +1,133 @@
+"""Long-lived, pooled InfluxDB and HTTP clients shared by all probes.
+
+A run creates one :class:`ClientRuntime` and passes it to every check, so
+repeated Influx queries and TTN POSTs reuse warm keep-alive connections
+instead of paying a new TCP/TLS handshake per call. Heavy client libraries
+are imported on first use only.
+
+:meth:`ClientRuntime.bounded_query_api` bounds a query by the remaining run
+deadline. ``influxdb-client`` has no per-query timeout, so a budget shorter
+than the shared client's timeout gets a one-off client built with that
+``timeout``.
+"""
+
+import threading
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional
+
+DEFAULT_POOL_SIZE = 4
+DEFAULT_TIMEOUT_S = 10.0
+
+
+class ClientRuntime:
+    """Owns one ``InfluxDBClient`` and one ``requests.Session`` for the lifetime of a run."""
+
+    def __init__(self, influx_url: Optional[str], influx_token: Optional[str], influx_org: str,
+                 pool_size: int = DEFAULT_POOL_SIZE, timeout_s: float = DEFAULT_TIMEOUT_S):
+        self.influx_url = influx_url
+        self.influx_token = influx_token
+        self.influx_org = influx_org
+        self.pool_size = pool_size
+        self.timeout_s = timeout_s
+        self._lock = threading.Lock()
+        self._influx = None
+        self._query_api = None
+        self._http = None
+        self._closed = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _check_open(self):
+        if self._closed:
+            raise RuntimeError("ClientRuntime is closed")
+
+    @property
+    def influx(self):
+        with self._lock:
+            self._check_open()
+            if self._influx is None:
+                from influxdb_client import InfluxDBClient
+
+                self._influx = InfluxDBClient(
+                    url=self.influx_url,
+                    token=self.influx_token,
+                    org=self.influx_org,
+                    timeout=int(self.timeout_s * 1000),
+                    connection_pool_maxsize=self.pool_size,
+                )
+            return self._influx
+
+    def query_api(self):
+        client = self.influx
+        with self._lock:
+            if self._query_api is None:
+                self._query_api = client.query_api()
+            return self._query_api
+
+    @contextmanager
+    def bounded_query_api(self, timeout_s: Optional[float]) -> Iterator:
+        """A query API whose requests give up after ``timeout_s`` (the client timeout when ``None``).
+
+        The shared client serves every budget its own timeout already fits.
+        A shorter one gets a client of its own, built with that ``timeout``
+        and closed on exit; it costs a fresh connection, which only the last
+        stretch of a run pays.
+        """
+        if timeout_s is None or timeout_s >= self.timeout_s:
+            yield self.query_api()
+            return
+        self._check_open()
+        from influxdb_client import InfluxDBClient
+
+        with InfluxDBClient(url=self.influx_url, token=self.influx_token, org=self.influx_org,
+                            timeout=max(1, int(timeout_s * 1000))) as client:
+            yield client.query_api()
+
+    @property
+    def http(self):
+        with self._lock:
+            self._check_open()
+            if self._http is None:
+                import requests
+                from requests.adapters import HTTPAdapter
+
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=self.pool_size, pool_maxsize=self.pool_size, pool_block=True)
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                self._http = session
+            return self._http
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        """Connections opened vs. requests that reused an already open connection."""
+        stats = {"influx": {"opened": 0, "reused": 0}, "http": {"opened": 0, "reused": 0}}
+        if self._influx is not None:
+            _add_pool_stats(stats["influx"], self._influx.api_client.rest_client.pool_manager)
+        if self._http is not None:
+            for adapter in set(self._http.adapters.values()):
+                _add_pool_stats(stats["http"], adapter.poolmanager)
+        return stats
+
+    def close(self) -> None:
+        with self._lock:
+            if self._influx is not None:
+                self._influx.close()
+            if self._http is not None:
+                self._http.close()
+            self._influx = self._query_api = self._http = None
+            self._closed = True
+
+
+def _add_pool_stats(totals: Dict[str, int], pool_manager) -> None:
+    if pool_manager is None:
+        return
+    for key in pool_manager.pools.keys():
+        pool = pool_manager.pools.get(key)
+        if pool is None:
+            continue
+        totals["opened"] += pool.num_connections
+        totals["reused"] += max(pool.num_requests - pool.num_connections, 0)
@@ -0,0 +1,66 @@
+"""Endpoints, credentials and device IDs shared by the probes."""
+
+import os
+
+# ----------- CONFIGURATION -----------
+
+UDP_IP = "46.243.202.54"
+UDP_PORT = 1025
+
+# Your TTN Simulation Config
+TTN_API_KEY = os.getenv("TTN_API_KEY")
+TTN_APP_ID = "pulse-s-2023-07"
+TTN_DEVICE_ID = "pulse-s-0001"
+TTN_SIMULATE_URL = f"https://eu1.cloud.thethings.network/api/v3/as/applications/{TTN_APP_ID}/devices/{TTN_DEVICE_ID}/up/simulate"
+
+# InfluxDB Config
+INFLUX_URL = os.getenv("INFLUX_NAME")
+INFLUX_TOKEN = os.getenv("INFLUX_API")
+INFLUX_ORG = "treesense"
+INFLUX_BUCKET = "sensor_data"
+
+# Device IDs for queries
+IMEI = "AAAAAAAAAAAAAA3"
+TTN_DEV_EUI = "0004A30B010452FC"
+
+# Test device used by burst/load runs so they never touch IMEI's freshness check
+BURST_IMEI = "AAAAAAAAAAAAAA4"
+
+UPTIME_LOG_DIR = "uptime-log"
+
+# Route log appends through a running log daemon (python -m uptime_monitor.logd). Its group commits
+# only pay off with many concurrent writers; with 1-8 writers direct appends are faster (bench_logd).
+LOG_DAEMON = os.getenv("UPTIME_LOG_DAEMON", "0") == "1"
+
+# Written by the workflow (`date +%s`) right before `send`, read by `check`
+START_TIME_FILE = "start_time.txt"
+
+# The UDP payload "time" of `run` is truncated to this many seconds (hourly, like the sensor).
+# Probing more often than that (scheduler daemon) needs a finer resolution, e.g. 60.
+UDP_TIME_RESOLUTION_S = int(os.getenv("UDP_TIME_RESOLUTION_S", "3600"))
+
+# Stop polling for a freshly sent datapoint after this many seconds
+INGESTION_DEADLINE_S = 30
+
+# Probes run concurrently; each one is cancelled after PROBE_TIMEOUT_S
+PROBE_TIMEOUT_S = 60
+PROBE_CONCURRENCY = 4
+
+# A one-shot `check`/`run` gets this budget for all of its network calls together;
+# a single Influx query never waits longer than INFLUX_QUERY_TIMEOUT_S of it
+RUN_DEADLINE_S = 60
+INFLUX_QUERY_TIMEOUT_S = 10
+
+# Identical freshness queries in flight share one request; answers are reused for
+# FRESHNESS_CACHE_TTL_S (below the 0.4 s minimum poll interval, so one probe's own polls always reach Influx)
+FRESHNESS_CACHE_TTL_S = float(os.getenv("FRESHNESS_CACHE_TTL_S", "0.25"))
+FRESHNESS_CACHE_SIZE = 256
+
+# Log months that ended more than ARCHIVE_AFTER_DAYS ago move into uptime-log/archive/ as compressed
+# blocks of ARCHIVE_BLOCK_ENTRIES lines. analyse.ts reads only the live segments and looks back 365 days.
+ARCHIVE_AFTER_DAYS = int(os.getenv("ARCHIVE_AFTER_DAYS", "400"))
+ARCHIVE_BLOCK_ENTRIES = 4096
+
+# Echoing UDP endpoints checked by `python -m uptime_monitor.udp_rtt` when no --target is given
+# (comma-separated HOST:PORT)
+UDP_RTT_TARGETS = [t for t in os.getenv("UDP_RTT_TARGETS", "").split(",") if t.strip()]
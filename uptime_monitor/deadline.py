@@ -0,0 +1,50 @@
+"""One time budget per probe run, handed down to every network call.
+
+A run starts a :class:`Deadline`. Every network call (UDP send, TTN POST,
+Influx query) uses what is left of it as its own timeout, and polling stops
+when the budget is spent, so one hung connection cannot push a run past its
+slot::
+
+    deadline = Deadline.after(config.RUN_DEADLINE_S)
+    send_udp_ping(timeout_s=deadline.timeout())
+    with runtime.bounded_query_api(deadline.timeout(cap=config.INFLUX_QUERY_TIMEOUT_S)) as query_api:
+        latest_times(query_api, bucket, targets)
+
+Monotonic clock, so wall-clock jumps don't stretch or cut the budget.
+"""
+
+import time
+from typing import Callable, Optional
+
+
+class DeadlineExceeded(TimeoutError):
+    pass
+
+
+class Deadline:
+    __slots__ = ("expires_at", "_clock")
+
+    def __init__(self, expires_at: float, clock: Callable[[], float] = time.monotonic):
+        self.expires_at = expires_at
+        self._clock = clock
+
+    @classmethod
+    def after(cls, seconds: float, clock: Callable[[], float] = time.monotonic) -> "Deadline":
+        return cls(clock() + seconds, clock)
+
+    def remaining(self) -> float:
+        return max(0.0, self.expires_at - self._clock())
+
+    @property
+    def expired(self) -> bool:
+        return self._clock() >= self.expires_at
+
+    def timeout(self, cap: Optional[float] = None) -> float:
+        """Remaining budget (at most ``cap``) for the next call; raises once nothing is left."""
+        remaining = self.expires_at - self._clock()
+        if remaining <= 0:
+            raise DeadlineExceeded("run deadline exceeded")
+        return remaining if cap is None else min(cap, remaining)
+
+    def __repr__(self) -> str:
+        return f"Deadline(remaining={self.remaining():.3f}s)"
@@ -0,0 +1,168 @@
+"""Columnar in-memory representation of uptime log events.
+
+``json.load`` on the log makes one dict per entry, with a string key per
+entry and an ISO timestamp string. :class:`UptimeEvents` keeps the same
+events in four flat arrays:
+
+* ``times``: epoch milliseconds (int64)
+* ``services``: a small-int id into an interned name table
+* ``values``: the result as a float (1.0 or 0.0 for boolean checks)
+* ``kinds``: ``KIND_CHECK`` or ``KIND_SERIES``
+
+Events are parsed straight from the segments, so only one entry dict is
+alive at a time. The legacy pretty-printed array is read with ``json.load``
+and turned into columns in one pass over the list. Slicing by time (binary
+search) and by service returns new arrays and creates no per-row objects.
+
+Usage::
+
+    events = UptimeEvents.from_log("uptime-log")
+    last_month = events.between(now_ms - 30 * DAY_MS, now_ms)
+    print(last_month.uptime("udp"), last_month.select("cloudSpeedSingle").values)
+"""
+
+import json
+from array import array
+from bisect import bisect_left
+from datetime import datetime, timedelta, timezone
+from itertools import compress
+from typing import Dict, Iterable, Iterator, List, Optional
+
+from . import config, store
+from .windows import WindowUptime
+
+KIND_CHECK = 0
+KIND_SERIES = 1
+_CHUNK = 1 << 16  # events buffered in lists before they move into the arrays
+_KINDS = {bool: KIND_CHECK, int: KIND_SERIES, float: KIND_SERIES}  # by exact type, as json.load returns them
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_MS = timedelta(milliseconds=1)
+
+
+def epoch_ms(timestamp: str) -> int:
+    """Epoch milliseconds of a log timestamp, truncated like the log's own millisecond stamps."""
+    try:
+        dt = datetime.fromisoformat(timestamp)  # Python < 3.11 rejects "Z" and other fraction lengths
+    except ValueError:
+        dt = store.parse_timestamp(timestamp)
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return (dt - _EPOCH) // _MS
+
+
+class UptimeEvents:
+    __slots__ = ("times", "services", "values", "kinds", "names", "_ids")
+
+    def __init__(self, names: Optional[List[str]] = None):
+        self.times = array("q")
+        self.services = array("H")
+        self.values = array("d")
+        self.kinds = array("b")
+        self.names: List[str] = list(names or [])
+        self._ids = {name: i for i, name in enumerate(self.names)}
+
+    def __len__(self) -> int:
+        return len(self.times)
+
+    def service_id(self, name: str) -> int:
+        sid = self._ids.get(name)
+        if sid is None:
+            sid = self._ids[name] = len(self.names)
+            self.names.append(name)
+        return sid
+
+    def add_entry(self, entry: Dict) -> None:
+        self.extend((entry,))
+
+    def extend(self, entries: Iterable[Dict]) -> None:
+        """Append the events of ``entries``, building all four columns in one pass."""
+        times, services, values, kinds = [], [], [], []
+        ids, service_id = self._ids, self.service_id
+        for entry in entries:
+            if len(times) >= _CHUNK:
+                self._append_columns(times, services, values, kinds)
+                times, services, values, kinds = [], [], [], []
+            ts = None
+            for key, value in entry.items():
+                kind = _KINDS.get(type(value))
+                if kind is None or key == "timestamp":
+                    continue
+                if ts is None:
+                    ts = epoch_ms(entry["timestamp"])
+                sid = ids.get(key)
+                times.append(ts)
+                services.append(service_id(key) if sid is None else sid)
+                values.append(value)
+                kinds.append(kind)
+        self._append_columns(times, services, values, kinds)
+
+    def _append_columns(self, times: List[int], services: List[int], values: List, kinds: List[int]) -> None:
+        self.times.extend(times)
+        self.services.extend(services)
+        self.values.extend(array("d", values))  # ints and bools as floats
+        self.kinds.extend(kinds)
+
+    @classmethod
+    def from_entries(cls, entries: Iterable[Dict]) -> "UptimeEvents":
+        events = cls()
+        events.extend(entries)
+        events._sort()
+        return events
+
+    @classmethod
+    def from_log(cls, directory: str = config.UPTIME_LOG_DIR) -> "UptimeEvents":
+        return cls.from_entries(store.read_entries(directory))
+
+    @classmethod
+    def from_json_array(cls, path: str = store.LEGACY_LOG_FILE) -> "UptimeEvents":
+        with open(path, "r", encoding="utf-8") as f:
+            return cls.from_entries(json.load(f))
+
+    def _sort(self) -> None:
+        times = self.times
+        if all(times[i] <= times[i + 1] for i in range(len(times) - 1)):
+            return
+        order = sorted(range(len(times)), key=times.__getitem__)
+        for name in ("times", "services", "values", "kinds"):
+            column = getattr(self, name)
+            setattr(self, name, array(column.typecode, (column[i] for i in order)))
+
+    def _take(self, start: int = 0, stop: Optional[int] = None, sid: Optional[int] = None) -> "UptimeEvents":
+        out = UptimeEvents(self.names)
+        for name in ("times", "services", "values", "kinds"):
+            column = getattr(self, name)[start:stop]
+            if sid is not None:
+                column = array(column.typecode, compress(column, (s == sid for s in self.services[start:stop])))
+            setattr(out, name, column)
+        return out
+
+    def between(self, start_ms: int, end_ms: int) -> "UptimeEvents":
+        """Events with ``start_ms <= time < end_ms``."""
+        return self._take(bisect_left(self.times, start_ms), bisect_left(self.times, end_ms))
+
+    def select(self, service: str) -> "UptimeEvents":
+        sid = self._ids.get(service)
+        if sid is None:
+            return UptimeEvents(self.names)
+        return self._take(sid=sid)
+
+    def uptime(self, service: str) -> WindowUptime:
+        """Successful / total boolean results of ``service`` in these events."""
+        sid = self._ids.get(service)
+        up = total = 0
+        for s, value, kind in zip(self.services, self.values, self.kinds):
+            if s == sid and kind == KIND_CHECK:
+                total += 1
+                up += value == 1.0
+        return WindowUptime(up, total)
+
+    def entries(self) -> Iterator[Dict]:
+        """Rebuild log-style entries (with ISO timestamps), e.g. for export."""
+        for ts, sid, value, kind in zip(self.times, self.services, self.values, self.kinds):
+            stamp = datetime.fromtimestamp(ts / 1000, timezone.utc).isoformat(timespec="milliseconds")
+            yield {"timestamp": stamp, self.names[sid]: value == 1.0 if kind == KIND_CHECK else value}
+
+    @property
+    def nbytes(self) -> int:
+        return sum(column.itemsize * len(column) for column in (self.times, self.services, self.values, self.kinds))
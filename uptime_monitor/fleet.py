@@ -0,0 +1,157 @@
+"""Fleet-wide last-seen scanner: which devices in ``INFLUX_BUCKET`` went silent?
+
+One query returns the newest heartbeat of every ``imei`` and
+``hardware_serial`` device: ``last()`` per series, then ``max`` of
+``_time`` per device (``group()`` does not keep rows in time order, so a
+``last()`` after it could pick an older series). Records are consumed with
+``query_stream`` one at a time, so memory does not grow with the size of
+the result. Results are folded into a small local index
+(``uptime-log/fleet-last-seen.json``). The next scan only queries from the
+previous watermark, minus a short overlap for late-arriving points.
+Devices that stop reporting keep their last known time and move up the
+stale list.
+
+Usage::
+
+    python -m uptime_monitor.fleet [--stale-hours 6] [--full]
+"""
+
+import argparse
+import json
+import os
+import sys
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, NamedTuple, Optional
+
+from . import config
+from .influx_query import flux_string, flux_time
+from .store import parse_timestamp
+
+# Tag key identifying a device -> field that every report of such a device carries
+FLEET_TAGS = {"imei": "signal", "hardware_serial": "resistance"}
+FIRST_SCAN_RANGE = "-30d"
+WATERMARK_OVERLAP = timedelta(minutes=15)
+DEFAULT_INDEX_FILE = os.path.join(config.UPTIME_LOG_DIR, "fleet-last-seen.json")
+
+
+class StaleDevice(NamedTuple):
+    silent_for: timedelta
+    tag: str
+    device: str
+    last_seen: datetime
+
+
+def fleet_query(bucket: str, start: str, tags: Dict[str, str] = FLEET_TAGS) -> str:
+    predicate = " or ".join(
+        f"(exists r[{flux_string(tag)}] and r[\"_field\"] == {flux_string(field)})" for tag, field in tags.items()
+    )
+    group_columns = ", ".join(flux_string(tag) for tag in tags)
+    return f'''
+    from(bucket: {flux_string(bucket)})
+      |> range(start: {start})
+      |> filter(fn: (r) => {predicate})
+      |> last()
+      |> group(columns: [{group_columns}])
+      |> max(column: "_time")
+      |> keep(columns: ["_time", {group_columns}])
+    '''
+
+
+class LastSeenIndex:
+    """Persistent ``{tag: {device: last seen}}`` map plus the watermark of the last scan."""
+
+    def __init__(self, path: str = DEFAULT_INDEX_FILE):
+        self.path = path
+        self.watermark: Optional[datetime] = None
+        self.last_seen: Dict[str, Dict[str, datetime]] = {}
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return
+        if data.get("watermark"):
+            self.watermark = parse_timestamp(data["watermark"])
+        self.last_seen = {
+            tag: {device: parse_timestamp(ts) for device, ts in devices.items()}
+            for tag, devices in data.get("last_seen", {}).items()
+        }
+
+    def update(self, tag: str, device: str, seen: datetime) -> None:
+        devices = self.last_seen.setdefault(tag, {})
+        previous = devices.get(device)
+        if previous is None or seen > previous:
+            devices[device] = seen
+
+    def stale(self, now: datetime, max_silence: timedelta) -> List[StaleDevice]:
+        """Devices silent for longer than ``max_silence``, longest silence first."""
+        stale = [
+            StaleDevice(now - seen, tag, device, seen)
+            for tag, devices in self.last_seen.items()
+            for device, seen in devices.items()
+            if now - seen > max_silence
+        ]
+        stale.sort(reverse=True)
+        return stale
+
+    def save(self) -> None:
+        data = {
+            "watermark": self.watermark.isoformat() if self.watermark else None,
+            "last_seen": {
+                tag: {device: seen.isoformat() for device, seen in sorted(devices.items())}
+                for tag, devices in sorted(self.last_seen.items())
+            },
+        }
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, separators=(",", ":"))
+        os.replace(tmp_path, self.path)
+
+
+def scan(query_api, index: LastSeenIndex, bucket: str = config.INFLUX_BUCKET,
+         tags: Dict[str, str] = FLEET_TAGS, now: Optional[datetime] = None) -> int:
+    """Fold everything written since the index watermark into ``index``; returns the number of records read."""
+    now = now or datetime.now(timezone.utc)
+    start = flux_time(index.watermark - WATERMARK_OVERLAP) if index.watermark else FIRST_SCAN_RANGE
+    records = 0
+    for record in query_api.query_stream(fleet_query(bucket, start, tags)):
+        records += 1
+        values = record.values
+        for tag in tags:
+            device = values.get(tag)
+            if device:
+                index.update(tag, device, record.get_time())
+    index.watermark = now
+    return records
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    from .clients import ClientRuntime
+
+    parser = argparse.ArgumentParser(prog="python -m uptime_monitor.fleet", description=__doc__.split("\n")[0])
+    parser.add_argument("--stale-hours", type=float, default=6.0, help="silence after which a device is stale")
+    parser.add_argument("--index", default=DEFAULT_INDEX_FILE)
+    parser.add_argument("--full", action="store_true", help="ignore the watermark and rescan the whole range")
+    args = parser.parse_args(argv)
+
+    index = LastSeenIndex(args.index)
+    if args.full:
+        index.watermark = None
+    with ClientRuntime(config.INFLUX_URL, config.INFLUX_TOKEN, config.INFLUX_ORG) as runtime:
+        records = scan(runtime.query_api(), index)
+    index.save()
+
+    now = datetime.now(timezone.utc)
+    stale = index.stale(now, timedelta(hours=args.stale_hours))
+    total = sum(len(devices) for devices in index.last_seen.values())
+    print(f"Scanned {records} series, {total} devices known, {len(stale)} silent for more than {args.stale_hours:g}h")
+    for device in stale:
+        hours = device.silent_for.total_seconds() / 3600
+        print(f"  {device.tag}={device.device}  last seen {device.last_seen.isoformat()}  ({hours:.1f}h ago)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,201 @@
+"""Connection-phase timings for the HTTP endpoints the probes talk to.
+
+A slow ``simulate_ttn_uplink()`` or Influx query only shows up as a status
+code or a timeout. This probe splits a request into its phases:
+
+* ``dns``: ``getaddrinfo``
+* ``connect``: TCP handshake
+* ``tls``: TLS handshake (``https`` only)
+* ``ttfb``: request written until the status line and headers are in
+  (with TLS 1.3 the socket turns readable early with session tickets, so
+  "readable" is no measure of the first byte)
+* ``total``: start to end of the response body
+
+The first request to each endpoint uses a new connection (cold). The next
+``reuse`` requests go over the same keep-alive connection, where only
+``ttfb`` is left. Requests are plain ``GET`` without credentials. The TTN
+simulate URL answers with a 4xx and simulates nothing, and Influx is asked
+for ``/ping``. Proxies are not used, so the phases are those of the direct
+route.
+
+Each endpoint gets one uptime log entry with numeric series in
+milliseconds. For ``ttn`` these are ``ttnDnsMs``, ``ttnConnectMs``,
+``ttnTlsMs``, ``ttnTtfbMs`` and ``ttnTotalMs`` for the cold request, plus
+``ttnReusedTtfbMs`` and ``ttnReusedTotalMs`` (medians over the reused
+requests). The same phases also go to the per-stage metrics::
+
+    python -m uptime_monitor phases [--endpoint influx=http://localhost:8086/ping] [--reuse 3]
+"""
+
+import asyncio
+import http.client
+import socket
+import ssl
+import statistics
+import time
+from datetime import datetime, timezone
+from typing import Dict, List, NamedTuple, Optional
+from urllib.parse import urlsplit
+
+from . import config, logd, metrics
+from .deadline import Deadline
+from .probes import probe
+
+DEFAULT_REUSE = 3
+HEADERS = {"Connection": "keep-alive", "User-Agent": "uptime-monitor phases probe"}
+
+
+class Timing(NamedTuple):
+    reused: bool
+    status: int
+    dns_s: Optional[float]      # None on a reused connection
+    connect_s: Optional[float]  # None on a reused connection
+    tls_s: Optional[float]      # None on a reused connection and for http://
+    ttfb_s: float
+    total_s: float
+
+
+class TimedConnection:
+    """One keep-alive HTTP(S) connection to ``url``; every request is timed phase by phase."""
+
+    def __init__(self, url: str, context: Optional[ssl.SSLContext] = None):
+        parts = urlsplit(url)
+        if parts.scheme not in ("http", "https") or not parts.hostname:
+            raise ValueError(f"Expected an http(s) URL, got {url!r}")
+        self.tls = parts.scheme == "https"
+        self.host = parts.hostname
+        self.port = parts.port or (443 if self.tls else 80)
+        self.path = (parts.path or "/") + (f"?{parts.query}" if parts.query else "")
+        self.context = context or (ssl.create_default_context() if self.tls else None)
+        self._conn: Optional[http.client.HTTPConnection] = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self) -> None:
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    def _connect(self, timeout_s: float):
+        """Open the connection; returns the dns, connect and tls durations."""
+        start = time.perf_counter()
+        family, kind, proto, _, address = socket.getaddrinfo(self.host, self.port, type=socket.SOCK_STREAM)[0]
+        resolved = time.perf_counter()
+        sock = socket.socket(family, kind, proto)
+        try:
+            sock.settimeout(timeout_s)
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            sock.connect(address)
+            connected = time.perf_counter()
+            if self.tls:
+                sock = self.context.wrap_socket(sock, server_hostname=self.host)
+        except BaseException:
+            sock.close()
+            raise
+        done = time.perf_counter()
+        # HTTPSConnection so that port 443 is left out of the Host header; the socket is already wrapped
+        connection_cls = http.client.HTTPSConnection if self.tls else http.client.HTTPConnection
+        self._conn = connection_cls(self.host, self.port, timeout=timeout_s)
+        self._conn.sock = sock
+        return resolved - start, connected - resolved, done - connected if self.tls else None
+
+    def request(self, timeout_s: float, method: str = "GET") -> Timing:
+        """One request, on the open connection if there is one; ``timeout_s`` bounds every phase.
+
+        The name lookup cannot be interrupted (``getaddrinfo`` has no timeout).
+        """
+        start = time.perf_counter()
+        reused = self._conn is not None
+        dns_s = connect_s = tls_s = None
+        try:
+            if not reused:
+                dns_s, connect_s, tls_s = self._connect(timeout_s)
+            conn = self._conn
+            conn.sock.settimeout(timeout_s)
+            conn.request(method, self.path, headers=HEADERS)
+            sent = time.perf_counter()
+            response = conn.getresponse()
+            first_byte = time.perf_counter()
+            response.read()
+        except BaseException:
+            self.close()
+            raise
+        end = time.perf_counter()
+        if response.will_close:
+            self.close()
+        return Timing(reused, response.status, dns_s, connect_s, tls_s, first_byte - sent, end - start)
+
+
+def measure(url: str, reuse: int = DEFAULT_REUSE, deadline: Optional[Deadline] = None,
+            context: Optional[ssl.SSLContext] = None) -> List[Timing]:
+    """A cold request to ``url``, then ``reuse`` requests on the same connection, all within ``deadline``.
+
+    If the server closes the connection, the next request opens a new one
+    and is reported as cold.
+    """
+    deadline = deadline or Deadline.after(config.PROBE_TIMEOUT_S)
+    with TimedConnection(url, context) as conn:
+        return [conn.request(deadline.timeout(cap=config.INFLUX_QUERY_TIMEOUT_S)) for _ in range(1 + reuse)]
+
+
+def _ms(seconds: float) -> float:
+    return round(seconds * 1000, 1)
+
+
+def series(name: str, timings: List[Timing]) -> Dict[str, float]:
+    """The uptime log series of one endpoint, e.g. ``{"ttnDnsMs": 1.2, ..., "ttnReusedTtfbMs": 38.0}``."""
+    cold, reused = timings[0], [t for t in timings[1:] if t.reused]
+    values = {"Dns": cold.dns_s, "Connect": cold.connect_s, "Tls": cold.tls_s, "Ttfb": cold.ttfb_s,
+              "Total": cold.total_s}
+    if reused:
+        values["ReusedTtfb"] = statistics.median(t.ttfb_s for t in reused)
+        values["ReusedTotal"] = statistics.median(t.total_s for t in reused)
+    return {f"{name}{phase}Ms": _ms(seconds) for phase, seconds in values.items() if seconds is not None}
+
+
+def observe(name: str, timings: List[Timing]) -> None:
+    """Feed the phases into the per-stage metrics, with the endpoint as the probe label."""
+    for t in timings:
+        prefix = "reused_" if t.reused else ""
+        for phase, seconds in (("dns", t.dns_s), ("connect", t.connect_s), ("tls", t.tls_s),
+                               ("ttfb", t.ttfb_s), ("total", t.total_s)):
+            if seconds is not None:
+                metrics.stages.observe(name, prefix + phase, seconds)
+
+
+def endpoints() -> Dict[str, str]:
+    """The default endpoints: the TTN simulate URL and Influx ``/ping`` (if ``INFLUX_NAME`` is set)."""
+    found = {"ttn": config.TTN_SIMULATE_URL}
+    if config.INFLUX_URL:
+        found["influx"] = config.INFLUX_URL.rstrip("/") + "/ping"
+    return found
+
+
+def run(targets: Dict[str, str], reuse: int = DEFAULT_REUSE, log_dir: Optional[str] = config.UPTIME_LOG_DIR,
+        deadline: Optional[Deadline] = None, context: Optional[ssl.SSLContext] = None) -> bool:
+    """Measure every endpoint, print and log its series; False if any endpoint could not be measured."""
+    deadline = deadline or Deadline.after(config.RUN_DEADLINE_S)
+    ok = True
+    for name, url in targets.items():
+        try:
+            timings = measure(url, reuse, deadline, context)
+        except Exception as e:
+            print(f"❌ {name}: {url} not measured: {e}")
+            ok = False
+            continue
+        observe(name, timings)
+        values = series(name, timings)
+        print(f"⏱️ {name} (HTTP {timings[0].status}): "
+              + ", ".join(f"{key[len(name):-2]} {ms:g} ms" for key, ms in values.items()))
+        if log_dir is not None:
+            logd.append_entry({"timestamp": datetime.now(timezone.utc).isoformat(), **values}, log_dir)
+    return ok
+
+
+@probe("phases", timeout_s=config.PROBE_TIMEOUT_S, record=False)
+async def phases_probe(log_dir: str = config.UPTIME_LOG_DIR):
+    return await asyncio.to_thread(run, endpoints(), DEFAULT_REUSE, log_dir)
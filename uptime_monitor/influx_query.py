@@ -0,0 +1,99 @@
+"""Flux query helpers shared by the probe scripts.
+
+:func:`latest_times` answers "when was each of these series last written?"
+for any number of (tag key, tag value, field) targets in a single round trip.
+It filters all targets in one predicate and lets the storage engine pick the
+last point per series with ``last()``, instead of sorting the whole range
+once per device.
+
+:func:`stream_rows` is for wide range queries (history, gap analysis): it
+reads the CSV response row by row and yields plain tuples, so memory stays
+constant however many rows come back.
+
+To bound a query by the remaining run deadline (see ``deadline.py``), pass a
+query API from :meth:`ClientRuntime.bounded_query_api`.
+"""
+
+from datetime import datetime, timezone
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple, Union
+
+
+class Target(NamedTuple):
+    tag: str
+    value: str
+    field: str
+
+
+def flux_string(value: str) -> str:
+    """Quote ``value`` as a Flux string literal."""
+    return '"' + value.replace("\\", "\\\\").replace('"', '\\"') + '"'
+
+
+def flux_time(dt: datetime) -> str:
+    """Format ``dt`` as an RFC3339 UTC time literal for ``range()``."""
+    return dt.astimezone(timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.%fZ")
+
+
+def freshness_query(bucket: str, targets: Iterable[Target], time_range: str = "-4h") -> str:
+    clauses = [
+        f"(r[{flux_string(t.tag)}] == {flux_string(t.value)} and r[\"_field\"] == {flux_string(t.field)})"
+        for t in targets
+    ]
+    if not clauses:
+        raise ValueError("At least one target is required")
+    return f'''
+    from(bucket: {flux_string(bucket)})
+      |> range(start: {time_range})
+      |> filter(fn: (r) => {" or ".join(clauses)})
+      |> last()
+    '''
+
+
+def latest_times(query_api, bucket: str, targets: Iterable[Target],
+                 time_range: str = "-4h") -> Dict[Target, Optional[datetime]]:
+    """Return the newest ``_time`` per target (``None`` if nothing in range) with one query.
+
+    ``last()`` runs per series, so a target spread over several series (e.g.
+    different measurements) is folded to its newest time client-side.
+    """
+    targets: List[Target] = list(dict.fromkeys(targets))
+    latest: Dict[Target, Optional[datetime]] = {t: None for t in targets}
+    by_key = {(t.tag, t.value, t.field): t for t in targets}
+    tags = {t.tag for t in targets}
+
+    for table in query_api.query(freshness_query(bucket, targets, time_range)):
+        for record in table.records:
+            values = record.values
+            for tag in tags:
+                target = by_key.get((tag, values.get(tag), values.get("_field")))
+                if target is None:
+                    continue
+                record_time = record.get_time()
+                if latest[target] is None or record_time > latest[target]:
+                    latest[target] = record_time
+    return latest
+
+
+def stream_rows(query_api, query: str, tag: str) -> Iterator[Tuple[str, Optional[str], Union[float, str]]]:
+    """Yield ``(time, tag value, value)`` for every row of ``query`` without building FluxTables.
+
+    The time stays an RFC3339 string; numeric values are converted to float.
+    """
+    from influxdb_client.domain.dialect import Dialect
+
+    dialect = Dialect(header=True, annotations=[], delimiter=",", comment_prefix="#", date_time_format="RFC3339")
+    time_i = value_i = tag_i = None
+    for row in query_api.query_csv(query, dialect=dialect):
+        if not row or row == [""]:
+            continue  # blank line between tables
+        if row[1] == "result":
+            # header row of the next table; columns may move between tables
+            time_i, value_i = row.index("_time"), row.index("_value")
+            tag_i = row.index(tag) if tag in row else None
+            continue
+        value = row[value_i]
+        try:
+            value = float(value)
+        except ValueError:
+            pass
+        yield row[time_i], row[tag_i] if tag_i is not None else None, value
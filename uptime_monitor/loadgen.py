@@ -0,0 +1,278 @@
+"""High-rate load generator for the UDP ingest and the TTN uplink path.
+
+Payloads are compiled once into byte templates with fixed-width slots
+(device ID, timestamps, ``f_cnt``). Per message only those slots are
+patched in place in a reused ``bytearray``: no dict building, no
+``json.dumps``, and clock strings are formatted once per second. Simulated
+devices are spread over worker processes, each with its own socket or
+keep-alive HTTP connection.
+
+The target is always explicit. The production UDP ingest and TTN are
+refused unless ``--production`` is given, since every simulated device
+lands in the live bucket; the TTN API key is only sent with it. The TTN
+device ID replaces the ``/devices/<id>/`` segment of ``--url``, so each
+uplink goes to its own device.
+
+Usage::
+
+    python -m uptime_monitor.loadgen udp --host 127.0.0.1 --devices 10000 --rate 5000 --duration 30 --workers 4
+    python -m uptime_monitor.loadgen ttn --devices 1000 --rate 200 --duration 30 \\
+        --url http://localhost:8080/api/v3/as/applications/app/devices/dev/up/simulate
+"""
+
+import argparse
+import http.client
+import json
+import multiprocessing
+import socket
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+from urllib.parse import urlsplit
+
+from . import config, payloads
+
+UDP_IMEI_FORMAT = "LOADGEN{:08d}"       # 15 characters like a real IMEI
+TTN_DEVICE_ID_FORMAT = "loadgen-{:08d}"
+TTN_DEV_EUI_BASE = 0x70B3D57ED0000000
+MAX_DEVICES = 10 ** 8                   # the IDs above have 8 digits
+
+
+def slot_marker(name: str, width: int) -> str:
+    marker = f"~{name}~"
+    if len(marker) > width:
+        raise ValueError(f"Slot {name!r} needs a width of at least {len(marker)}")
+    return marker.ljust(width, "~")
+
+
+class PayloadTemplate:
+    """A serialized document whose fixed-width slots can be overwritten in place."""
+
+    def __init__(self, data: bytes, slots: Dict[str, Tuple[Tuple[int, ...], int]]):
+        self.data = data
+        self.slots = slots  # name -> (offsets, width)
+
+    def buffer(self) -> bytearray:
+        return bytearray(self.data)
+
+    def patch(self, buf: bytearray, name: str, value: bytes) -> None:
+        offsets, width = self.slots[name]
+        if len(value) != width:
+            raise ValueError(f"Slot {name!r} is {width} bytes wide, got {len(value)}")
+        for offset in offsets:
+            buf[offset:offset + width] = value
+
+    def number(self, name: str, value: int) -> bytes:
+        """Right-align ``value`` in a numeric slot; JSON allows the leading spaces."""
+        return b"%*d" % (self.slots[name][1], value)
+
+
+def compile_template(document, widths: Dict[str, int], numeric: Iterable[str] = ()) -> PayloadTemplate:
+    """Serialize ``document`` built with :func:`slot_marker` values and locate each slot.
+
+    String slots cover the characters between the quotes. Numeric slots also
+    cover the quotes, so a number padded to ``width + 2`` replaces the
+    whole string token.
+    """
+    numeric = set(numeric)
+    data = json.dumps(document, separators=(",", ":")).encode("utf-8")
+    slots = {}
+    for name, width in widths.items():
+        token = b'"' + slot_marker(name, width).encode("utf-8") + b'"'
+        offsets = []
+        start = data.find(token)
+        while start != -1:
+            offsets.append(start if name in numeric else start + 1)
+            start = data.find(token, start + len(token))
+        if not offsets:
+            raise ValueError(f"Slot {name!r} does not occur in the document")
+        slots[name] = (tuple(offsets), width + 2 if name in numeric else width)
+    return PayloadTemplate(data, slots)
+
+
+def udp_template() -> PayloadTemplate:
+    width = len("2025/01/01 00:00:00")
+    document = payloads.udp_ping(slot_marker("imei", 15), slot_marker("time", width), slot_marker("h1", width),
+                                 slot_marker("h2", width), slot_marker("h3", width))
+    return compile_template(document, {"imei": 15, "time": width, "h1": width, "h2": width, "h3": width})
+
+
+def ttn_template() -> PayloadTemplate:
+    widths = {"now": len("2025-01-01T00:00:00.000000Z"), "ts": 10, "device_id": len(TTN_DEVICE_ID_FORMAT.format(0)), "dev_eui": 16, "f_cnt": 10}
+    document = payloads.ttn_uplink(
+        now_str=slot_marker("now", widths["now"]),
+        now_ts=slot_marker("ts", widths["ts"]),
+        device_id=slot_marker("device_id", widths["device_id"]),
+        dev_eui=slot_marker("dev_eui", widths["dev_eui"]),
+        f_cnt=slot_marker("f_cnt", widths["f_cnt"]),
+    )
+    return compile_template(document, widths, numeric=("ts", "f_cnt"))
+
+
+class WorkerStats(NamedTuple):
+    sent: int
+    errors: int
+    cpu_s: float
+    wall_s: float
+
+
+def _pace(start: float, index: int, interval: float) -> None:
+    delay = start + index * interval - time.monotonic()
+    if delay > 0:
+        time.sleep(delay)
+
+
+def device_path(path: str, device_id: str) -> str:
+    """``path`` with the segment after ``/devices/`` replaced by ``device_id`` (unchanged without one)."""
+    head, sep, tail = path.partition("/devices/")
+    if not sep:
+        return path
+    return f"{head}/devices/{device_id}/{tail.partition('/')[2]}"
+
+
+def _is_production(mode: str, args) -> bool:
+    if mode == "udp":
+        return args.host == config.UDP_IP
+    return urlsplit(args.url).hostname == urlsplit(config.TTN_SIMULATE_URL).hostname
+
+
+def _udp_worker(worker: int, workers: int, devices: int, rate: float, duration_s: float,
+                target: Tuple[str, int]) -> WorkerStats:
+    template = udp_template()
+    buf = template.buffer()
+    imeis = [UDP_IMEI_FORMAT.format(i).encode() for i in range(worker, devices, workers)]
+    interval = workers / rate if rate > 0 else 0.0
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sent = errors = 0
+    last_second = None
+    cpu_start, start = time.process_time(), time.monotonic()
+    try:
+        while time.monotonic() - start < duration_s:
+            second = int(time.time())
+            if second != last_second:
+                last_second = second
+                now = datetime.fromtimestamp(second)
+                hour = now.replace(minute=0, second=0)
+                template.patch(buf, "time", now.strftime(payloads.UDP_TIME_FORMAT).encode())
+                for slot, hours in (("h1", 1), ("h2", 2), ("h3", 3)):
+                    template.patch(buf, slot, (hour - timedelta(hours=hours)).strftime(payloads.UDP_TIME_FORMAT).encode())
+            template.patch(buf, "imei", imeis[sent % len(imeis)])
+            if interval:
+                _pace(start, sent + errors, interval)
+            try:
+                sock.sendto(buf, target)
+                sent += 1
+            except OSError:
+                errors += 1
+    finally:
+        sock.close()
+    return WorkerStats(sent, errors, time.process_time() - cpu_start, time.monotonic() - start)
+
+
+def _ttn_worker(worker: int, workers: int, devices: int, rate: float, duration_s: float,
+                url: str, api_key: Optional[str]) -> WorkerStats:
+    template = ttn_template()
+    buf = template.buffer()
+    ids = list(range(worker, devices, workers))
+    device_ids = [TTN_DEVICE_ID_FORMAT.format(i) for i in ids]
+    dev_euis = [b"%016X" % (TTN_DEV_EUI_BASE + i) for i in ids]
+    f_cnts = [0] * len(ids)
+    interval = workers / rate if rate > 0 else 0.0
+
+    parts = urlsplit(url)
+    connection_cls = http.client.HTTPSConnection if parts.scheme == "https" else http.client.HTTPConnection
+    query = f"?{parts.query}" if parts.query else ""
+    paths = [device_path(parts.path, device_id) + query for device_id in device_ids]
+    headers = {"Content-Type": "application/json", "Content-Length": str(len(buf))}
+    if api_key:
+        headers["Authorization"] = f"Bearer {api_key}"
+    conn = connection_cls(parts.netloc, timeout=10)
+
+    sent = errors = 0
+    last_second = None
+    prefix = b""
+    cpu_start, start = time.process_time(), time.monotonic()
+    try:
+        while time.monotonic() - start < duration_s:
+            now = time.time()
+            second = int(now)
+            if second != last_second:
+                last_second = second
+                prefix = datetime.fromtimestamp(second, timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.").encode()
+                template.patch(buf, "ts", template.number("ts", second))
+            template.patch(buf, "now", prefix + b"%06dZ" % int((now - second) * 1_000_000))
+            n = (sent + errors) % len(ids)
+            f_cnts[n] += 1
+            template.patch(buf, "device_id", device_ids[n].encode())
+            template.patch(buf, "dev_eui", dev_euis[n])
+            template.patch(buf, "f_cnt", template.number("f_cnt", f_cnts[n]))
+            if interval:
+                _pace(start, sent + errors, interval)
+            try:
+                conn.request("POST", paths[n], body=buf, headers=headers)
+                resp = conn.getresponse()
+                resp.read()
+                if resp.status == 200:
+                    sent += 1
+                else:
+                    errors += 1
+            except (OSError, http.client.HTTPException):
+                errors += 1
+                conn.close()  # reconnects on the next request
+    finally:
+        conn.close()
+    return WorkerStats(sent, errors, time.process_time() - cpu_start, time.monotonic() - start)
+
+
+def run_load(mode: str, devices: int, rate: float, duration_s: float, workers: int, **target) -> List[WorkerStats]:
+    if mode == "udp":
+        worker_fn, extra = _udp_worker, (target["target"],)
+    else:
+        worker_fn, extra = _ttn_worker, (target["url"], target.get("api_key"))
+    jobs = [(w, workers, devices, rate, duration_s) + extra for w in range(workers)]
+    with multiprocessing.Pool(workers) as pool:
+        return pool.starmap(worker_fn, jobs)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m uptime_monitor.loadgen", description=__doc__.split("\n")[0])
+    sub = parser.add_subparsers(dest="mode", required=True)
+    for mode in ("udp", "ttn"):
+        p = sub.add_parser(mode)
+        p.add_argument("--devices", type=int, default=1000)
+        p.add_argument("--rate", type=float, default=1000.0, help="total messages per second (0 = unthrottled)")
+        p.add_argument("--duration", type=float, default=10.0, help="seconds")
+        p.add_argument("--workers", type=int, default=multiprocessing.cpu_count())
+        p.add_argument("--production", action="store_true",
+                       help="allow the production endpoint; the devices show up in the live bucket")
+        if mode == "udp":
+            p.add_argument("--host", required=True)
+            p.add_argument("--port", type=int, default=config.UDP_PORT)
+        else:
+            p.add_argument("--url", required=True, help="simulate URL; its /devices/<id>/ is set per device")
+    args = parser.parse_args(argv)
+    if not 0 < args.devices <= MAX_DEVICES:
+        parser.error(f"--devices must be between 1 and {MAX_DEVICES}")
+    if _is_production(args.mode, args) and not args.production:
+        parser.error("refusing to load the production endpoint without --production")
+
+    workers = max(1, min(args.workers, args.devices))
+    if args.mode == "udp":
+        stats = run_load("udp", args.devices, args.rate, args.duration, workers, target=(args.host, args.port))
+    else:
+        stats = run_load("ttn", args.devices, args.rate, args.duration, workers, url=args.url,
+                         api_key=config.TTN_API_KEY if args.production else None)
+
+    sent = sum(s.sent for s in stats)
+    errors = sum(s.errors for s in stats)
+    wall = max(s.wall_s for s in stats)
+    cpu = sum(s.cpu_s for s in stats)
+    print(f"{args.mode}: {sent} messages ({errors} errors) from {args.devices} devices in {wall:.1f}s "
+          f"with {workers} workers")
+    print(f"sustained {sent / wall:.0f} msgs/s, {cpu / max(sent, 1) * 1e6:.1f} µs CPU per message")
+    return 0 if sent else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
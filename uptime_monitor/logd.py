@@ -0,0 +1,270 @@
+"""Local log daemon: many writers, one appender, batched group commits.
+
+Writers send one JSON entry per line over a Unix domain socket in the log
+directory (``uptime-log/.logd.sock``). The daemon queues the entries and a
+single committer appends everything queued so far with one ``write()`` and
+one ``fsync`` per batch. While that batch is on disk, the next one
+accumulates, so a busy log costs one ``fsync`` per batch instead of one per
+entry.
+
+Ordering: entries are appended in the order the daemon reads them. Entries
+from one connection are therefore appended in the order they were sent.
+An ``ok`` acknowledgement means the entry is on disk. An entry sent after
+another entry's ``ok`` always comes after it in the log.
+
+One daemon per directory: it holds ``uptime-log/.logd.lock`` while it
+runs, so a second one exits instead of taking over the socket.
+
+Backpressure: the queue is bounded. When it is full, the daemon stops
+reading from the sockets and the senders block in ``send``.
+
+:func:`append_entry` writes through the daemon only when that is enabled
+(``UPTIME_LOG_DAEMON=1``, see :mod:`uptime_monitor.config`) and a daemon is
+running for the directory; otherwise it appends directly with
+:mod:`uptime_monitor.store`. It falls back to a direct append only when the
+daemon cannot be reached. Once an entry has been sent, a missing or failed
+acknowledgement raises instead: the daemon may already have committed the
+entry, and writing it again would duplicate it.
+
+Usage::
+
+    python -m uptime_monitor.logd [--dir uptime-log] [--max-batch 512] [--queue 4096]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import select
+import signal
+import socket
+import sys
+from typing import Dict, List, Optional
+
+from . import config, store
+
+SOCKET_NAME = ".logd.sock"
+LOCK_NAME = ".logd.lock"
+MAX_BATCH = 512
+QUEUE_SIZE = 4096
+
+
+def socket_path(directory: str = config.UPTIME_LOG_DIR) -> str:
+    return os.path.join(directory, SOCKET_NAME)
+
+
+def _acquire_lock(directory: str):
+    """Hold an exclusive lock on the log directory for the life of the daemon; None if unsupported."""
+    try:
+        import fcntl
+    except ImportError:
+        return None
+    handle = open(os.path.join(directory, LOCK_NAME), "w")
+    try:
+        fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        handle.close()
+        raise SystemExit(f"Another log daemon is already serving {directory}/")
+    return handle
+
+
+def _valid_timestamp(value) -> bool:
+    if not isinstance(value, str):
+        return False
+    try:
+        store.parse_timestamp(value)
+    except ValueError:
+        return False
+    return True
+
+
+class LogDaemon:
+    def __init__(self, directory: str = config.UPTIME_LOG_DIR, max_batch: int = MAX_BATCH,
+                 queue_size: int = QUEUE_SIZE, fsync: str = "always"):
+        self.directory = directory
+        self.path = socket_path(directory)
+        self.max_batch = max_batch
+        self.queue_size = queue_size
+        self.log = store.SegmentedLog(directory, fsync=fsync)
+        self.batches = 0
+        self.entries = 0
+
+    async def serve(self, stop: Optional[asyncio.Event] = None) -> None:
+        """Serve until SIGINT/SIGTERM (or ``stop`` is set), then commit what is queued and remove the socket."""
+        self.queue: asyncio.Queue = asyncio.Queue(self.queue_size)
+        os.makedirs(self.directory, exist_ok=True)
+        lock = _acquire_lock(self.directory)
+        if os.path.exists(self.path):
+            os.remove(self.path)  # stale socket of a daemon that did not shut down cleanly
+        server = await asyncio.start_unix_server(self._handle, self.path)
+        if stop is None:
+            stop = asyncio.Event()
+            loop = asyncio.get_running_loop()
+            for sig in (signal.SIGINT, signal.SIGTERM):
+                loop.add_signal_handler(sig, stop.set)
+        committer = asyncio.create_task(self._commit_loop())
+        print(f"📝 Log daemon listening on {self.path}", flush=True)
+        try:
+            await stop.wait()
+        finally:
+            server.close()
+            await server.wait_closed()
+            await self.queue.join()
+            committer.cancel()
+            self.log.close()
+            if os.path.exists(self.path):
+                os.remove(self.path)
+            if lock is not None:
+                lock.close()
+            print(f"Committed {self.entries} entries in {self.batches} batches", flush=True)
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        pending: asyncio.Queue = asyncio.Queue()
+        acker = asyncio.create_task(self._ack_in_order(pending, writer))
+        try:
+            while line := await reader.readline():
+                future = asyncio.get_running_loop().create_future()
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    entry = None
+                if isinstance(entry, dict) and _valid_timestamp(entry.get("timestamp")):
+                    await self.queue.put((entry, future))  # blocks while the queue is full
+                else:
+                    future.set_exception(ValueError("not a log entry with an ISO 8601 timestamp"))
+                await pending.put(future)
+        finally:
+            await pending.put(None)
+            await acker
+
+    @staticmethod
+    async def _ack_in_order(pending: asyncio.Queue, writer: asyncio.StreamWriter) -> None:
+        try:
+            while (future := await pending.get()) is not None:
+                try:
+                    await future
+                    writer.write(b"ok\n")
+                except Exception as exc:
+                    writer.write(f"error {exc}\n".encode("utf-8"))
+                await writer.drain()
+        except ConnectionError:
+            pass  # writer went away; its entries are still committed
+        finally:
+            writer.close()
+
+    async def _commit_loop(self) -> None:
+        while True:
+            batch = [await self.queue.get()]
+            while len(batch) < self.max_batch and not self.queue.empty():
+                batch.append(self.queue.get_nowait())
+            try:
+                await asyncio.to_thread(self.log.append_batch, [entry for entry, _ in batch])
+            except Exception as exc:  # fail this batch's writers, keep committing the next ones
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(exc)
+            else:
+                self.batches += 1
+                self.entries += len(batch)
+                for _, future in batch:
+                    if not future.done():
+                        future.set_result(None)
+            finally:
+                for _ in batch:
+                    self.queue.task_done()
+
+
+class LogClient:
+    """Blocking client; one connection, one acknowledged entry at a time."""
+
+    def __init__(self, directory: str = config.UPTIME_LOG_DIR, timeout_s: float = 5.0):
+        self.path = socket_path(directory)
+        self.timeout_s = timeout_s
+        self._sock: Optional[socket.socket] = None
+        self._reader = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def connect(self) -> None:
+        """Connect, or reconnect if the daemon closed the previous connection; nothing is sent yet."""
+        if self._sock is not None:
+            if not select.select([self._sock], [], [], 0)[0]:
+                return  # between requests a live connection has nothing to read
+            self.close()  # end of file: the daemon restarted or went away
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(self.timeout_s)
+        try:
+            sock.connect(self.path)
+        except OSError:
+            sock.close()
+            raise
+        self._sock, self._reader = sock, sock.makefile("rb")
+
+    def append(self, entry: Dict) -> None:
+        """Send one entry and wait until the daemon reports it on disk.
+
+        An ``OSError`` from here on means the entry was sent but not
+        acknowledged; it may or may not have been committed.
+        """
+        self.connect()
+        try:
+            self._sock.sendall((json.dumps(entry, separators=(",", ":")) + "\n").encode("utf-8"))
+            reply = self._reader.readline()
+        except OSError:
+            self.close()
+            raise
+        if reply != b"ok\n":
+            self.close()
+            raise OSError(f"Log daemon did not commit the entry: {reply.decode('utf-8', 'replace').strip() or 'no reply'}")
+
+    def close(self) -> None:
+        if self._sock is not None:
+            self._reader.close()
+            self._sock.close()
+            self._sock = self._reader = None
+
+
+_clients: Dict[str, LogClient] = {}
+
+
+def append_entry(entry: Dict, directory: str = config.UPTIME_LOG_DIR, use_daemon: Optional[bool] = None) -> bool:
+    """Append through the daemon if enabled and one serves ``directory``, else directly; True if the daemon took it.
+
+    ``use_daemon`` defaults to :data:`config.LOG_DAEMON`. Raises ``OSError``
+    if the daemon took the entry but did not acknowledge it.
+    """
+    if use_daemon is None:
+        use_daemon = config.LOG_DAEMON
+    if use_daemon and hasattr(socket, "AF_UNIX") and os.path.exists(socket_path(directory)):
+        client = _clients.get(directory)
+        if client is None:
+            client = _clients[directory] = LogClient(directory)
+        try:
+            client.connect()
+        except OSError as exc:
+            print(f"⚠️ Log daemon unavailable ({exc}), writing directly")
+        else:
+            client.append(entry)  # no fallback past this point: the daemon may already have the entry
+            return True
+    store.append_entry(entry, directory)
+    return False
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m uptime_monitor.logd", description=__doc__.split("\n")[0])
+    parser.add_argument("--dir", default=config.UPTIME_LOG_DIR)
+    parser.add_argument("--max-batch", type=int, default=MAX_BATCH)
+    parser.add_argument("--queue", type=int, default=QUEUE_SIZE, help="queued entries before senders are blocked")
+    parser.add_argument("--fsync", choices=store.FSYNC_POLICIES, default="always", help="'always' = once per batch")
+    args = parser.parse_args(argv)
+
+    asyncio.run(LogDaemon(args.dir, args.max_batch, args.queue, args.fsync).serve())
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
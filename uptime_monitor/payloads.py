@@ -0,0 +1,94 @@
+"""Message documents sent by the probes: the UDP ping and the simulated TTN uplink."""
+
+from typing import Any, Dict, Optional, Union
+
+from . import config
+
+UDP_TIME_FORMAT = "%Y/%m/%d %H:%M:%S"
+UDP_SENSOR_PAYLOAD = "01e8fde8fde8fde8fd34210100"
+
+Number = Union[int, str]  # str placeholders are used when compiling byte templates
+
+
+def udp_ping(imei: str, time_str: str, one_hour_ago_str: Optional[str] = None, two_hours_ago_str: Optional[str] = None,
+             three_hours_ago_str: Optional[str] = None, signal: Number = 26) -> Dict[str, Any]:
+    """The sensor's UDP document; the hourly history entries are left out when no times are given."""
+    ping = {
+        "IMEI": imei,
+        "IMSI": "901405119966222",
+        "Model": "RS485-NB",
+        "Payload": UDP_SENSOR_PAYLOAD,
+        "battery": 3.614,
+        "signal": signal,
+        "time": time_str,
+    }
+    for key, history_str in (("1", one_hour_ago_str), ("2", two_hours_ago_str), ("3", three_hours_ago_str)):
+        if history_str is not None:
+            ping[key] = [UDP_SENSOR_PAYLOAD, history_str]
+    return ping
+
+
+def ttn_uplink(now_str: str, now_ts: Number, device_id: str = config.TTN_DEVICE_ID,
+               dev_eui: str = config.TTN_DEV_EUI, f_cnt: Number = 55949) -> Dict[str, Any]:
+    return {
+        "end_device_ids": {
+            "device_id": device_id,
+            "application_ids": {"application_id": config.TTN_APP_ID},
+            "dev_eui": dev_eui,
+            "join_eui": "0004A30B0103B1BF",
+            "dev_addr": "260B3523"
+        },
+        "correlation_ids": ["gs:uplink:01K1ZED8R4AV6STYN959VQS6V6"],
+        "received_at": now_str,
+        "uplink_message": {
+            "session_key_id": "AYxdn/mH/5t4ycMmHWkE/A==",
+            "f_port": 1,
+            "f_cnt": f_cnt,
+            "frm_payload": "ABTBACvJq+w=",
+            "decoded_payload": {
+                "field1": 21.700000000000003,
+                "field2": 11.209,
+                "field3": 4.129808,
+                "field4": 171
+            },
+            "rx_metadata": [
+                {
+                    "gateway_ids": {
+                        "gateway_id": "eui-a84041ffff2657ac",
+                        "eui": "A84041FFFF2657AC"
+                    },
+                    "time": now_str,
+                    "timestamp": now_ts,
+                    "rssi": -116,
+                    "channel_rssi": -116,
+                    "snr": -10.2,
+                    "frequency_offset": "-2631",
+                    "uplink_token": "CiIKIAoUZXVpLWE4NDA0MWZmZmYyNjU3YWMSCKhAQf//JlesEN2wr90DGgwItNnMxAYQiqfh2gMgyNaUupHzigE=",
+                    "channel_index": 6,
+                    "received_at": now_str
+                }
+            ],
+            "settings": {
+                "data_rate": {
+                    "lora": {
+                        "bandwidth": 125000,
+                        "spreading_factor": 10,
+                        "coding_rate": "4/5"
+                    }
+                },
+                "frequency": "867700000",
+                "timestamp": now_ts,
+                "time": now_str
+            },
+            "received_at": now_str,
+            "consumed_airtime": "0.370688s",
+            "packet_error_rate": 0.09090909,
+            "network_ids": {
+                "net_id": "000013",
+                "ns_id": "EC656E0000000181",
+                "tenant_id": "ttn",
+                "cluster_id": "eu1",
+                "cluster_address": "eu1.cloud.thethings.network"
+            }
+        }
+    }
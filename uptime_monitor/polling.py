@@ -0,0 +1,97 @@
+"""Poll-until-visible waiting with exponential backoff, jitter and a deadline.
+
+Replaces fixed ``time.sleep`` waits for ingestion: the first query runs
+immediately and the wait ends as soon as the datapoint shows up. The time it
+took becomes the ingestion latency metric.
+"""
+
+import asyncio
+import random
+import time
+from typing import Any, Callable, Iterator, NamedTuple
+
+
+class PollResult(NamedTuple):
+    value: Any        # last value returned by ``fetch``
+    visible: bool     # ``ready(value)`` was true before the deadline
+    elapsed_s: float  # start of the first attempt that saw the value (or time spent polling)
+    attempts: int
+
+
+def backoff_intervals(initial_interval_s: float = 0.5, backoff: float = 1.5, max_interval_s: float = 5.0,
+                      jitter: float = 0.2) -> Iterator[float]:
+    """Endless sequence of jittered, exponentially growing sleep intervals."""
+    interval = initial_interval_s
+    while True:
+        yield interval * random.uniform(1 - jitter, 1 + jitter)
+        interval = min(interval * backoff, max_interval_s)
+
+
+def poll_until(fetch: Callable[[], Any], ready: Callable[[Any], bool], deadline_s: float,
+               initial_interval_s: float = 0.5, backoff: float = 1.5, max_interval_s: float = 5.0,
+               jitter: float = 0.2, clock: Callable[[], float] = time.monotonic,
+               sleep: Callable[[float], None] = time.sleep) -> PollResult:
+    """Call ``fetch`` until ``ready(value)`` holds or ``deadline_s`` has passed.
+
+    Exceptions from ``fetch`` count as "not visible yet"; if the final
+    attempt failed, its exception is re-raised once the deadline is reached.
+    """
+    start = clock()
+    deadline = start + deadline_s
+    intervals = backoff_intervals(initial_interval_s, backoff, max_interval_s, jitter)
+    attempts = 0
+    value = None
+    error = None
+
+    while True:
+        attempts += 1
+        attempt_start = clock()
+        try:
+            value = fetch()
+            error = None
+            if ready(value):
+                return PollResult(value, True, attempt_start - start, attempts)
+        except Exception as e:
+            error = e
+
+        remaining = deadline - clock()
+        if remaining <= 0:
+            break
+        sleep(min(next(intervals), remaining))
+
+    if error is not None:
+        raise error
+    return PollResult(value, False, clock() - start, attempts)
+
+
+async def poll_until_async(fetch: Callable[[], Any], ready: Callable[[Any], bool], deadline_s: float,
+                           initial_interval_s: float = 0.5, backoff: float = 1.5, max_interval_s: float = 5.0,
+                           jitter: float = 0.2) -> PollResult:
+    """:func:`poll_until` for the probe runner: ``fetch`` runs in a worker thread, waits don't block the loop."""
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+    deadline = start + deadline_s
+    intervals = backoff_intervals(initial_interval_s, backoff, max_interval_s, jitter)
+    attempts = 0
+    value = None
+    error = None
+
+    while True:
+        attempts += 1
+        attempt_start = loop.time()
+        try:
+            value = await asyncio.to_thread(fetch)
+            error = None
+            if ready(value):
+                return PollResult(value, True, attempt_start - start, attempts)
+        except Exception as e:
+            error = e
+
+        remaining = deadline - loop.time()
+        if remaining <= 0:
+            break
+        await asyncio.sleep(min(next(intervals), remaining))
+
+    if error is not None:
+        raise error
+    return PollResult(value, False, loop.time() - start, attempts)
@@ -0,0 +1,101 @@
+"""Registry and concurrent asyncio runner for uptime probes.
+
+A probe is a coroutine function (send, await ingestion, verify) that returns
+``True`` when the check passed. Probes are registered with :func:`probe` and
+run together by :func:`run_probes`, so a cycle takes about as long as the
+slowest probe rather than the sum of all of them::
+
+    @probe("udp", timeout_s=60)
+    async def udp_probe():
+        ...
+
+    for result in run_probes_sync():
+        write_uptime_log(result.ok, result.name)
+
+Blocking work (sockets, Influx queries, HTTP) belongs in
+``asyncio.to_thread``; a timed-out probe is cancelled at its next ``await``.
+A probe that writes to the uptime log takes a ``log_dir`` keyword, which the
+scheduler fills in with its ``--dir`` (see :func:`bind_log_dir`).
+"""
+
+import asyncio
+import functools
+import inspect
+from typing import Awaitable, Callable, Dict, Iterable, List, NamedTuple, Optional
+
+from . import metrics
+
+DEFAULT_TIMEOUT_S = 60.0
+DEFAULT_CONCURRENCY = 8
+
+
+class Probe(NamedTuple):
+    name: str
+    run: Callable[[], Awaitable[bool]]
+    timeout_s: float
+    record: bool = True  # False: the probe logs its own measurements, not a pass/fail result
+
+
+class ProbeResult(NamedTuple):
+    name: str
+    ok: bool
+    duration_s: float
+    error: Optional[str]  # exception or timeout message when the probe did not complete
+
+
+_registry: Dict[str, Probe] = {}
+
+
+def probe(name: str, timeout_s: float = DEFAULT_TIMEOUT_S, record: bool = True):
+    """Decorator registering a coroutine function as probe ``name``."""
+    def register(fn: Callable[[], Awaitable[bool]]):
+        if name in _registry:
+            raise ValueError(f"Probe {name!r} is already registered")
+        _registry[name] = Probe(name, fn, timeout_s, record)
+        return fn
+    return register
+
+
+def registered_probes() -> List[Probe]:
+    return list(_registry.values())
+
+
+def bind_log_dir(p: Probe, log_dir: str) -> Probe:
+    """``p`` writing to ``log_dir``; probes without a ``log_dir`` keyword are returned unchanged."""
+    if "log_dir" not in inspect.signature(p.run).parameters:
+        return p
+    return p._replace(run=functools.partial(p.run, log_dir=log_dir))
+
+
+async def run_probe(p: Probe) -> ProbeResult:
+    """Run one probe under its timeout; an exception or timeout becomes a failed result."""
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+    try:
+        ok = bool(await asyncio.wait_for(p.run(), p.timeout_s))
+        error = None
+    except asyncio.TimeoutError:
+        ok, error = False, f"timed out after {p.timeout_s:.3g}s"
+    except Exception as e:
+        ok, error = False, str(e) or type(e).__name__
+    duration = loop.time() - start
+    metrics.stages.observe(p.name, "probe", duration, failed=not ok)
+    return ProbeResult(p.name, ok, duration, error)
+
+
+async def _run_one(p: Probe, limit: asyncio.Semaphore) -> ProbeResult:
+    async with limit:
+        return await run_probe(p)
+
+
+async def run_probes(probes: Optional[Iterable[Probe]] = None,
+                     concurrency: int = DEFAULT_CONCURRENCY) -> List[ProbeResult]:
+    """Run ``probes`` (default: all registered) concurrently; results keep registration order."""
+    probes = registered_probes() if probes is None else list(probes)
+    limit = asyncio.Semaphore(concurrency)
+    return list(await asyncio.gather(*(_run_one(p, limit) for p in probes)))
+
+
+def run_probes_sync(probes: Optional[Iterable[Probe]] = None,
+                    concurrency: int = DEFAULT_CONCURRENCY) -> List[ProbeResult]:
+    return asyncio.run(run_probes(probes, concurrency))
@@ -0,0 +1,109 @@
+"""Single-flight, TTL and LRU cache in front of the Influx freshness queries.
+
+Checks that ask the same question at the same time share one request: the
+first caller (the leader) queries Influx, and callers that arrive while it
+is in flight wait for its answer (coalesced). The answer is then served
+from the cache for ``ttl_s`` (hits). At most ``max_entries`` answers are
+kept, evicting the least recently used. Errors are passed to every waiting
+caller and are never cached.
+
+A probe that has just sent a datapoint calls :meth:`QueryCache.invalidate`
+for its target. Cached answers for that target are dropped, and a query
+already in flight no longer counts: the next caller starts a new one, and
+the old answer is not stored::
+
+    freshness = QueryCache(ttl_s=0.25)
+    latest = freshness.get(key, lambda: latest_times(...)[target], timeout_s=5)
+    freshness.invalidate(lambda key: key[-1] == target)
+    freshness.stats()  # {"hits": ..., "misses": ..., "coalesced": ..., ...}
+
+Threads, not asyncio: the checks run their queries in ``asyncio.to_thread``.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from concurrent.futures import TimeoutError as FutureTimeout
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+
+class QueryCache:
+    """Thread-safe cache of query answers by key; one instance per kind of query."""
+
+    def __init__(self, ttl_s: float, max_entries: int = 256, clock: Callable[[], float] = time.monotonic):
+        self.ttl_s = ttl_s
+        self.max_entries = max_entries
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()  # key -> (expires at, value)
+        self._inflight: Dict[Hashable, Future] = {}
+        self._counts = {"hits": 0, "misses": 0, "coalesced": 0, "evictions": 0, "invalidations": 0}
+
+    def get(self, key: Hashable, fetch: Callable[[], Any], timeout_s: Optional[float] = None) -> Any:
+        """The cached answer for ``key``, the answer of the query in flight, or ``fetch()``.
+
+        A caller waiting for another caller's query gives up after ``timeout_s``
+        with ``TimeoutError``; the query itself carries on for the leader.
+        """
+        with self._lock:
+            cached = self._entries.get(key)
+            if cached is not None and cached[0] > self._clock():
+                self._entries.move_to_end(key)
+                self._counts["hits"] += 1
+                return cached[1]
+            future = self._inflight.get(key)
+            leader = future is None
+            if leader:
+                future = self._inflight[key] = Future()
+                self._counts["misses"] += 1
+            else:
+                self._counts["coalesced"] += 1
+        if not leader:
+            try:
+                return future.result(timeout_s)
+            except FutureTimeout:
+                raise TimeoutError(f"coalesced query still running after {timeout_s:.3g}s") from None
+
+        try:
+            value = fetch()
+        except BaseException as e:
+            with self._lock:
+                if self._inflight.get(key) is future:
+                    del self._inflight[key]
+            future.set_exception(e)
+            raise
+        with self._lock:
+            if self._inflight.get(key) is future:  # not invalidated meanwhile
+                del self._inflight[key]
+                self._store(key, value)
+        future.set_result(value)
+        return value
+
+    def _store(self, key: Hashable, value: Any) -> None:
+        if self.ttl_s <= 0 or self.max_entries <= 0:
+            return
+        self._entries[key] = (self._clock() + self.ttl_s, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self._counts["evictions"] += 1
+
+    def invalidate(self, match: Optional[Callable[[Hashable], bool]] = None) -> int:
+        """Forget the answers (cached or in flight) of the keys ``match`` accepts, or all; returns how many."""
+        with self._lock:
+            keys = {k for k in (*self._entries, *self._inflight) if match is None or match(k)}
+            for key in keys:
+                self._entries.pop(key, None)
+                self._inflight.pop(key, None)
+            self._counts["invalidations"] += len(keys)
+        return len(keys)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._inflight.clear()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {**self._counts, "size": len(self._entries), "inflight": len(self._inflight)}
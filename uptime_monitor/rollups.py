@@ -0,0 +1,275 @@
+"""Incremental hourly/daily rollups of the uptime log.
+
+Per service and per UTC hour and day, the rollups keep:
+
+* boolean checks: ``[ok, fail]``
+* numeric series (``cloudSpeedSingle``, ``udpIngestion``, ...): ``[count, min, max, sum]``
+  plus a mergeable quantile sketch (see :mod:`uptime_monitor.sketch`) for p50/p95/p99
+
+They live next to the log in ``uptime-log/rollups/<YYYY-MM>.json``, one
+small file per month. Each file also records how many bytes of every log
+segment it has absorbed. Catching up therefore reads only the lines
+appended since the last run, and the file is replaced atomically with its
+watermark, so a crash can never count a line twice. Summing whole days plus
+the hours at the edges gives the same numbers as a full recompute, for
+windows aligned to whole hours.
+
+Months moved to the compressed archive were rolled up while they were
+segments; a rebuild rolls them up from the archive instead.
+
+The rollups are derived data and are not committed (``.gitignore``); on a
+fresh checkout the first catch-up builds them from the log.
+
+``migrate_json_array`` rewrites segments. After migrating into a log that
+already has rollups, run ``rebuild``.
+
+Usage::
+
+    python -m uptime_monitor.rollups catch-up | rebuild | verify
+    python -m uptime_monitor.rollups report [--days 30 100 365] [--quantiles 0.5 0.95 0.99]
+"""
+
+import argparse
+import json
+import os
+import shutil
+import sys
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from . import archive, config, store
+from .sketch import QuantileSketch
+from .windows import WindowUptime
+
+ROLLUP_DIRNAME = "rollups"
+HINTS_FILE = "offsets.json"  # segment -> absorbed bytes; a lower bound of the per-month watermarks
+FORMAT_VERSION = 2  # files of another version are discarded and rebuilt on the next catch-up
+KINDS = ("checks", "series", "sketches")
+
+
+def _utc_iso(timestamp: str) -> str:
+    if timestamp.endswith("Z") or timestamp.endswith("+00:00"):
+        return timestamp
+    return store.parse_timestamp(timestamp).astimezone(timezone.utc).isoformat()
+
+
+def _empty_month() -> Dict:
+    month = {"version": FORMAT_VERSION, "offsets": {}}
+    month.update((kind, {"hourly": {}, "daily": {}}) for kind in KINDS)
+    return month
+
+
+def add_entry(month: Dict, entry: Dict) -> None:
+    """Fold one log entry into a month's buckets."""
+    ts = _utc_iso(entry["timestamp"])
+    keys = (("hourly", ts[:13]), ("daily", ts[:10]))
+    for service, value in entry.items():
+        if service == "timestamp":
+            continue
+        if isinstance(value, bool):
+            for resolution, key in keys:
+                bucket = month["checks"][resolution].setdefault(service, {}).setdefault(key, [0, 0])
+                bucket[0 if value else 1] += 1
+        elif isinstance(value, (int, float)):
+            for resolution, key in keys:
+                bucket = month["series"][resolution].setdefault(service, {}).get(key)
+                if bucket is None:
+                    month["series"][resolution][service][key] = [1, value, value, value]
+                else:
+                    bucket[0] += 1
+                    bucket[1] = min(bucket[1], value)
+                    bucket[2] = max(bucket[2], value)
+                    bucket[3] += value
+                sketch = month["sketches"][resolution].setdefault(service, {}).setdefault(key, [0, 0])
+                QuantileSketch(sketch).add(value)
+
+
+class Rollups:
+    """Reader/updater for the monthly rollup files of one log directory."""
+
+    def __init__(self, log_dir: str = config.UPTIME_LOG_DIR):
+        self.log = store.SegmentedLog(log_dir)
+        self.directory = os.path.join(log_dir, ROLLUP_DIRNAME)
+        self._months: Dict[str, Dict] = {}
+
+    def _path(self, month: str) -> str:
+        return os.path.join(self.directory, month + ".json")
+
+    def month(self, month: str) -> Dict:
+        if month not in self._months:
+            try:
+                with open(self._path(month), "r", encoding="utf-8") as f:
+                    self._months[month] = json.load(f)
+            except FileNotFoundError:
+                self._months[month] = _empty_month()
+            if self._months[month].get("version") != FORMAT_VERSION:
+                self._months[month] = _empty_month()
+        return self._months[month]
+
+    def _save(self, month: str) -> None:
+        os.makedirs(self.directory, exist_ok=True)
+        path = self._path(month)
+        with open(path + ".tmp", "w", encoding="utf-8") as f:
+            json.dump(self._months[month], f, separators=(",", ":"))
+        os.replace(path + ".tmp", path)
+
+    def _load_hints(self) -> Dict[str, int]:
+        try:
+            with open(os.path.join(self.directory, HINTS_FILE), "r", encoding="utf-8") as f:
+                hints = json.load(f)
+        except FileNotFoundError:
+            return {}
+        return hints["offsets"] if hints.get("version") == FORMAT_VERSION else {}
+
+    def catch_up(self) -> int:
+        """Absorb every log line appended since the last run; returns the number of entries added."""
+        hints = self._load_hints()
+        saved_hints = dict(hints)
+        added = 0
+        dirty = set()
+        for month_key in archive.months(self.log.directory):
+            marker = f"{archive.ARCHIVE_DIRNAME}/{month_key}"
+            if hints.get(marker):
+                continue
+            month = self.month(month_key)
+            # rolled up while it was still a segment, or already from the archive
+            if marker not in month["offsets"] and not any(key[:7] == month_key for key in month["offsets"]):
+                for entry in archive.iter_entries(self.log.directory, month_key):
+                    add_entry(month, entry)
+                    added += 1
+                month["offsets"][marker] = 1
+                dirty.add(month_key)
+            hints[marker] = 1
+        for segment in self.log.segments():
+            path = self.log.segment_path(segment)
+            size = os.path.getsize(path)
+            if hints.get(segment, 0) >= size:
+                continue
+            month_key = segment[:7]
+            month = self.month(month_key)
+            offset = month["offsets"].get(segment, 0)
+            if offset >= size:
+                hints[segment] = offset
+                continue
+            for offset, entry in self.log.read_from(segment, offset):
+                add_entry(month, entry)
+                added += 1
+            month["offsets"][segment] = offset
+            hints[segment] = offset
+            dirty.add(month_key)
+
+        for month_key in sorted(dirty):
+            self._save(month_key)  # data and watermark land together
+        if hints != saved_hints:
+            os.makedirs(self.directory, exist_ok=True)
+            with open(os.path.join(self.directory, HINTS_FILE + ".tmp"), "w", encoding="utf-8") as f:
+                json.dump({"version": FORMAT_VERSION, "offsets": hints}, f, separators=(",", ":"))
+            os.replace(os.path.join(self.directory, HINTS_FILE + ".tmp"), os.path.join(self.directory, HINTS_FILE))
+        return added
+
+    def _buckets(self, kind: str, service: str, start: datetime, end: datetime):
+        """Yield the buckets covering the hours that start in ``[floor_hour(start), end)``."""
+        cursor = start.astimezone(timezone.utc).replace(minute=0, second=0, microsecond=0)
+        end = end.astimezone(timezone.utc)
+        while cursor < end:
+            month = self.month(cursor.strftime("%Y-%m"))[kind]
+            if cursor.hour == 0 and cursor + timedelta(days=1) <= end:
+                bucket = month["daily"].get(service, {}).get(cursor.strftime("%Y-%m-%d"))
+                cursor += timedelta(days=1)
+            else:
+                bucket = month["hourly"].get(service, {}).get(cursor.strftime("%Y-%m-%dT%H"))
+                cursor += timedelta(hours=1)
+            if bucket is not None:
+                yield bucket
+
+    def uptime(self, service: str, start: datetime, end: datetime) -> WindowUptime:
+        ok = fail = 0
+        for bucket in self._buckets("checks", service, start, end):
+            ok += bucket[0]
+            fail += bucket[1]
+        return WindowUptime(ok, ok + fail)
+
+    def series_stats(self, service: str, start: datetime, end: datetime) -> Optional[Tuple[int, float, float, float]]:
+        """``(count, min, max, mean)`` of a numeric series, or ``None`` without samples."""
+        count, low, high, total = 0, None, None, 0
+        for n, bucket_min, bucket_max, bucket_sum in self._buckets("series", service, start, end):
+            count += n
+            low = bucket_min if low is None else min(low, bucket_min)
+            high = bucket_max if high is None else max(high, bucket_max)
+            total += bucket_sum
+        return (count, low, high, total / count) if count else None
+
+    def quantiles(self, service: str, start: datetime, end: datetime,
+                  qs: Iterable[float] = (0.5, 0.95, 0.99)) -> List[Optional[float]]:
+        """Quantiles of a numeric series over the window, merged from the bucket sketches."""
+        merged = QuantileSketch.merged(QuantileSketch(data) for data in self._buckets("sketches", service, start, end))
+        return merged.quantiles(qs)
+
+    def services(self, kind: str = "checks") -> List[str]:
+        names = set()
+        for name in os.listdir(self.directory) if os.path.isdir(self.directory) else []:
+            if name.endswith(".json") and name != HINTS_FILE:
+                names.update(self.month(name[:-5])[kind]["daily"])
+        return sorted(names)
+
+
+def recompute(log_dir: str = config.UPTIME_LOG_DIR) -> Dict[str, Dict]:
+    """Month buckets computed from scratch, without touching the rollup files."""
+    months: Dict[str, Dict] = {}
+    for entry in store.read_entries(log_dir):
+        add_entry(months.setdefault(_utc_iso(entry["timestamp"])[:7], _empty_month()), entry)
+    return months
+
+
+def verify(log_dir: str = config.UPTIME_LOG_DIR) -> bool:
+    rollups = Rollups(log_dir)
+    expected = recompute(log_dir)
+    stored_months = os.listdir(rollups.directory) if os.path.isdir(rollups.directory) else []
+    months = set(expected) | {n[:-5] for n in stored_months if n.endswith(".json") and n != HINTS_FILE}
+    for month in sorted(months):
+        stored = rollups.month(month)
+        fresh = expected.get(month, _empty_month())
+        if any(stored[kind] != fresh[kind] for kind in KINDS):
+            print(f"Rollups for {month} differ from a full recompute")
+            return False
+    return True
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m uptime_monitor.rollups", description=__doc__.split("\n")[0])
+    parser.add_argument("command", choices=("catch-up", "rebuild", "verify", "report"))
+    parser.add_argument("--dir", default=config.UPTIME_LOG_DIR)
+    parser.add_argument("--days", nargs="*", type=float, default=[30, 100, 365])
+    parser.add_argument("--quantiles", nargs="*", type=float, default=[0.5, 0.95, 0.99])
+    args = parser.parse_args(argv)
+    if any(not 0 <= q <= 1 for q in args.quantiles):
+        parser.error("--quantiles must be between 0 and 1, e.g. 0.95 for p95")
+
+    if args.command == "rebuild":
+        shutil.rmtree(os.path.join(args.dir, ROLLUP_DIRNAME), ignore_errors=True)
+    if args.command in ("catch-up", "rebuild"):
+        print(f"Rolled up {Rollups(args.dir).catch_up()} new entries")
+    elif args.command == "verify":
+        ok = verify(args.dir)
+        print("✅ Rollups match a full recompute" if ok else "❌ Rollups are out of date; run rebuild")
+        return 0 if ok else 1
+    else:
+        rollups = Rollups(args.dir)
+        now = datetime.now(timezone.utc)
+        for service in rollups.services():
+            print(f"{service}:")
+            for days in args.days:
+                result = rollups.uptime(service, now - timedelta(days=days), now)
+                percent = "-" if result.percent is None else f"{result.percent:.2f}%"
+                print(f"  last {days:g} days: {percent} ({result.up}/{result.total})")
+        for service in rollups.services("series"):
+            print(f"{service}:")
+            for days in args.days:
+                values = rollups.quantiles(service, now - timedelta(days=days), now, args.quantiles)
+                text = ", ".join(f"p{q * 100:g} {'-' if v is None else f'{v:.0f}'}" for q, v in zip(args.quantiles, values))
+                print(f"  last {days:g} days: {text}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
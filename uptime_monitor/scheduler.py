@@ -0,0 +1,227 @@
+"""Long-running scheduler: every probe on its own interval in one warm process.
+
+Instead of a fresh interpreter per cycle (re-importing ``influxdb_client``
+and ``requests`` and re-opening connections), the daemon imports the probe
+module once. It then runs each registered probe on its own interval, so
+the module-level ``ClientRuntime`` keeps its connections alive between runs.
+
+Scheduling, per job:
+
+* Ticks sit on a fixed grid (``start + k * interval``), each delayed by a
+  random jitter in ``[0, jitter * interval)`` so jobs sharing an interval
+  do not fire in lockstep.
+* A job never overlaps itself: runs are awaited in order, and a probe is
+  cancelled after its own ``timeout_s``. A second daemon on the same log
+  directory refuses to start.
+* Ticks that passed while a run was still going, or while the process was
+  suspended, are *missed*. The ``missed`` policy decides what happens next:
+  ``skip`` waits for the next grid tick, ``once`` runs once immediately, and
+  ``all`` runs once per missed tick (at most ``max_catch_up``) back to back.
+
+Results go to the uptime log (through the log daemon with UPTIME_LOG_DAEMON=1) and
+the alert engine; rollups are caught up every ``--rollup-every`` seconds.
+Per-stage timings are served as OpenMetrics on ``--metrics-port``
+(``GET /metrics``) and/or rewritten to ``--metrics-file`` after every run.
+
+``uptime_monitor.checks`` truncates the UDP payload time to the hour. For
+minute-level checks, set ``UDP_TIME_RESOLUTION_S=60``. Otherwise every run
+after the first in an hour finds the earlier run's point.
+
+Usage::
+
+    UDP_TIME_RESOLUTION_S=60 python -m uptime_monitor.scheduler --every udp=60 ttn=60 [--missed skip]
+"""
+
+import argparse
+import asyncio
+import importlib
+import math
+import os
+import random
+import signal
+import sys
+from datetime import datetime, timezone
+from typing import Awaitable, Callable, Dict, Iterable, List, Optional
+
+from . import alerts, config, logd, metrics, rollups
+from .probes import Probe, ProbeResult, bind_log_dir, registered_probes, run_probe
+
+MISSED_POLICIES = ("skip", "once", "all")
+LOCK_NAME = ".scheduler.lock"
+
+
+class Job:
+    def __init__(self, probe: Probe, interval_s: float, jitter: float = 0.1, missed: str = "skip",
+                 max_catch_up: int = 10, record: bool = True):
+        if missed not in MISSED_POLICIES:
+            raise ValueError(f"Unknown missed-tick policy {missed!r}, expected one of {MISSED_POLICIES}")
+        if interval_s <= 0:
+            raise ValueError("interval_s must be positive")
+        self.probe = probe
+        self.interval_s = interval_s
+        self.jitter = jitter
+        self.missed = missed
+        self.max_catch_up = max_catch_up
+        self.record = record  # False for maintenance jobs that must not show up in the uptime log
+        self.runs = 0
+        self.failures = 0
+        self.missed_ticks = 0
+        self.last: Optional[ProbeResult] = None
+        self._late_until = 0  # ticks before this grid index are already counted as missed
+
+    @property
+    def name(self) -> str:
+        return self.probe.name
+
+    def next_index(self, index: int, elapsed_s: float) -> int:
+        """Grid index of the next run after the run for tick ``index - 1`` ended ``elapsed_s`` after start."""
+        first_future = math.ceil(elapsed_s / self.interval_s)  # a tick due right now has not passed
+        if first_future <= index:
+            return index
+        self.missed_ticks += first_future - max(index, self._late_until)
+        self._late_until = first_future
+        if self.missed == "skip":
+            return first_future
+        if self.missed == "once":
+            return first_future - 1
+        return max(index, first_future - self.max_catch_up)
+
+
+def record_result(result: ProbeResult, log_dir: str = config.UPTIME_LOG_DIR) -> None:
+    if result.error:
+        print(f"⚠️ {result.name.upper()} test failed: {result.error}")
+    logd.append_entry({"timestamp": datetime.now(timezone.utc).isoformat(), result.name: result.ok}, log_dir)
+    alerts.report(alerts.catch_up(log_dir))
+
+
+class Scheduler:
+    def __init__(self, jobs: Iterable[Job], on_result: Callable[[ProbeResult], None] = record_result,
+                 rng: Optional[random.Random] = None, clock: Optional[Callable[[], float]] = None,
+                 sleep: Callable[[float], Awaitable] = asyncio.sleep):
+        self.jobs = list(jobs)
+        self.on_result = on_result
+        self.rng = rng or random.Random()
+        self.clock = clock  # default: the event loop's clock; tests pass a fake clock with its own sleep
+        self.sleep = sleep
+
+    async def run(self, stop: Optional[asyncio.Event] = None) -> None:
+        stop = stop or asyncio.Event()
+        await asyncio.gather(*(self._drive(job, stop) for job in self.jobs))
+
+    async def _wait(self, delay_s: float, stop: asyncio.Event) -> bool:
+        """Sleep ``delay_s``; True if ``stop`` was set first."""
+        sleeping, stopped = asyncio.ensure_future(self.sleep(delay_s)), asyncio.ensure_future(stop.wait())
+        await asyncio.wait((sleeping, stopped), return_when=asyncio.FIRST_COMPLETED)
+        sleeping.cancel()
+        stopped.cancel()
+        return stop.is_set()
+
+    async def _drive(self, job: Job, stop: asyncio.Event) -> None:
+        clock = self.clock or asyncio.get_running_loop().time
+        start = clock()
+        index = 0
+        while not stop.is_set():
+            tick = start + index * job.interval_s + self.rng.uniform(0, job.jitter * job.interval_s)
+            if await self._wait(max(0.0, tick - clock()), stop):
+                return
+            result = await run_probe(job.probe)
+            job.runs += 1
+            job.failures += not result.ok
+            job.last = result
+            if job.record:
+                await asyncio.to_thread(self.on_result, result)
+            index = job.next_index(index + 1, clock() - start)
+
+    def stats(self) -> Dict[str, Dict]:
+        return {job.name: {"runs": job.runs, "failures": job.failures, "missed": job.missed_ticks,
+                           "last_s": round(job.last.duration_s, 3) if job.last else None} for job in self.jobs}
+
+
+def _acquire_lock(log_dir: str):
+    """Hold an exclusive lock on the log directory for the life of the process; None if unsupported."""
+    try:
+        import fcntl
+    except ImportError:
+        return None
+    os.makedirs(log_dir, exist_ok=True)
+    handle = open(os.path.join(log_dir, LOCK_NAME), "w")
+    try:
+        fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        handle.close()
+        raise SystemExit(f"Another scheduler is already running for {log_dir}/")
+    return handle
+
+
+def _intervals(values: List[str]) -> Dict[str, float]:
+    intervals = {}
+    for value in values:
+        name, _, seconds = value.partition("=")
+        intervals[name] = float(seconds)
+    return intervals
+
+
+async def _serve(scheduler: Scheduler) -> None:
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+    await scheduler.run(stop)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m uptime_monitor.scheduler", description=__doc__.split("\n")[0])
+    parser.add_argument("--module", default="uptime_monitor.checks", help="module whose @probe functions are scheduled")
+    parser.add_argument("--every", nargs="*", default=["udp=60", "ttn=60"], metavar="PROBE=SECONDS")
+    parser.add_argument("--jitter", type=float, default=0.1, help="fraction of the interval")
+    parser.add_argument("--missed", choices=MISSED_POLICIES, default="skip")
+    parser.add_argument("--max-catch-up", type=int, default=10)
+    parser.add_argument("--rollup-every", type=float, default=600)
+    parser.add_argument("--dir", default=config.UPTIME_LOG_DIR)
+    parser.add_argument("--metrics-port", type=int, help="serve per-stage timings on 127.0.0.1:PORT/metrics")
+    parser.add_argument("--metrics-file", help="rewrite per-stage timings here after every run")
+    args = parser.parse_args(argv)
+
+    lock = _acquire_lock(args.dir)
+    sys.path.insert(0, os.getcwd())
+    module = importlib.import_module(args.module)
+    probes = {p.name: bind_log_dir(p, args.dir) for p in registered_probes()}
+    intervals = _intervals(args.every)
+    unknown = sorted(set(intervals) - set(probes))
+    if unknown:
+        parser.error(f"unknown probes {unknown}; {args.module} registers {sorted(probes)}")
+
+    jobs = [Job(probes[name], seconds, args.jitter, args.missed, args.max_catch_up, probes[name].record)
+            for name, seconds in intervals.items()]
+
+    async def catch_up_rollups() -> bool:
+        print(f"Rolled up {await asyncio.to_thread(rollups.Rollups(args.dir).catch_up)} new log entries")
+        return True
+
+    jobs.append(Job(Probe("rollups", catch_up_rollups, args.rollup_every), args.rollup_every, record=False))
+
+    def on_result(result: ProbeResult) -> None:
+        record_result(result, args.dir)
+        if args.metrics_file:
+            metrics.stages.write(args.metrics_file)
+
+    scheduler = Scheduler(jobs, on_result)
+    server = metrics.stages.serve(args.metrics_port) if args.metrics_port else None
+    print(f"⏱️ Scheduling {', '.join(f'{j.name} every {j.interval_s:g}s' for j in jobs)}", flush=True)
+    try:
+        asyncio.run(_serve(scheduler))
+    finally:
+        print(f"Scheduler stats: {scheduler.stats()}")
+        if server is not None:
+            server.shutdown()
+        runtime = getattr(module, "runtime", None)
+        if runtime is not None:
+            print(f"Connection stats: {runtime.stats()}")
+            runtime.close()
+        if lock is not None:
+            lock.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
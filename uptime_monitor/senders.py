@@ -0,0 +1,78 @@
+"""Send the probe messages: the UDP ping and the simulated TTN uplink.
+
+Standard library only, so ``python -m uptime_monitor send`` starts without
+loading ``requests`` or the Influx client. :func:`simulate_ttn_uplink` posts
+with ``urllib`` unless a pooled ``post`` (``ClientRuntime.http.post``) is
+passed in.
+
+Usage::
+
+    sent_at = send_udp_ping(resolution_s=3600)  # payload time, UTC
+    ok = simulate_ttn_uplink()
+"""
+
+import json
+import socket
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, Optional, Tuple
+
+from . import config, payloads
+
+
+def send_udp_ping(imei: str = config.IMEI, target: Tuple[str, int] = (config.UDP_IP, config.UDP_PORT),
+                  resolution_s: int = 1, timeout_s: Optional[float] = None) -> datetime:
+    """Send one UDP ping; return the timestamp the payload carries, in UTC.
+
+    The payload time is the current local time truncated to ``resolution_s``;
+    the three history entries are always whole hours, like the sensor's.
+    ``timeout_s`` bounds a send that would block (full socket buffer).
+    """
+    now = datetime.now().replace(microsecond=0)
+    now -= timedelta(seconds=(now.minute * 60 + now.second) % resolution_s)
+    hour = now.replace(minute=0, second=0)
+    history = [(hour - timedelta(hours=k)).strftime(payloads.UDP_TIME_FORMAT) for k in (1, 2, 3)]
+    udp_payload = payloads.udp_ping(imei, now.strftime(payloads.UDP_TIME_FORMAT), *history)
+
+    print(f"Sending UDP packet to {target[0]}:{target[1]}")
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+        sock.settimeout(timeout_s)
+        sock.sendto(json.dumps(udp_payload).encode("utf-8"), target)
+    return now.astimezone(timezone.utc)
+
+
+def simulate_ttn_uplink(url: str = config.TTN_SIMULATE_URL, api_key: Optional[str] = config.TTN_API_KEY,
+                        post: Optional[Callable] = None, timeout_s: float = 10.0) -> bool:
+    """POST a simulated uplink for the TTN test device; False (and the response printed) unless 200.
+
+    ``timeout_s`` is passed to the connect and to every read, with or without ``post``.
+    """
+    now_dt = datetime.now(timezone.utc)
+    payload = payloads.ttn_uplink(now_dt.isoformat().replace("+00:00", "Z"), int(now_dt.timestamp()))
+    headers = {
+        "Authorization": f"Bearer {api_key}",
+        "Content-Type": "application/json"
+    }
+
+    print(f"Simulating TTN uplink for device {config.TTN_DEVICE_ID}")
+    if post is None:
+        status, text = _urllib_post(url, headers, payload, timeout_s)
+    else:
+        resp = post(url, headers=headers, json=payload, timeout=timeout_s)
+        status, text = resp.status_code, resp.text
+    print(f"TTN simulation response status: {status}")
+
+    if status != 200:
+        print(f"Failed to simulate TTN uplink: {text}")
+        return False
+    return True
+
+
+def _urllib_post(url: str, headers: Dict[str, str], payload: Dict, timeout_s: float) -> Tuple[int, str]:
+    from urllib import error, request
+
+    req = request.Request(url, data=json.dumps(payload).encode("utf-8"), headers=headers, method="POST")
+    try:
+        with request.urlopen(req, timeout=timeout_s) as resp:
+            return resp.status, resp.read().decode("utf-8", "replace")
+    except error.HTTPError as e:
+        return e.code, e.read().decode("utf-8", "replace")
@@ -0,0 +1,106 @@
+"""Mergeable quantile sketch for latency series (DDSketch-style).
+
+Values are counted in logarithmic buckets of ratio ``GAMMA``. Any quantile
+is therefore returned within ``RELATIVE_ACCURACY`` (1%) of the exact sample
+at that rank, whatever the distribution. Two sketches merge by adding their
+bucket counts. A sketch built from two halves equals one built from all the
+samples, so hourly sketches add up to exact daily or monthly ones.
+
+Latencies from 1 ms to a day span about 900 buckets. A typical hour of
+``cloudSpeedSingle`` results fits in a few dozen, so there is no bucket
+cap. Values ``<= 0`` go to a separate zero bucket.
+
+The state is a plain list, ``[zero_count, first_index, count, count, ...]``.
+It is JSON-serialisable as is and is stored that way in the rollup files.
+
+Usage::
+
+    sketch = QuantileSketch()
+    for value in latencies_ms:
+        sketch.add(value)
+    p50, p95, p99 = sketch.quantiles((0.5, 0.95, 0.99))
+"""
+
+import math
+from typing import Iterable, List, Optional
+
+RELATIVE_ACCURACY = 0.01
+GAMMA = (1 + RELATIVE_ACCURACY) / (1 - RELATIVE_ACCURACY)
+_LOG_GAMMA = math.log(GAMMA)
+
+
+class QuantileSketch:
+    __slots__ = ("data",)
+
+    def __init__(self, data: Optional[List[int]] = None):
+        self.data = data if data is not None else [0, 0]
+
+    @property
+    def count(self) -> int:
+        return self.data[0] + sum(self.data[2:])
+
+    def _position(self, index: int) -> int:
+        """List position of bucket ``index``, growing the list to cover it."""
+        data = self.data
+        if len(data) == 2:
+            data[1] = index
+            data.append(0)
+            return 2
+        position = index - data[1] + 2
+        if position < 2:
+            data[2:2] = [0] * (2 - position)
+            data[1] = index
+            return 2
+        if position >= len(data):
+            data.extend([0] * (position - len(data) + 1))
+        return position
+
+    def add(self, value: float, count: int = 1) -> None:
+        if value <= 0:
+            self.data[0] += count
+        else:
+            self.data[self._position(math.ceil(math.log(value) / _LOG_GAMMA))] += count
+
+    def merge(self, other: "QuantileSketch") -> None:
+        theirs = other.data
+        self.data[0] += theirs[0]
+        if len(theirs) == 2:
+            return
+        self._position(theirs[1] + len(theirs) - 3)
+        offset = self._position(theirs[1])
+        for i, n in enumerate(theirs[2:]):
+            self.data[offset + i] += n
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Value at rank ``q * (count - 1)`` within ``RELATIVE_ACCURACY``; ``None`` if empty.
+
+        ``q`` must be in ``[0, 1]`` (``ValueError`` otherwise), e.g. 0.95 for p95.
+        """
+        return self.quantiles((q,))[0]
+
+    def quantiles(self, qs: Iterable[float]) -> List[Optional[float]]:
+        qs = list(qs)
+        for q in qs:
+            if not 0 <= q <= 1:
+                raise ValueError(f"Quantiles must be between 0 and 1, got {q!r}")
+        total = self.count
+        if not total:
+            return [None] * len(qs)
+        ranks = sorted((q * (total - 1), i) for i, q in enumerate(qs))
+        out: List[Optional[float]] = [None] * len(qs)
+        cumulative = self.data[0]
+        index = self.data[1] - 1
+        buckets = iter(self.data[2:])
+        for rank, i in ranks:
+            while cumulative <= rank:
+                cumulative += next(buckets)
+                index += 1
+            out[i] = 0.0 if index < self.data[1] else 2 * GAMMA ** index / (GAMMA + 1)
+        return out
+
+    @classmethod
+    def merged(cls, sketches: Iterable["QuantileSketch"]) -> "QuantileSketch":
+        result = cls()
+        for sketch in sketches:
+            result.merge(sketch)
+        return result
@@ -0,0 +1,296 @@
+"""Append-only, time-segmented storage for uptime log entries.
+
+Entries are stored as compact JSON lines, one file per UTC month (or day)
+under ``uptime-log/``, e.g. ``uptime-log/2025-06.jsonl``; old months move to
+``uptime-log/archive/`` (see :mod:`uptime_monitor.archive`). Recording a probe
+result is a single ``write()`` on a file opened with ``O_APPEND`` instead of
+rewriting the whole history. The legacy ``uptime-log.json`` array is imported
+once with :func:`migrate_json_array`.
+
+Usage::
+
+    python -m uptime_monitor.store migrate [--source uptime-log.json] [--dir uptime-log]
+    python -m uptime_monitor.store export [--dir uptime-log] > uptime-log.json
+"""
+
+import argparse
+import json
+import os
+import sys
+from datetime import datetime, timezone
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+DEFAULT_LOG_DIR = "uptime-log"
+LEGACY_LOG_FILE = "uptime-log.json"
+SEGMENT_SUFFIX = ".jsonl"
+MIGRATING_SUFFIX = ".migrating"  # the legacy file while its import is in progress
+
+# always:  fsync after every appended entry
+# segment: fsync once when a segment file is closed or rotated
+# never:   leave flushing to the operating system
+FSYNC_POLICIES = ("always", "segment", "never")
+ROTATIONS = {"month": 7, "day": 10}  # length of the "YYYY-MM[-DD]" segment key
+
+
+def parse_timestamp(timestamp: str) -> datetime:
+    """Parse an ISO 8601 log timestamp (``...Z`` or ``...+00:00``) to an aware datetime."""
+    if timestamp.endswith("Z"):
+        timestamp = timestamp[:-1] + "+00:00"
+    dt = datetime.fromisoformat(timestamp)
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt
+
+
+def segment_key(timestamp: str, rotation: str = "month") -> str:
+    """Return the segment name an entry with ``timestamp`` belongs to."""
+    if not (timestamp.endswith("Z") or timestamp.endswith("+00:00")):
+        timestamp = parse_timestamp(timestamp).astimezone(timezone.utc).isoformat()
+    return timestamp[:ROTATIONS[rotation]]
+
+
+class SegmentedLog:
+    """Writer and reader for a directory of time-rotated JSON-lines segments."""
+
+    def __init__(self, directory: str = DEFAULT_LOG_DIR, rotation: str = "month", fsync: Optional[str] = None):
+        if rotation not in ROTATIONS:
+            raise ValueError(f"Unknown rotation {rotation!r}, expected one of {sorted(ROTATIONS)}")
+        fsync = fsync or os.getenv("UPTIME_LOG_FSYNC", "always")
+        if fsync not in FSYNC_POLICIES:
+            raise ValueError(f"Unknown fsync policy {fsync!r}, expected one of {FSYNC_POLICIES}")
+        self.directory = directory
+        self.rotation = rotation
+        self.fsync = fsync
+        self._fd: Optional[int] = None
+        self._segment: Optional[str] = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def segment_path(self, key: str) -> str:
+        return os.path.join(self.directory, key + SEGMENT_SUFFIX)
+
+    def _open_segment(self, key: str) -> int:
+        if self._segment == key and self._fd is not None:
+            return self._fd
+        self.close()
+        os.makedirs(self.directory, exist_ok=True)
+        path = self.segment_path(key)
+        created = not os.path.exists(path)
+        self._fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        self._segment = key
+        if created and self.fsync == "always":
+            _fsync_directory(self.directory)
+        return self._fd
+
+    def append(self, entry: Dict) -> None:
+        """Append one entry; costs a single ``write()`` (plus ``fsync`` under the "always" policy)."""
+        self._write(segment_key(entry["timestamp"], self.rotation), [entry])
+
+    def append_batch(self, entries: Sequence[Dict]) -> None:
+        """Append entries in order with one ``write()`` (and ``fsync``) per run of entries in the same segment."""
+        run: List[Dict] = []
+        run_key = None
+        for entry in entries:
+            key = segment_key(entry["timestamp"], self.rotation)
+            if run and key != run_key:
+                self._write(run_key, run)
+                run = []
+            run_key = key
+            run.append(entry)
+        if run:
+            self._write(run_key, run)
+
+    def _write(self, key: str, entries: Sequence[Dict]) -> None:
+        data = "".join(json.dumps(entry, separators=(",", ":")) + "\n" for entry in entries).encode("utf-8")
+        fd = self._open_segment(key)
+        os.write(fd, data)
+        if self.fsync == "always":
+            os.fsync(fd)
+
+    def close(self) -> None:
+        if self._fd is None:
+            return
+        if self.fsync == "segment":
+            os.fsync(self._fd)
+        os.close(self._fd)
+        self._fd = None
+        self._segment = None
+
+    def segments(self) -> List[str]:
+        """Segment names in chronological order."""
+        try:
+            names = os.listdir(self.directory)
+        except FileNotFoundError:
+            return []
+        return sorted(n[:-len(SEGMENT_SUFFIX)] for n in names if n.endswith(SEGMENT_SUFFIX))
+
+    def iter_entries(self, since: Optional[datetime] = None, until: Optional[datetime] = None) -> Iterator[Dict]:
+        """Yield entries in log order, optionally limited to ``since <= timestamp < until``.
+
+        Segments entirely outside the window are not opened. A torn last line
+        (from a crash mid-write) is skipped. Months moved to the compressed
+        archive (:mod:`uptime_monitor.archive`) come first, read block by block.
+        """
+        since_key = segment_key(since.astimezone(timezone.utc).isoformat(), self.rotation) if since else None
+        until_key = segment_key(until.astimezone(timezone.utc).isoformat(), self.rotation) if until else None
+        if os.path.isdir(os.path.join(self.directory, "archive")):
+            from . import archive
+
+            for month in archive.months(self.directory):
+                if (since_key and month < since_key[:7]) or (until_key and month > until_key[:7]):
+                    continue
+                yield from archive.iter_entries(self.directory, month, since, until)
+        for key in self.segments():
+            if since_key and key < since_key:
+                continue
+            if until_key and key > until_key:
+                break
+            with open(self.segment_path(key), "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue
+                    if since or until:
+                        ts = parse_timestamp(entry["timestamp"])
+                        if (since and ts < since) or (until and ts >= until):
+                            continue
+                    yield entry
+
+    def read_from(self, key: str, offset: int = 0) -> Iterator[Tuple[int, Dict]]:
+        """Yield ``(end_offset, entry)`` for the complete lines of a segment after byte ``offset``.
+
+        Consumers that remember ``end_offset`` per segment can resume later and
+        read only what was appended since. A line still being written (no
+        trailing newline) is left for the next call.
+        """
+        with open(self.segment_path(key), "rb") as f:
+            f.seek(offset)
+            for line in f:
+                if not line.endswith(b"\n"):
+                    return
+                offset += len(line)
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                yield offset, entry
+
+
+def _fsync_directory(directory: str) -> None:
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return  # not supported on this platform (e.g. Windows)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+# ----------- Convenience API for the probe scripts -----------
+
+def append_entry(entry: Dict, directory: str = DEFAULT_LOG_DIR, fsync: Optional[str] = None) -> None:
+    with SegmentedLog(directory, fsync=fsync) as log:
+        log.append(entry)
+
+
+def read_entries(directory: str = DEFAULT_LOG_DIR, since: Optional[datetime] = None,
+                 until: Optional[datetime] = None) -> Iterator[Dict]:
+    return SegmentedLog(directory).iter_entries(since, until)
+
+
+def load_entries(directory: str = DEFAULT_LOG_DIR) -> List[Dict]:
+    """Drop-in replacement for ``json.load`` on the legacy ``uptime-log.json``."""
+    return list(read_entries(directory))
+
+
+def migrate_json_array(source: str = LEGACY_LOG_FILE, directory: str = DEFAULT_LOG_DIR,
+                       remove_source: bool = True) -> int:
+    """Import the legacy JSON array into segments and return the number of entries moved.
+
+    Legacy entries are older than anything already written to the segments,
+    so they are placed in front of existing lines of the same segment. Each
+    segment is rewritten through a temporary file and ``os.replace``. Without
+    a source file this is a no-op, so it is safe to run on every cycle.
+
+    An interrupted migration is resumed, never repeated: the source is first
+    renamed to ``<source>.migrating`` and only removed once every segment is
+    written, and a segment that already starts with its legacy entries is
+    left as it is.
+    """
+    migrating = source + MIGRATING_SUFFIX
+    if remove_source and not os.path.exists(migrating):
+        try:
+            os.replace(source, migrating)
+        except FileNotFoundError:
+            return 0
+    try:
+        with open(migrating if remove_source else source, "r", encoding="utf-8") as f:
+            legacy = json.load(f)
+    except FileNotFoundError:
+        return 0
+
+    log = SegmentedLog(directory)
+    by_segment: Dict[str, List[str]] = {}
+    for entry in legacy:
+        key = segment_key(entry["timestamp"], log.rotation)
+        by_segment.setdefault(key, []).append(json.dumps(entry, separators=(",", ":")) + "\n")
+
+    os.makedirs(directory, exist_ok=True)
+    for key, lines in by_segment.items():
+        path = log.segment_path(key)
+        if _first_line(path) == lines[0]:
+            continue  # migrated by an earlier run that stopped before removing the source
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8", newline="\n") as out:
+            out.writelines(lines)
+            if os.path.exists(path):
+                with open(path, "r", encoding="utf-8") as existing:
+                    out.writelines(existing)
+            out.flush()
+            os.fsync(out.fileno())
+        os.replace(tmp_path, path)
+    _fsync_directory(directory)
+
+    if remove_source:
+        os.remove(migrating)
+    return len(legacy)
+
+
+def _first_line(path: str) -> Optional[str]:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return f.readline()
+    except FileNotFoundError:
+        return None
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m uptime_monitor.store", description=__doc__.split("\n")[0])
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    migrate = sub.add_parser("migrate", help="import the legacy JSON array into segments")
+    migrate.add_argument("--source", default=LEGACY_LOG_FILE)
+    migrate.add_argument("--dir", default=DEFAULT_LOG_DIR)
+    migrate.add_argument("--keep-source", action="store_true")
+
+    export = sub.add_parser("export", help="write all entries as one JSON array to stdout")
+    export.add_argument("--dir", default=DEFAULT_LOG_DIR)
+
+    args = parser.parse_args(argv)
+    if args.command == "migrate":
+        count = migrate_json_array(args.source, args.dir, remove_source=not args.keep_source)
+        print(f"Migrated {count} entries from {args.source} into {args.dir}/")
+    else:
+        json.dump(load_entries(args.dir), sys.stdout, indent=2)
+        sys.stdout.write("\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,150 @@
+"""Read the uptime log backwards, newest entry first.
+
+Recent-window questions ("last 3 results per service", "last 5 minutes")
+only need the end of the log. The reader seeks to the end of the file and
+parses blocks backwards. It stops as soon as the window or count is
+satisfied, so the cost is O(window) instead of O(history). It handles:
+
+* a segment directory (``uptime-log/``), newest segment first
+* a single JSON-lines file
+* the legacy pretty-printed ``uptime-log.json`` array. Entries are
+  reassembled from their lines; a compact one-line array falls back to a
+  full parse.
+
+Writers can interleave by a few seconds (Playwright and the probe scripts).
+Time windows therefore keep reading for ``slack`` past the window start
+before stopping.
+
+Usage::
+
+    python -m uptime_monitor.tail --last 3 --service udp ttn
+    python -m uptime_monitor.tail --minutes 5 [--source uptime-log.json]
+"""
+
+import argparse
+import json
+import os
+import sys
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterator, List, Optional, Sequence
+
+from . import config, store
+
+BLOCK_SIZE = 1 << 16
+DEFAULT_SLACK = timedelta(minutes=10)
+
+
+def reverse_lines(path: str, block_size: int = BLOCK_SIZE) -> Iterator[bytes]:
+    """Yield the lines of a file last to first (without newlines), reading ``block_size`` bytes at a time."""
+    with open(path, "rb") as f:
+        position = f.seek(0, os.SEEK_END)
+        remainder = b""
+        while position > 0:
+            size = min(block_size, position)
+            position -= size
+            f.seek(position)
+            lines = (f.read(size) + remainder).split(b"\n")
+            remainder = lines[0]
+            yield from reversed(lines[1:])
+        yield remainder
+
+
+def _reverse_json_lines(path: str) -> Iterator[Dict]:
+    for line in reverse_lines(path):
+        if not line.strip():
+            continue
+        try:
+            yield json.loads(line)
+        except json.JSONDecodeError:
+            continue  # torn last line
+
+
+def _reverse_json_array(path: str) -> Iterator[Dict]:
+    pending: List[bytes] = []
+    for line in reverse_lines(path):
+        text = line.strip()
+        if not text or text in (b"[", b"]"):
+            continue
+        pending.append(text)
+        if text.startswith(b"{"):
+            try:
+                entry = json.loads(b"".join(reversed(pending)).rstrip(b",]"))
+            except json.JSONDecodeError:
+                continue  # a "{" that does not open an entry; keep collecting
+            pending.clear()
+            yield entry
+    if pending:  # not pretty-printed: parse the rest in one go
+        yield from reversed(json.loads(b"".join(reversed(pending))))
+
+
+def reverse_entries(source: str = config.UPTIME_LOG_DIR) -> Iterator[Dict]:
+    """Entries of a segment directory, JSON-lines file or legacy JSON array, newest first."""
+    if os.path.isdir(source):
+        log = store.SegmentedLog(source)
+        for key in reversed(log.segments()):
+            yield from _reverse_json_lines(log.segment_path(key))
+    elif source.endswith(store.SEGMENT_SUFFIX):
+        yield from _reverse_json_lines(source)
+    else:
+        yield from _reverse_json_array(source)
+
+
+def recent(since: datetime, source: str = config.UPTIME_LOG_DIR,
+           slack: timedelta = DEFAULT_SLACK) -> List[Dict]:
+    """Entries with ``timestamp >= since``, newest first."""
+    out = []
+    stop = since - slack
+    for entry in reverse_entries(source):
+        ts = store.parse_timestamp(entry["timestamp"])
+        if ts < stop:
+            break
+        if ts >= since:
+            out.append(entry)
+    return out
+
+
+def last_results(services: Sequence[str], count: int = 3,
+                 source: str = config.UPTIME_LOG_DIR) -> Dict[str, List[bool]]:
+    """The last ``count`` boolean results of each service, newest first.
+
+    Reading stops once every service has ``count`` results. A service that
+    never reports makes this a full scan.
+    """
+    out: Dict[str, List[bool]] = {service: [] for service in services}
+    missing = set(services) if count > 0 else set()
+    if not missing:
+        return out
+    for entry in reverse_entries(source):
+        for service in missing.intersection(entry):
+            value = entry[service]
+            if isinstance(value, bool):
+                out[service].append(value)
+                if len(out[service]) == count:
+                    missing.discard(service)
+        if not missing:
+            break
+    return out
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m uptime_monitor.tail", description=__doc__.split("\n")[0])
+    parser.add_argument("--source", default=config.UPTIME_LOG_DIR, help="segment directory, .jsonl file or legacy .json array")
+    group = parser.add_mutually_exclusive_group(required=True)
+    group.add_argument("--last", type=int, help="last N boolean results per --service")
+    group.add_argument("--minutes", type=float, help="all entries of the last N minutes")
+    parser.add_argument("--service", nargs="*", default=["cloud", "api", "website", "udp", "ttn"])
+    args = parser.parse_args(argv)
+    if args.last is not None and args.last < 0:
+        parser.error("--last must not be negative")
+
+    if args.last is not None:
+        for service, results in last_results(args.service, args.last, args.source).items():
+            print(f"{service}: {' '.join('✅' if ok else '❌' for ok in results) or '-'}")
+    else:
+        for entry in recent(datetime.now(timezone.utc) - timedelta(minutes=args.minutes), args.source):
+            print(json.dumps(entry))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,202 @@
+"""Sequence-numbered UDP burst probe for packet loss and ingestion throughput.
+
+Sends ``count`` datagrams for a test device over one reused, non-blocking
+socket at a fixed rate, then asks Influx how many of them arrived with one
+aggregate ``count()`` query per poll.
+
+The ingest stamps points with the payload's second-resolution ``time``, so
+datagram ``k`` carries ``time = base + k s`` (``base`` lies ``count`` seconds
+before the burst) as its sequence marker, plus ``signal = nonce + k``. Every
+datagram therefore becomes its own point. The delivered points are the rows
+in ``[base, base + count s)`` whose signal lies in
+``[nonce, nonce + count)``. The random per-burst ``nonce`` keeps points of
+an earlier burst less than ``count`` seconds ago (same times, same
+device) out of the count.
+
+Ingestion lag is derived from the polls: assuming datagrams become visible
+in send order, datagram ``k`` is visible at the first poll whose count
+reached ``k``. Percentiles are therefore accurate to one poll interval.
+
+Usage::
+
+    python -m uptime_monitor.udp_burst --count 500 --rate 200 [--log]
+"""
+
+import argparse
+import json
+import random
+import select
+import socket
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from typing import List, NamedTuple, Optional, Sequence, Tuple
+
+from . import config, logd, payloads
+from .deadline import Deadline
+from .influx_query import flux_string, flux_time
+from .polling import poll_until
+
+NONCE_STEP = 10 ** 6  # nonces are multiples of this, so bursts of up to 10^6 datagrams never share a signal
+
+
+class BurstReport(NamedTuple):
+    sent: int
+    delivered: int
+    loss_pct: float
+    send_rate_pps: float
+    lag_p50_s: Optional[float]
+    lag_p95_s: Optional[float]
+    lag_p99_s: Optional[float]
+
+
+def new_nonce() -> int:
+    return random.randrange(1, 10 ** 6) * NONCE_STEP
+
+
+def burst_payloads(imei: str, count: int, base: datetime, nonce: int = 0) -> List[bytes]:
+    """Datagrams for one burst, without the hourly history; ``base`` is local time like the regular UDP ping."""
+    return [
+        json.dumps(payloads.udp_ping(imei, (base + timedelta(seconds=seq)).strftime(payloads.UDP_TIME_FORMAT),
+                                     signal=nonce + seq)).encode("utf-8")
+        for seq in range(count)
+    ]
+
+
+def send_burst(target: Tuple[str, int], datagrams: Sequence[bytes], rate_pps: float,
+               deadline: Optional[Deadline] = None) -> Tuple[List[float], float]:
+    """Send ``datagrams`` paced at ``rate_pps``, stopping early once ``deadline`` is spent.
+
+    Returns the wall-clock send time of every datagram sent and the burst duration.
+    """
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sock.setblocking(False)
+    interval = 1.0 / rate_pps
+    sent_at: List[float] = []
+    start = time.monotonic()
+    try:
+        for i, payload in enumerate(datagrams):
+            if deadline is not None and deadline.expired:
+                break
+            delay = start + i * interval - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            while True:
+                try:
+                    sock.sendto(payload, target)
+                    break
+                except BlockingIOError:
+                    select.select([], [sock], [], 1.0)  # send buffer full, wait until writable
+            sent_at.append(time.time())
+    finally:
+        sock.close()
+    return sent_at, time.monotonic() - start
+
+
+def delivered_count_query(bucket: str, imei: str, start: datetime, stop: datetime, nonce: int = 0,
+                          count: int = NONCE_STEP) -> str:
+    return f'''
+    from(bucket: {flux_string(bucket)})
+      |> range(start: {flux_time(start)}, stop: {flux_time(stop)})
+      |> filter(fn: (r) => r["imei"] == {flux_string(imei)} and r["_field"] == "signal")
+      |> filter(fn: (r) => float(v: r["_value"]) >= {float(nonce)} and float(v: r["_value"]) < {float(nonce + count)})
+      |> count()
+    '''
+
+
+def delivered_count(query_api, bucket: str, imei: str, start: datetime, stop: datetime, nonce: int = 0,
+                    count: int = NONCE_STEP) -> int:
+    tables = query_api.query(delivered_count_query(bucket, imei, start, stop, nonce, count))
+    return sum(int(record.get_value()) for table in tables for record in table.records)
+
+
+def percentile(sorted_values: Sequence[float], q: float) -> Optional[float]:
+    """Nearest-rank percentile of an ascending sequence (``None`` if empty)."""
+    if not sorted_values:
+        return None
+    rank = max(int(-(-q * len(sorted_values) // 100)), 1)  # ceil(q/100 * n)
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def visibility_lags(sent_at: Sequence[float], observations: Sequence[Tuple[float, int]]) -> List[float]:
+    """Lag of each delivered datagram from ``(poll wall time, cumulative count)`` observations."""
+    lags = []
+    k = 0
+    for polled_at, count in observations:
+        while k < min(count, len(sent_at)):
+            lags.append(max(polled_at - sent_at[k], 0.0))
+            k += 1
+    return sorted(lags)
+
+
+def run_burst(runtime, count: int, rate_pps: float, target: Tuple[str, int] = (config.UDP_IP, config.UDP_PORT),
+              imei: str = config.BURST_IMEI, bucket: str = config.INFLUX_BUCKET,
+              deadline: Optional[Deadline] = None) -> BurstReport:
+    """Send one burst and poll for its points until all arrived or ``deadline`` (default 60 s) is spent."""
+    if not 0 < count <= NONCE_STEP:
+        raise ValueError(f"count must be between 1 and {NONCE_STEP}")
+    deadline = deadline or Deadline.after(60.0)
+    base = datetime.now().replace(microsecond=0) - timedelta(seconds=count)
+    range_start = base.astimezone(timezone.utc)
+    range_stop = range_start + timedelta(seconds=count)
+    nonce = new_nonce()
+
+    sent_at, duration = send_burst(target, burst_payloads(imei, count, base, nonce), rate_pps, deadline)
+    sent = len(sent_at)
+
+    observations: List[Tuple[float, int]] = []
+
+    def fetch() -> int:
+        if deadline.expired and observations:
+            return observations[-1][1]  # the poll's last attempt lands on the deadline
+        polled_at = time.time()
+        with runtime.bounded_query_api(deadline.timeout(cap=config.INFLUX_QUERY_TIMEOUT_S)) as query_api:
+            delivered = delivered_count(query_api, bucket, imei, range_start, range_stop, nonce, count)
+        observations.append((polled_at, delivered))
+        return delivered
+
+    poll = poll_until(fetch, lambda delivered: delivered >= sent, deadline.remaining(), max_interval_s=2.0)
+    delivered = min(poll.value or 0, sent)
+    lags = visibility_lags(sent_at, observations)
+    return BurstReport(
+        sent=sent,
+        delivered=delivered,
+        loss_pct=100.0 * (sent - delivered) / sent if sent else 100.0,
+        send_rate_pps=sent / duration if duration > 0 else float("inf"),
+        lag_p50_s=percentile(lags, 50),
+        lag_p95_s=percentile(lags, 95),
+        lag_p99_s=percentile(lags, 99),
+    )
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    from .clients import ClientRuntime
+
+    parser = argparse.ArgumentParser(prog="python -m uptime_monitor.udp_burst", description=__doc__.split("\n")[0])
+    parser.add_argument("--count", type=int, default=200)
+    parser.add_argument("--rate", type=float, default=100.0, help="datagrams per second")
+    parser.add_argument("--deadline", type=float, default=60.0, help="seconds for sending and waiting for ingestion")
+    parser.add_argument("--imei", default=config.BURST_IMEI)
+    parser.add_argument("--log", action="store_true", help="append loss, rate and p95 lag to the uptime log")
+    args = parser.parse_args(argv)
+
+    print(f"Sending {args.count} datagrams to {config.UDP_IP}:{config.UDP_PORT} at {args.rate:g}/s")
+    with ClientRuntime(config.INFLUX_URL, config.INFLUX_TOKEN, config.INFLUX_ORG) as runtime:
+        report = run_burst(runtime, args.count, args.rate, imei=args.imei,
+                           deadline=Deadline.after(args.deadline))
+
+    lag = " / ".join("-" if v is None else f"{v:.2f}s" for v in (report.lag_p50_s, report.lag_p95_s, report.lag_p99_s))
+    print(f"Delivered {report.delivered}/{report.sent} ({report.loss_pct:.1f}% loss), "
+          f"send rate {report.send_rate_pps:.0f}/s, ingestion lag p50/p95/p99 {lag}")
+
+    if args.log:
+        entry = {"timestamp": datetime.now(timezone.utc).isoformat(), "udpBurstLoss": round(report.loss_pct, 2),
+                 "udpBurstRate": round(report.send_rate_pps)}
+        if report.lag_p95_s is not None:
+            entry["udpBurstLagP95"] = round(report.lag_p95_s * 1000)
+        logd.append_entry(entry, config.UPTIME_LOG_DIR)
+    return 0 if report.delivered else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,232 @@
+"""UDP round-trip probe for many echoing endpoints over one non-blocking socket.
+
+Sends ``count`` small datagrams to every target and times the replies, all
+from one ``selectors`` loop on a single non-blocking socket (one per
+address family). Each datagram carries a random nonce
+(``{"rtt":"<16 hex>"}``). A reply is matched by the nonce it contains and
+the address it came from, so replies may arrive in any order, and a
+duplicate or stray datagram is counted as unmatched and never as an
+answer. A request without a reply after ``timeout_s`` is lost. A host that
+does not resolve is reported as a failed target with its error.
+
+Sends are paced at ``rate_pps``, round by round over all targets, so a
+few hundred endpoints take well under a second. The result is RTT
+percentiles and loss per target. Targets must echo the datagram back
+(or acknowledge with a reply that contains it).
+
+Usage::
+
+    python -m uptime_monitor.udp_rtt --target 10.0.0.5:7 10.0.0.6:7 [--targets-file edge.txt] [--log]
+"""
+
+import argparse
+import os
+import re
+import selectors
+import socket
+import sys
+import time
+from collections import deque
+from datetime import datetime, timezone
+from typing import Deque, Dict, List, NamedTuple, Optional, Sequence, Tuple, Union
+
+from . import config, logd
+from .deadline import Deadline
+from .udp_burst import percentile
+
+NONCE_BYTES = 8
+_NONCE_RE = re.compile(rb'"rtt":"([0-9a-f]{16})"')
+
+
+class TargetStats(NamedTuple):
+    target: str  # "host:port"
+    sent: int
+    received: int
+    rtts_ms: List[float]  # ascending
+    error: Optional[str] = None  # why nothing was sent, e.g. the host does not resolve
+
+    @property
+    def loss_pct(self) -> float:
+        if self.error:
+            return 100.0
+        return 100.0 * (self.sent - self.received) / self.sent if self.sent else 0.0
+
+    def rtt_ms(self, q: float) -> Optional[float]:
+        return percentile(self.rtts_ms, q)
+
+
+class RttReport(NamedTuple):
+    targets: List[TargetStats]
+    elapsed_s: float
+    unmatched: int  # duplicates, late replies and datagrams that match no request
+
+    @property
+    def sent(self) -> int:
+        return sum(t.sent for t in self.targets)
+
+    @property
+    def received(self) -> int:
+        return sum(t.received for t in self.targets)
+
+    @property
+    def loss_pct(self) -> float:
+        return 100.0 * (self.sent - self.received) / self.sent if self.sent else 0.0
+
+    def rtt_ms(self, q: float) -> Optional[float]:
+        return percentile(sorted(r for t in self.targets for r in t.rtts_ms), q)
+
+
+def parse_target(value: str) -> Tuple[str, int]:
+    host, _, port = value.strip().rpartition(":")
+    if not host or not port.isdigit():
+        raise ValueError(f"expected HOST:PORT, got {value!r}")
+    return host.strip("[]"), int(port)
+
+
+def _resolve(targets: Sequence[Tuple[str, int]]) -> List[Union[Tuple[int, tuple], str]]:
+    """``(family, sockaddr)`` per target, or the lookup error; each host is looked up once.
+
+    A host that does not resolve fails only its own target, not the probe.
+    """
+    cache: Dict[Tuple[str, int], Union[Tuple[int, tuple], str]] = {}
+    for target in targets:
+        if target not in cache:
+            try:
+                family, _, _, _, sockaddr = socket.getaddrinfo(*target, type=socket.SOCK_DGRAM)[0]
+                cache[target] = family, sockaddr
+            except socket.gaierror as e:
+                cache[target] = f"cannot resolve {target[0]}: {e.strerror or e}"
+    return [cache[t] for t in targets]
+
+
+def probe_targets(targets: Sequence[Tuple[str, int]], count: int = 3, timeout_s: float = 0.5,
+                  rate_pps: float = 5000.0, deadline: Optional[Deadline] = None) -> RttReport:
+    """Send ``count`` nonce datagrams to each target and collect the echoes; see the module docstring.
+
+    Stops early when ``deadline`` is spent; requests still waiting count as lost.
+    """
+    deadline = deadline or Deadline.after(config.PROBE_TIMEOUT_S)
+    resolved = _resolve(targets)
+    errors = {i: r for i, r in enumerate(resolved) if isinstance(r, str)}
+    sockets: Dict[int, socket.socket] = {}
+    selector = selectors.DefaultSelector()
+    for family in {r[0] for i, r in enumerate(resolved) if i not in errors}:
+        sock = sockets[family] = socket.socket(family, socket.SOCK_DGRAM)
+        sock.setblocking(False)
+        sock.bind(("::" if family == socket.AF_INET6 else "0.0.0.0", 0))
+        selector.register(sock, selectors.EVENT_READ)
+
+    sent = [0] * len(targets)
+    rtts: List[List[float]] = [[] for _ in targets]
+    pending: Dict[bytes, Tuple[int, float]] = {}  # nonce -> (target index, sent at)
+    in_order: Deque[Tuple[float, bytes]] = deque()  # (sent at, nonce), oldest first: same timeout for all
+    queue = deque(i for _ in range(count) for i in range(len(targets)) if i not in errors)
+    interval = 1.0 / rate_pps
+    unmatched = 0
+    start = next_send = time.monotonic()
+    try:
+        while (queue or pending) and not deadline.expired:
+            now = time.monotonic()
+            blocked = False
+            while queue and next_send <= now:
+                i = queue[0]
+                family, sockaddr = resolved[i]
+                nonce = os.urandom(NONCE_BYTES).hex().encode()
+                sent_at = time.monotonic()  # before the send: a reply can arrive before sendto returns
+                try:
+                    sockets[family].sendto(b'{"rtt":"' + nonce + b'"}', sockaddr)
+                except BlockingIOError:
+                    blocked = True  # send buffer full: drain replies, then retry
+                    break
+                queue.popleft()
+                sent[i] += 1
+                pending[nonce] = (i, sent_at)
+                in_order.append((sent_at, nonce))
+                next_send = max(next_send + interval, sent_at - 0.01)  # no burst to catch up after a stall
+
+            wait = deadline.remaining()
+            if queue:
+                wait = min(wait, 0.001 if blocked else max(0.0, next_send - time.monotonic()))
+            if in_order:
+                wait = min(wait, max(0.0, in_order[0][0] + timeout_s - time.monotonic()))
+            for key, _ in selector.select(wait):
+                while True:
+                    try:
+                        data, address = key.fileobj.recvfrom(2048)
+                    except OSError:  # drained; or an ICMP error reported on the socket
+                        break
+                    received_at = time.monotonic()
+                    match = _NONCE_RE.search(data)
+                    request = pending.get(match.group(1)) if match else None
+                    if request is None or address[:2] != resolved[request[0]][1][:2]:
+                        unmatched += 1
+                        continue
+                    del pending[match.group(1)]
+                    rtts[request[0]].append((received_at - request[1]) * 1000)
+
+            expired_before = time.monotonic() - timeout_s
+            while in_order and in_order[0][0] <= expired_before:
+                pending.pop(in_order.popleft()[1], None)
+    finally:
+        selector.close()
+        for sock in sockets.values():
+            sock.close()
+
+    stats = [TargetStats(f"{host}:{port}", sent[i], len(rtts[i]), sorted(rtts[i]), errors.get(i))
+             for i, (host, port) in enumerate(targets)]
+    return RttReport(stats, time.monotonic() - start, unmatched)
+
+
+def _fmt(value: Optional[float]) -> str:
+    return "-" if value is None else f"{value:.1f}"
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m uptime_monitor.udp_rtt", description=__doc__.split("\n")[0])
+    parser.add_argument("--target", nargs="*", default=[], metavar="HOST:PORT")
+    parser.add_argument("--targets-file", help="one HOST:PORT per line (# comments allowed)")
+    parser.add_argument("--count", type=int, default=3, help="datagrams per target")
+    parser.add_argument("--timeout", type=float, default=0.5, help="seconds before a datagram counts as lost")
+    parser.add_argument("--rate", type=float, default=5000.0, help="datagrams per second over all targets")
+    parser.add_argument("--deadline", type=float, default=config.RUN_DEADLINE_S)
+    parser.add_argument("--quiet", action="store_true", help="summary only, no line per target")
+    parser.add_argument("--log", action="store_true", help="append loss, RTT p50/p95 and unreachable targets to the uptime log")
+    parser.add_argument("--dir", default=config.UPTIME_LOG_DIR)
+    args = parser.parse_args(argv)
+
+    values = list(args.target) or list(config.UDP_RTT_TARGETS)
+    if args.targets_file:
+        with open(args.targets_file, "r", encoding="utf-8") as f:
+            values += [line.split("#")[0] for line in f if line.split("#")[0].strip()]
+    try:
+        targets = [parse_target(v) for v in values]
+    except ValueError as e:
+        parser.error(str(e))
+    if not targets:
+        parser.error("no targets: pass --target/--targets-file or set UDP_RTT_TARGETS")
+
+    report = probe_targets(targets, args.count, args.timeout, args.rate, Deadline.after(args.deadline))
+    if not args.quiet:
+        for t in report.targets:
+            if t.error:
+                print(f"❌ {t.target}: {t.error}")
+                continue
+            print(f"{'✅' if t.received else '❌'} {t.target}: {t.received}/{t.sent} replies, "
+                  f"RTT p50 {_fmt(t.rtt_ms(50))} ms, max {_fmt(t.rtt_ms(100))} ms")
+    down = sum(1 for t in report.targets if not t.received)
+    print(f"{len(targets)} targets in {report.elapsed_s:.2f}s: {report.loss_pct:.1f}% loss, "
+          f"RTT p50/p95 {_fmt(report.rtt_ms(50))}/{_fmt(report.rtt_ms(95))} ms, {down} unreachable, "
+          f"{report.unmatched} unmatched replies")
+
+    if args.log:
+        entry = {"timestamp": datetime.now(timezone.utc).isoformat(), "udpRttLoss": round(report.loss_pct, 2),
+                 "udpRttDown": down}
+        for q in (50, 95):
+            if report.rtt_ms(q) is not None:
+                entry[f"udpRttP{q}"] = round(report.rtt_ms(q), 1)
+        logd.append_entry(entry, args.dir)
+    return 0 if report.received else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,141 @@
+"""Indexed uptime-window queries for SLA reports.
+
+The log is loaded once into per-service sorted arrays of epoch-millisecond
+timestamps with a running count of successful results. The uptime of any
+service over any window is then two binary searches and a subtraction,
+instead of rescanning and re-parsing the whole history for every
+service × window combination (as ``uptimePercent`` in ``analyse.ts`` does).
+
+Like ``uptimePercent``, only boolean results are counted.
+
+Usage::
+
+    python -m uptime_monitor.windows [--days 30 100 365] [--service udp ttn]
+    python -m uptime_monitor.windows --since 2025-08-01 --until 2025-09-01
+"""
+
+import argparse
+import sys
+import time
+from array import array
+from bisect import bisect_left
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, NamedTuple, Optional
+
+from . import config, store
+
+DAY_MS = 24 * 60 * 60 * 1000
+
+
+class WindowUptime(NamedTuple):
+    up: int
+    total: int
+
+    @property
+    def percent(self) -> Optional[float]:
+        return 100.0 * self.up / self.total if self.total else None
+
+
+class ServiceSeries:
+    """Sorted timestamps of one service plus prefix sums of its successful results."""
+
+    __slots__ = ("times", "ups")
+
+    def __init__(self, times: array, ups: array):
+        self.times = times  # epoch ms, ascending
+        self.ups = ups      # ups[i] = successful results among the first i entries (len(times) + 1 items)
+
+    @classmethod
+    def build(cls, points: List[tuple]) -> "ServiceSeries":
+        if any(points[i][0] > points[i + 1][0] for i in range(len(points) - 1)):
+            points.sort(key=lambda p: p[0])
+        times = array("q", (t for t, _ in points))
+        ups = array("q", [0])
+        running = 0
+        for _, ok in points:
+            running += ok
+            ups.append(running)
+        return cls(times, ups)
+
+    def window(self, start_ms: int, end_ms: int) -> WindowUptime:
+        """Results with ``start_ms <= time < end_ms``."""
+        lo = bisect_left(self.times, start_ms)
+        hi = bisect_left(self.times, end_ms)
+        return WindowUptime(self.ups[hi] - self.ups[lo], hi - lo)
+
+
+class UptimeIndex:
+    def __init__(self, series: Dict[str, ServiceSeries]):
+        self.series = series
+
+    @classmethod
+    def from_entries(cls, entries: Iterable[dict]) -> "UptimeIndex":
+        points: Dict[str, List[tuple]] = {}
+        for entry in entries:
+            ts = None
+            for key, value in entry.items():
+                if key == "timestamp" or not isinstance(value, bool):
+                    continue
+                if ts is None:
+                    ts = timestamp_ms(entry["timestamp"])
+                points.setdefault(key, []).append((ts, value))
+        return cls({name: ServiceSeries.build(p) for name, p in points.items()})
+
+    @classmethod
+    def from_log(cls, directory: str = config.UPTIME_LOG_DIR) -> "UptimeIndex":
+        return cls.from_entries(store.read_entries(directory))
+
+    def services(self) -> List[str]:
+        return list(self.series)
+
+    def uptime(self, service: str, start_ms: int, end_ms: int) -> WindowUptime:
+        series = self.series.get(service)
+        return series.window(start_ms, end_ms) if series else WindowUptime(0, 0)
+
+    def uptime_last_days(self, service: str, days: float, now_ms: Optional[int] = None) -> WindowUptime:
+        now_ms = int(time.time() * 1000) if now_ms is None else now_ms
+        return self.uptime(service, now_ms - int(days * DAY_MS), now_ms + 1)
+
+
+def timestamp_ms(timestamp: str) -> int:
+    return int(store.parse_timestamp(timestamp).timestamp() * 1000)
+
+
+def _date_ms(value: str) -> int:
+    dt = datetime.fromisoformat(value)
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return int(dt.timestamp() * 1000)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m uptime_monitor.windows", description=__doc__.split("\n")[0])
+    parser.add_argument("--dir", default=config.UPTIME_LOG_DIR)
+    parser.add_argument("--service", nargs="*", help="default: every service with boolean results")
+    parser.add_argument("--days", nargs="*", type=float, default=[30, 100, 365])
+    parser.add_argument("--since", help="ISO date/time (UTC); with --until replaces --days")
+    parser.add_argument("--until", help="ISO date/time (UTC), exclusive; default now")
+    args = parser.parse_args(argv)
+
+    index = UptimeIndex.from_log(args.dir)
+    services = args.service or index.services()
+    now_ms = int(time.time() * 1000)
+
+    if args.since:
+        start_ms = _date_ms(args.since)
+        end_ms = _date_ms(args.until) if args.until else now_ms + 1
+        windows = [(f"{args.since} – {args.until or 'now'}", start_ms, end_ms)]
+    else:
+        windows = [(f"last {days:g} days", now_ms - int(days * DAY_MS), now_ms + 1) for days in args.days]
+
+    for service in services:
+        print(f"{service}:")
+        for label, start_ms, end_ms in windows:
+            result = index.uptime(service, start_ms, end_ms)
+            percent = "-" if result.percent is None else f"{result.percent:.2f}%"
+            print(f"  {label}: {percent} ({result.up}/{result.total})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())